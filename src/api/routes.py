@@ -1,29 +1,99 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
 import logging
 import os
+import asyncio
+import json
 
 from src.processing.validation import validate_document
 from src.processing.chunking import chunk_document
-from src.processing.embeddings import embed_chunks
+from src.processing.embeddings import embed_chunks, warmup
 from src.storage.vector_db import (
     store_document,
     query_documents,
     list_documents,
-    delete_document
+    delete_document,
+    delete_document_async
 )
 from src.monitoring.metrics import record_metrics, prometheus_metrics
 from src.config.settings import settings
-from src.processing.ingest_rag import ingest_document_rag
-from pymongo import MongoClient
+from src.processing.ingest_rag import (
+    SUPPORTED_STRATEGIES,
+    IngestInProgressError,
+    ingest_document_rag,
+    ingest_document_stream,
+    ingest_documents_batch,
+)
+from src.processing.streaming import spool_upload, expand_archive, is_archive, SUPPORTED_DOC_TYPES
+from src.processing.jobs import get_job_queue, QueueFullError
+from src.processing.query_batcher import shutdown_query_batcher
+from src.storage.qdrant_writes import shutdown_upsert_reconciler
+from src.storage.keyword_index import ensure_keyword_index, shutdown_keyword_index
+from src.storage.sparse_vectors import dense_vector
+from src.storage.clients import get_clients, close_clients
+from src.storage.documents import (
+    LISTING_PROJECTION,
+    LISTING_SORT,
+    document_summary,
+    encode_cursor,
+    ensure_document_indexes,
+    listing_filter,
+)
+from src.processing.blocking import run_blocking, run_ingest, shutdown_blocking_executor
+from src.monitoring.loop_lag import EventLoopLagMonitor, freeze_startup_heap
 from bson import ObjectId
 from langsmith import Client as LangSmithClient
+from contextlib import asynccontextmanager
 
-app = FastAPI(title="Production-Ready RAG LLM Inference Pipeline")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the Qdrant and MongoDB clients, load and warm the shared embedding model
+    once before serving requests, build the keyword index from Qdrant if it has never
+    been written, create the document listing indexes, freeze the startup heap out of garbage collection and watch the
+    event loop for blocking calls.
+    """
+    clients = await run_blocking(get_clients)
+    lag_monitor = None
+    if settings.EVENT_LOOP_LAG_INTERVAL_MS > 0:
+        lag_monitor = EventLoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL_MS, settings.EVENT_LOOP_LAG_WARN_MS)
+        lag_monitor.start()
+    if settings.EMBEDDING_WARMUP:
+        try:
+            await run_blocking(warmup)
+        except Exception:
+            logging.exception("Embedding model warmup failed; it will be loaded on first use")
+    try:
+        from src.storage.vector_db import COLLECTION_NAME
+        await run_blocking(ensure_keyword_index, clients.qdrant, COLLECTION_NAME)
+    except Exception:
+        logging.exception("Keyword index rebuild failed; run python -m src.storage.keyword_index rebuild")
+    try:
+        await run_blocking(ensure_document_indexes, clients.collection("documents"))
+    except Exception:
+        logging.exception("Creating document listing indexes failed; listings fall back to collection scans")
+    try:
+        await run_blocking(get_job_queue().start)
+    except Exception:
+        logging.exception("Ingest job queue failed to start; it will be started on first async ingest")
+    if settings.GC_FREEZE_AFTER_STARTUP:
+        logging.info(f"Froze {freeze_startup_heap()} startup objects out of garbage collection")
+    yield
+    get_job_queue().shutdown()
+    await run_blocking(shutdown_query_batcher)
+    await run_blocking(shutdown_upsert_reconciler)
+    await run_blocking(shutdown_keyword_index)
+    await clients.aclose()
+    await run_blocking(close_clients)
+    if lag_monitor is not None:
+        await lag_monitor.stop()
+    await asyncio.get_running_loop().run_in_executor(None, shutdown_blocking_executor)
+
+app = FastAPI(title="Production-Ready RAG LLM Inference Pipeline", lifespan=lifespan)
 
 security = HTTPBearer()
 
@@ -42,6 +112,39 @@ class IngestResponse(BaseModel):
     document_id: str
     status: str
 
+class BatchIngestResult(BaseModel):
+    filename: str
+    status: str
+    document_id: Optional[str] = None
+    chunks: int = 0
+    error: Optional[str] = None
+    duplicate: bool = False
+
+class BatchIngestResponse(BaseModel):
+    results: List[BatchIngestResult]
+    succeeded: int
+    failed: int
+    latency_ms: float
+
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    filename: str
+    status: str
+    stage: str
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    chunk_counts: dict = {}
+    timings: dict = {}
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class JobListResponse(BaseModel):
+    jobs: List[JobResponse]
+
 class QueryRequest(BaseModel):
     query: str
     top_k: int = 5
@@ -55,6 +158,7 @@ class QueryResponse(BaseModel):
 
 class DocumentListResponse(BaseModel):
     documents: List[dict]
+    next_cursor: Optional[str] = None
 
 class DeleteResponse(BaseModel):
     document_id: str
@@ -73,8 +177,30 @@ async def add_correlation_id(request: Request, call_next):
     return response
 
 # --- Endpoints ---
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+
+def _ingest_upload(filename, upload_path, *args):
+    """
+    Ingest a spooled upload on the ingest executor and remove it afterwards.
+    The worker owns the file: it keeps running when the request times out, so the
+    handler must not delete the upload from under it.
+    """
+    try:
+        return ingest_document_stream(filename, upload_path, *args)
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+
+def _ingest_batch_upload(work_dir, items, *args):
+    """
+    Ingest spooled batch files on the ingest executor and remove their directory afterwards.
+    """
+    import shutil
+    try:
+        return ingest_documents_batch(items, *args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
 
 @app.post("/ingest", response_model=IngestResponse, status_code=201)
 async def ingest_document(
@@ -83,41 +209,55 @@ async def ingest_document(
     chunking_strategy: Optional[str] = Form("langchain"),
     chunk_size: Optional[int] = Form(512),
     overlap: Optional[int] = Form(64),
+    async_mode: Optional[bool] = Form(False),
     token: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     Ingest a document, store in MongoDB, chunk/embed, upsert to Qdrant.
-    Supports chunking strategies: langchain, fixed, sliding, semantic.
+    Supports chunking strategies: langchain, fixed, sliding, token, semantic, similarity.
+    With async_mode=true the upload is queued and 202 is returned with a job id
+    that can be polled via GET /jobs/{job_id}.
     """
     import time
     start_time = time.time()
 
     verify_token(token)
+    upload_path = None
     try:
-        valid_strategies = {"langchain", "fixed", "sliding", "semantic"}
-        if chunking_strategy not in valid_strategies:
+        if chunking_strategy not in SUPPORTED_STRATEGIES:
             raise HTTPException(status_code=400, detail=f"Unknown chunking strategy: {chunking_strategy}")
 
-        doc = await file.read()
         doc_type = file.filename.split(".")[-1].lower()
-        validated = validate_document(doc, doc_type)
-
-        # Run the ingestion in a thread pool with timeout
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            mongo_id = await asyncio.wait_for(
-                loop.run_in_executor(
-                    executor,
-                    ingest_document_rag,
-                    file.filename,
-                    validated,
-                    metadata,
-                    chunking_strategy,
-                    chunk_size,
-                    overlap
-                ),
-                timeout=300  # 5 minutes timeout
+        if doc_type not in SUPPORTED_DOC_TYPES:
+            raise ValueError(f"Unsupported document type: {doc_type}")
+
+        # Spool the upload to disk instead of reading it into memory
+        upload_path = await spool_upload(file, settings.INGEST_SPOOL_DIR)
+
+        if async_mode:
+            job_id = await run_blocking(
+                get_job_queue().submit,
+                file.filename,
+                upload_path,
+                {"doc_metadata": metadata, "strategy": chunking_strategy, "chunk_size": chunk_size, "overlap": overlap},
             )
+            record_metrics("request_count", 1, endpoint="ingest", status="accepted")
+            return JSONResponse(status_code=202, content=JobAcceptedResponse(job_id=job_id, status="queued").model_dump())
+
+        # Run the streaming ingestion on the ingest executor with timeout. From here on
+        # the worker owns (and removes) the spooled upload: it runs to completion even
+        # after the request times out.
+        ingest = run_ingest(
+            _ingest_upload,
+            file.filename,
+            upload_path,
+            metadata,
+            chunking_strategy,
+            chunk_size,
+            overlap
+        )
+        upload_path = None
+        mongo_id = await asyncio.wait_for(ingest, timeout=300)  # 5 minutes timeout
 
         # Record successful metrics
         latency_ms = (time.time() - start_time) * 1000
@@ -125,6 +265,12 @@ async def ingest_document(
         record_metrics("query_latency_ms", latency_ms, endpoint="ingest")
 
         return IngestResponse(document_id=mongo_id, status="success")
+    except QueueFullError as e:
+        record_metrics("error_count", 1, endpoint="ingest")
+        raise HTTPException(status_code=503, detail=str(e))
+    except IngestInProgressError as e:
+        record_metrics("error_count", 1, endpoint="ingest")
+        raise HTTPException(status_code=409, detail={"message": str(e), "document_id": e.document_id})
     except asyncio.TimeoutError:
         # Record timeout metrics
         record_metrics("error_count", 1, endpoint="ingest")
@@ -135,34 +281,169 @@ async def ingest_document(
         record_metrics("error_count", 1, endpoint="ingest")
         logging.exception("Ingest failed")
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+
+@app.post("/ingest/batch", response_model=BatchIngestResponse)
+async def ingest_batch(
+    files: List[UploadFile] = File(...),
+    metadata: Optional[str] = Form(None),
+    chunking_strategy: Optional[str] = Form("langchain"),
+    chunk_size: Optional[int] = Form(512),
+    overlap: Optional[int] = Form(64),
+    token: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Ingest many documents in one request. Accepts several files and/or zip/tar archives.
+    Chunks are pooled across documents into full-size embedding batches, stored with
+    Mongo insert_many and upserted to Qdrant in large batches. Returns per-file results.
+    """
+    import time
+    import shutil
+    import tempfile
+    start_time = time.time()
+
+    verify_token(token)
+    if chunking_strategy not in SUPPORTED_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown chunking strategy: {chunking_strategy}")
+
+    os.makedirs(settings.INGEST_SPOOL_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(dir=settings.INGEST_SPOOL_DIR, prefix="batch-")
+    try:
+        items = []
+        for upload in files:
+            path = await spool_upload(upload, work_dir)
+            if is_archive(upload.filename):
+                items.extend(await run_blocking(expand_archive, path, upload.filename, tempfile.mkdtemp(dir=work_dir)))
+                os.remove(path)
+            else:
+                items.append((upload.filename, path))
+
+        # The worker owns (and removes) the spooled files from here on
+        ingest = run_ingest(
+            _ingest_batch_upload, work_dir, items, metadata, chunking_strategy, chunk_size, overlap
+        )
+        work_dir = None
+        results = await ingest
+
+        latency_ms = (time.time() - start_time) * 1000
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        record_metrics("request_count", 1, endpoint="ingest_batch", status="success")
+        record_metrics("query_latency_ms", latency_ms, endpoint="ingest_batch")
+        return BatchIngestResponse(
+            results=[BatchIngestResult(**r) for r in results],
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            latency_ms=latency_ms,
+        )
+    except Exception as e:
+        record_metrics("error_count", 1, endpoint="ingest_batch")
+        logging.exception("Batch ingest failed")
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def _job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        job_id=job["_id"],
+        filename=job["filename"],
+        status=job["status"],
+        stage=job.get("stage", job["status"]),
+        document_id=job.get("document_id"),
+        error=job.get("error"),
+        chunk_counts=job.get("chunk_counts", {}),
+        timings=job.get("timings", {}),
+        created_at=job["created_at"].isoformat() if job.get("created_at") else None,
+        updated_at=job["updated_at"].isoformat() if job.get("updated_at") else None,
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, token: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Get status, current stage, chunk counts and per-stage timings of an ingest job.
+    """
+    verify_token(token)
+    job = await run_blocking(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = 50,
+    token: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    List recent ingest jobs, newest first, optionally filtered by status.
+    """
+    verify_token(token)
+    try:
+        jobs = await run_blocking(get_job_queue().list, status=status, limit=limit)
+        return JobListResponse(jobs=[_job_response(job) for job in jobs])
+    except Exception as e:
+        logging.exception("List jobs failed")
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/documents", response_model=DocumentListResponse)
-async def get_documents(token: HTTPAuthorizationCredentials = Depends(security)):
+async def get_documents(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filename_prefix: Optional[str] = None,
+    category: Optional[str] = None,
+    strategy: Optional[str] = None,
+    format: str = "json",
+    token: HTTPAuthorizationCredentials = Depends(security)
+):
     """
-    List all processed documents from MongoDB.
+    List processed documents from MongoDB, newest first.
+    Returns one page of at most ``limit`` documents and a ``next_cursor`` to pass back
+    for the following page (null on the last page). Filters on filename prefix, metadata
+    category and chunking strategy are applied by MongoDB. With ``format=ndjson`` every
+    matching document (after ``cursor``, if given) is streamed as one JSON object per line.
     """
     import time
     start_time = time.time()
 
     verify_token(token)
+    limit = settings.DOCUMENTS_PAGE_SIZE if limit is None else limit
+    if not 1 <= limit <= settings.DOCUMENTS_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {settings.DOCUMENTS_MAX_PAGE_SIZE}")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
     try:
-        docs = list(mongo_coll.find({}, {"_id": 1, "filename": 1, "doc_metadata": 1, "upload_time": 1, "chunking_strategy": 1, "chunk_size": 1, "overlap": 1}))
-        for d in docs:
-            d["document_id"] = str(d.pop("_id"))
-            # Convert None to empty string for doc_metadata
-            if d.get("doc_metadata") is None:
-                d["doc_metadata"] = ""
-            # Ensure chunking info is present
-            d["chunking_strategy"] = d.get("chunking_strategy", "unknown")
-            d["chunk_size"] = d.get("chunk_size", None)
-            d["overlap"] = d.get("overlap", None)
+        query = listing_filter(filename_prefix, category, strategy, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    collection = get_clients().async_collection("documents")
+
+    if format == "ndjson":
+        async def export():
+            try:
+                async for doc in collection.find(query, LISTING_PROJECTION).sort(LISTING_SORT).batch_size(limit):
+                    yield json.dumps(document_summary(doc)) + "\n"
+            except Exception:
+                record_metrics("error_count", 1, endpoint="documents")
+                logging.exception("Document export failed")
+                raise
+            record_metrics("request_count", 1, endpoint="documents", status="success")
+            record_metrics("query_latency_ms", (time.time() - start_time) * 1000, endpoint="documents")
+
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+
+    try:
+        # One extra document tells whether another page follows.
+        docs = await collection.find(query, LISTING_PROJECTION).sort(LISTING_SORT).limit(limit + 1).to_list(None)
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
 
         # Record successful metrics
         latency_ms = (time.time() - start_time) * 1000
         record_metrics("request_count", 1, endpoint="documents", status="success")
         record_metrics("query_latency_ms", latency_ms, endpoint="documents")
 
-        return DocumentListResponse(documents=docs)
+        return DocumentListResponse(documents=[document_summary(d) for d in docs[:limit]], next_cursor=next_cursor)
     except Exception as e:
         # Record error metrics
         record_metrics("error_count", 1, endpoint="documents")
@@ -176,8 +457,8 @@ async def delete_doc(document_id: str, token: HTTPAuthorizationCredentials = Dep
     """
     verify_token(token)
     try:
-        mongo_coll.delete_one({"_id": ObjectId(document_id)})
-        delete_document(document_id)
+        await get_clients().async_collection("documents").delete_one({"_id": ObjectId(document_id)})
+        await delete_document_async(document_id, get_clients().async_qdrant())
         return DeleteResponse(document_id=document_id, status="deleted")
     except Exception as e:
         logging.exception("Delete failed")
@@ -186,12 +467,14 @@ async def delete_doc(document_id: str, token: HTTPAuthorizationCredentials = Dep
 @app.post("/query", response_model=QueryResponse)
 async def query_rag(
     request: QueryRequest,
+    response: Response,
     strategy: Optional[str] = None,
     token: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     Query the vector DB for relevant chunks using hybrid search.
-    Returns top-k results and query latency.
+    Returns top-k results and query latency. Identical requests are answered from the
+    result cache until the corpus changes; the X-Cache header is HIT or MISS.
     """
     import time
     start_time = time.time()
@@ -202,16 +485,19 @@ async def query_rag(
         if strategy and strategy != "langchain":
             raise HTTPException(status_code=400, detail=f"Unknown strategy: {strategy}")
 
-        from src.storage.vector_db import query_documents
+        from src.storage.query_cache import cached_query_documents
 
-        # Use the existing query_documents function with hybrid search
-        results, latency = query_documents(
+        # Run the blocking search on the blocking executor so concurrent queries overlap
+        # (and their embeddings can share a micro-batch).
+        results, latency, cached = await run_blocking(
+            cached_query_documents,
             query=request.query,
             top_k=request.top_k,
             similarity_threshold=request.similarity_threshold,
             filters=request.filters,
             use_hybrid=request.use_hybrid
         )
+        response.headers["X-Cache"] = "HIT" if cached else "MISS"
 
         # Format results for the response
         out = []
@@ -244,11 +530,11 @@ async def langsmith_traces(token: HTTPAuthorizationCredentials = Depends(securit
     try:
         client = LangSmithClient(api_key=settings.LANGSMITH_API_KEY)
         # List recent runs with proper parameters
-        traces = client.list_runs(
+        traces = await run_blocking(lambda: list(client.list_runs(
             limit=20,
             execution_order=1,  # Only root runs
             error=False,  # Only successful runs
-        )
+        )))
         return {"traces": [t.dict() for t in traces]}
     except Exception as e:
         logging.exception("LangSmith traces failed")
@@ -274,7 +560,7 @@ async def health_check():
 
     # Check MongoDB connection
     try:
-        mongo_client.admin.command('ping')
+        await get_clients().async_mongo().admin.command('ping')
         health_status["dependencies"]["mongodb"] = {
             "status": "healthy",
             "response_time": "~5ms"
@@ -288,11 +574,7 @@ async def health_check():
 
     # Check Qdrant connection
     try:
-        from qdrant_client import QdrantClient
-        QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
-        QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
-        qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, timeout=90.0)
-        collections = qdrant_client.get_collections()
+        collections = await get_clients().async_qdrant().get_collections()
         health_status["dependencies"]["qdrant"] = {
             "status": "healthy",
             "collections": len(collections.collections)
@@ -308,7 +590,7 @@ async def health_check():
     try:
         if settings.LANGSMITH_API_KEY:
             client = LangSmithClient(api_key=settings.LANGSMITH_API_KEY)
-            client.list_runs(limit=1)
+            await run_blocking(lambda: next(iter(client.list_runs(limit=1)), None))
             health_status["dependencies"]["langsmith"] = {
                 "status": "healthy",
                 "configured": True
@@ -324,6 +606,9 @@ async def health_check():
             "error": str(e)
         }
 
+    # Connection pool usage of the shared clients
+    health_status["pools"] = get_clients().pool_stats()
+
     # System metrics (basic version without psutil for now)
     health_status["system"] = {
         "note": "Basic health check - system metrics require psutil package",
@@ -341,12 +626,8 @@ async def get_document_embeddings(document_id: str, token: HTTPAuthorizationCred
     verify_token(token)
     logging.info(f"DEBUG: Token verified for document_id: {document_id}")
     try:
-        from qdrant_client import QdrantClient
         from qdrant_client.http.models import Filter, FieldCondition, MatchValue
 
-        QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
-        QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
-        qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, timeout=90.0)
 
         # Create filter to get all chunks for this document
         qdrant_filter = Filter(must=[FieldCondition(key="mongo_id", match=MatchValue(value=document_id))])
@@ -357,7 +638,7 @@ async def get_document_embeddings(document_id: str, token: HTTPAuthorizationCred
 
         # Get all points for this document
         try:
-            scroll_result = qdrant_client.scroll(
+            scroll_result = await get_clients().async_qdrant().scroll(
                 collection_name="documents",
                 scroll_filter=qdrant_filter,
                 limit=1000,
@@ -380,8 +661,8 @@ async def get_document_embeddings(document_id: str, token: HTTPAuthorizationCred
             embedding_data = {
                 "chunk_index": point.payload.get("chunk_index", i),
                 "text": point.payload.get("text", ""),
-                "vector_dimensions": len(point.vector) if point.vector else 0,
-                "vector_preview": point.vector[:10] if point.vector else [],  # First 10 dimensions
+                "vector_dimensions": len(dense_vector(point.vector)) if point.vector else 0,
+                "vector_preview": dense_vector(point.vector)[:10] if point.vector else [],  # First 10 dimensions
                 "score": None,  # Will be calculated if needed
                 "metadata": {
                     "filename": point.payload.get("filename", ""),
@@ -393,7 +674,7 @@ async def get_document_embeddings(document_id: str, token: HTTPAuthorizationCred
         return {
             "document_id": document_id,
             "total_chunks": len(embeddings_data),
-            "embedding_dimensions": len(points[0].vector) if points and points[0].vector else 0,
+            "embedding_dimensions": len(dense_vector(points[0].vector)) if points and points[0].vector else 0,
             "chunks": embeddings_data
         }
 
@@ -409,10 +690,4 @@ async def metrics():
     Prometheus metrics endpoint for monitoring.
     """
     return prometheus_metrics()
-
-# MongoDB client for document CRUD endpoints
-MONGODB_URI = settings.MONGODB_URI
-MONGO_DB = "rag_db"
-MONGO_COLL = "documents"
-mongo_client = MongoClient(MONGODB_URI)
-mongo_coll = mongo_client[MONGO_DB][MONGO_COLL] 
\ No newline at end of file
+ 
\ No newline at end of file
@@ -8,17 +8,128 @@ class Settings(BaseSettings):
     """
     MONGODB_URI: str
     API_TOKEN: Optional[str] = None
-    QDRANT_URL: str
     LANGSMITH_API_KEY: Optional[str] = None
     AWS_REGION: Optional[str] = "eu-entral-1"
     AWS_SECRET_NAME: Optional[str] = None
     PROMETHEUS_PUSHGATEWAY_URL: Optional[str] = None
 
+    # Qdrant connection: gRPC (QDRANT_GRPC_PORT) is used for searches and upserts when QDRANT_PREFER_GRPC is set;
+    # QDRANT_POOL_SIZE bounds the REST keep-alive connection pool
+    QDRANT_HOST: str
+    QDRANT_PORT: int = 6333
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_TIMEOUT_SECONDS: int = 90
+    QDRANT_POOL_SIZE: int = 32
+    # MongoDB connection pool: size bounds, idle connection lifetime and longest wait for a free connection
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 2
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+
+    # Embedding engine (shared by ingest, query and batch ingestion)
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    EMBEDDING_DEVICE: Optional[str] = None
+    # Encode batches are formed by token length: at most EMBEDDING_BATCH_TOKENS padded tokens
+    # (items x longest item) and EMBEDDING_BATCH_SIZE items per batch
+    EMBEDDING_BATCH_TOKENS: int = 8192
+    EMBEDDING_BATCH_SIZE: int = 256
+    EMBEDDING_NUM_THREADS: Optional[int] = None
+    EMBEDDING_NORMALIZE: bool = False
+    EMBEDDING_WARMUP: bool = True
+    # Inference backend: "torch" (fp32 PyTorch) or "onnx" (ONNX Runtime, needs sentence-transformers[onnx]).
+    # EMBEDDING_ONNX_FILE is the ONNX file inside the model repo or directory; the default is the int8-quantized export.
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_FILE: str = "onnx/model_quint8_avx2.onnx"
+    # Token limit of the embedding model (max_seq_length; 256 for all-MiniLM-L6-v2). Longer input is truncated.
+    EMBEDDING_MAX_TOKENS: int = 256
+
+    # Query embedding micro-batching: concurrent queries wait up to QUERY_BATCH_MAX_WAIT_MS to share one encode call
+    QUERY_BATCHING_ENABLED: bool = True
+    QUERY_BATCH_MAX_WAIT_MS: float = 2.0
+    QUERY_BATCH_MAX_SIZE: int = 32
+    # Query embedding LRU: memory budget in bytes (0 disables) and optional entry lifetime
+    QUERY_EMBEDDING_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: Optional[float] = None
+    # Query result cache: memory budget in bytes (0 disables); the TTL bounds staleness after writes by other processes
+    QUERY_RESULT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUERY_RESULT_CACHE_TTL_SECONDS: Optional[float] = 300.0
+
+    # Hybrid search: "server" fuses dense and sparse BM25 vectors in one Qdrant query (collections created
+    # with sparse vectors), "client" merges vector search with the keyword index; candidates per leg for fusion
+    HYBRID_SEARCH_MODE: str = "server"
+    HYBRID_PREFETCH_LIMIT: int = 50
+    # Client-side hybrid search: the vector (embed + search) and keyword legs run concurrently on a shared pool,
+    # each with its own deadline; a leg that misses it is dropped and the query uses the other
+    VECTOR_LEG_TIMEOUT_MS: float = 3000.0
+    KEYWORD_LEG_TIMEOUT_MS: float = 1000.0
+    RETRIEVAL_LEG_WORKERS: int = 16
+    # API event loop: threads for short blocking calls offloaded by async endpoints (query embedding and search,
+    # job-store reads), threads for synchronous ingest (kept apart so long uploads never queue queries),
+    # and the loop-lag probe interval (0 disables) and lag that logs a warning
+    BLOCKING_EXECUTOR_WORKERS: int = 8
+    INGEST_EXECUTOR_WORKERS: int = 2
+    EVENT_LOOP_LAG_INTERVAL_MS: float = 100.0
+    EVENT_LOOP_LAG_WARN_MS: float = 250.0
+    # Freeze objects allocated during startup out of the garbage collector, so full collections stop
+    # scanning the loaded model (each such pass otherwise stalls the event loop for ~200 ms)
+    GC_FREEZE_AFTER_STARTUP: bool = True
+    # BM25 keyword index: directory of its memory-mapped segments, chunks buffered in memory before a flush,
+    # and longest time ingested chunks stay unflushed (they are searchable in-process meanwhile)
+    KEYWORD_INDEX_DIR: str = "data/keyword_index"
+    KEYWORD_INDEX_FLUSH_CHUNKS: int = 10000
+    KEYWORD_INDEX_FLUSH_INTERVAL_SECONDS: float = 30.0
+
+    # Chunk embedding cache (disk tier is disabled when EMBEDDING_CACHE_DIR is unset)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = 10000
+    EMBEDDING_CACHE_DIR: Optional[str] = None
+    EMBEDDING_CACHE_MAX_DISK_MB: int = 512
+    EMBEDDING_CACHE_SHARD_ROWS: int = 4096
+
+    # Asynchronous ingest jobs (POST /ingest with async_mode=true)
+    INGEST_SPOOL_DIR: str = "/tmp/rag_ingest_spool"
+    INGEST_WORKERS: int = 2
+    INGEST_MAX_PENDING_JOBS: int = 100
+    # Lease an ingest holds on its document record (renewed while it runs); an incomplete ingest of the
+    # same content is only resumed after its lease expired, otherwise the upload gets 409
+    INGEST_LEASE_SECONDS: float = 300.0
+
+    # Streaming ingest: chunks embedded/upserted per window and characters read per TXT/JSON block
+    INGEST_WINDOW_CHUNKS: int = 256
+    INGEST_READ_BLOCK_CHARS: int = 65536
+    # Items (blocks or chunk windows) buffered between pipeline stages (parse -> chunk -> embed -> upsert)
+    INGEST_PIPELINE_QUEUE_SIZE: int = 2
+    # Sentence segmenter for semantic chunking: built-in "rules", or "nltk" (needs nltk and its punkt data)
+    SENTENCE_SEGMENTER: str = "rules"
+    # Similarity chunking: cosine-distance percentile that starts a new chunk, and sentences embedded per batch
+    SEMANTIC_BREAKPOINT_PERCENTILE: float = 90.0
+    SEMANTIC_SENTENCE_BATCH: int = 1024
+    # PDF extraction backend (pypdf2, pymupdf, pdfminer) and process-pool fan-out for large PDFs
+    PDF_EXTRACTOR: str = "pypdf2"
+    PDF_EXTRACT_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 32
+    PDF_PAGES_PER_TASK: int = 8
+    # Qdrant writes: points per upsert request, concurrent requests, and whether each request
+    # waits until the write is applied (False: acknowledge only, confirmed in the background)
+    QDRANT_UPSERT_BATCH_SIZE: int = 256
+    QDRANT_UPSERT_PARALLELISM: int = 4
+    QDRANT_UPSERT_WAIT: bool = True
+    QDRANT_RECONCILE_INTERVAL_SECONDS: float = 2.0
+    QDRANT_RECONCILE_MAX_ATTEMPTS: int = 3
+    # Points awaiting confirmation before further unacknowledged batches are confirmed inline
+    # (~2 KB each with 384-dim float32 vectors and chunk text, so ~40 MB at the default)
+    QDRANT_RECONCILE_MAX_PENDING_POINTS: int = 20000
+    # Batch ingest: chunks pooled across documents before one insert_many/embed/upsert round
+    INGEST_BATCH_WINDOW_CHUNKS: int = 1024
+    # GET /documents: page size when no limit is given, and the largest limit accepted
+    DOCUMENTS_PAGE_SIZE: int = 100
+    DOCUMENTS_MAX_PAGE_SIZE: int = 1000
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 # Usage example:
 # from src.config.settings import Settings
 # settings = Settings()
-# print(settings.MONGODB_URI)
 
 settings = Settings() 
\ No newline at end of file
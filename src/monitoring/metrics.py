@@ -7,12 +7,58 @@ ERROR_COUNT = Counter("error_count", "Total API errors", ["endpoint"])
 CHUNK_SIZE = Gauge("average_chunk_size", "Average chunk size in characters")
 EMBEDDING_TIME = Histogram("embedding_time_seconds", "Embedding generation time")
 QDRANT_LATENCY = Histogram("qdrant_latency_seconds", "Qdrant operation latency", ["operation"])
+EMBEDDING_MODEL_LOAD_TIME = Gauge("embedding_model_load_seconds", "Time taken to load the shared embedding model")
+EMBEDDING_MODEL_MEMORY = Gauge("embedding_model_memory_bytes", "Resident memory added by loading the shared embedding model")
+CHUNK_TOKENS = Histogram("chunk_tokens", "Embedding-model tokens per encoded chunk (before truncation)",
+                         buckets=(16, 32, 64, 128, 192, 256, 384, 512, 1024, 2048))
+EMBEDDING_TOKENS = Counter("embedding_tokens", "Tokens encoded by the embedding model (after truncation)")
+EMBEDDING_PADDING_TOKENS = Counter("embedding_padding_tokens", "Padding tokens added to embedding batches")
+QUERY_EMBEDDING_BATCH_SIZE = Histogram("query_embedding_batch_size", "Queries encoded together per micro-batch",
+                                       buckets=(1, 2, 4, 8, 16, 32, 64))
+EMBEDDING_PADDING_RATIO = Gauge("embedding_padding_ratio", "Share of padding tokens in the last encode call's batches")
+EMBEDDING_TOKENS_PER_SECOND = Gauge("embedding_tokens_per_second", "Tokens encoded per second in the last encode call")
+EMBEDDING_TRUNCATED_CHUNKS = Counter("embedding_truncated_chunks", "Chunks longer than the embedding model's token limit")
+EMBEDDING_TRUNCATED_TOKENS = Counter("embedding_truncated_tokens", "Tokens dropped by embedding-model truncation")
+EMBEDDING_CACHE_HITS = Counter("embedding_cache_hits", "Chunk embeddings served from cache", ["tier"])
+EMBEDDING_CACHE_MISSES = Counter("embedding_cache_misses", "Chunk embeddings not found in cache")
+QUERY_EMBEDDING_CACHE_HITS = Counter("query_embedding_cache_hits", "Query embeddings served from the query cache")
+QUERY_EMBEDDING_CACHE_MISSES = Counter("query_embedding_cache_misses", "Query embeddings not found in the query cache")
+QUERY_EMBEDDING_CACHE_BYTES = Gauge("query_embedding_cache_bytes", "Memory used by the query embedding cache")
+QUERY_RESULT_CACHE_HITS = Counter("query_result_cache_hits", "Query results served from the result cache")
+QUERY_RESULT_CACHE_MISSES = Counter("query_result_cache_misses", "Queries not found in the result cache")
+QUERY_RESULT_CACHE_BYTES = Gauge("query_result_cache_bytes", "Estimated memory used by the query result cache")
+KEYWORD_INDEX_CHUNKS = Gauge("keyword_index_chunks", "Chunks in the BM25 keyword index")
+KEYWORD_INDEX_SEGMENTS = Gauge("keyword_index_segments", "On-disk segments of the BM25 keyword index")
+KEYWORD_SEARCH_LATENCY = Histogram("keyword_search_seconds", "BM25 keyword index search latency")
+KEYWORD_SEARCH_POSTINGS = Histogram("keyword_search_postings", "Postings scored per BM25 keyword search",
+                                    buckets=(10, 100, 1000, 10000, 100000, 1000000))
+RETRIEVAL_LEG_LATENCY = Histogram("retrieval_leg_seconds", "Latency of each hybrid retrieval leg", ["leg"])
+RETRIEVAL_LEG_OUTCOMES = Counter("retrieval_leg_outcomes", "Hybrid retrieval legs by outcome (ok, timeout, error)",
+                                 ["leg", "outcome"])
+EMBEDDING_CACHE_EVICTIONS = Counter("embedding_cache_evictions", "Chunk embeddings evicted from cache", ["tier"])
+INGEST_JOBS = Counter("ingest_jobs", "Asynchronous ingest job transitions", ["status"])
+INGEST_DEDUPLICATED = Counter("ingest_deduplicated", "Uploads short-circuited to an already ingested document")
+QDRANT_UNCONFIRMED_BATCHES = Gauge("qdrant_unconfirmed_batches", "Unacknowledged (wait=False) Qdrant upsert batches awaiting confirmation")
+INGEST_QUEUE_DEPTH = Gauge("ingest_queue_depth", "Items waiting in the queue feeding an ingest pipeline stage", ["stage"])
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "How late the API event loop ran a scheduled probe",
+                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+QDRANT_REQUESTS_IN_FLIGHT = Gauge("qdrant_requests_in_flight", "Qdrant requests in progress", ["client"])
+QDRANT_POOL_UTILIZATION = Gauge("qdrant_pool_utilization", "Qdrant requests in progress / QDRANT_POOL_SIZE", ["client"])
+MONGO_POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Open MongoDB connections", ["client"])
+MONGO_POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out", "MongoDB connections in use", ["client"])
+MONGO_POOL_UTILIZATION = Gauge("mongo_pool_utilization", "MongoDB connections in use / maxPoolSize (busiest server)", ["client"])
+MONGO_POOL_CHECKOUT_LATENCY = Histogram("mongo_pool_checkout_seconds", "Time to check a connection out of the MongoDB pool",
+                                        ["client"], buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+MONGO_POOL_CHECKOUT_FAILURES = Counter("mongo_pool_checkout_failures", "Failed MongoDB connection checkouts (pool exhausted, errors)",
+                                       ["client"])
+INGEST_STAGE_BUSY = Counter("ingest_stage_busy_seconds", "Time ingest pipeline stages spent working (not waiting)", ["stage"])
 
 # For updating chunk size metric
 _chunk_size_sum = 0
 _chunk_count = 0
 
-def record_metrics(metric_name, value, endpoint=None, status=None, operation=None):
+def record_metrics(metric_name, value, endpoint=None, status=None, operation=None, tier=None, stage=None, leg=None,
+                   client=None):
     if metric_name == "query_latency_ms":
         REQUEST_LATENCY.labels(endpoint=endpoint or "query").observe(value / 1000.0)
     elif metric_name == "request_count":
@@ -28,6 +74,82 @@ def record_metrics(metric_name, value, endpoint=None, status=None, operation=Non
         EMBEDDING_TIME.observe(value)
     elif metric_name == "qdrant_latency":
         QDRANT_LATENCY.labels(operation=operation).observe(value)
+    elif metric_name == "embedding_model_load_time":
+        EMBEDDING_MODEL_LOAD_TIME.set(value)
+    elif metric_name == "embedding_model_memory":
+        EMBEDDING_MODEL_MEMORY.set(value)
+    elif metric_name == "chunk_tokens":
+        CHUNK_TOKENS.observe(value)
+    elif metric_name == "embedding_tokens":
+        EMBEDDING_TOKENS.inc(value)
+    elif metric_name == "embedding_padding_tokens":
+        EMBEDDING_PADDING_TOKENS.inc(value)
+    elif metric_name == "query_embedding_batch_size":
+        QUERY_EMBEDDING_BATCH_SIZE.observe(value)
+    elif metric_name == "embedding_padding_ratio":
+        EMBEDDING_PADDING_RATIO.set(value)
+    elif metric_name == "embedding_tokens_per_second":
+        EMBEDDING_TOKENS_PER_SECOND.set(value)
+    elif metric_name == "embedding_truncated_chunks":
+        EMBEDDING_TRUNCATED_CHUNKS.inc(value)
+    elif metric_name == "embedding_truncated_tokens":
+        EMBEDDING_TRUNCATED_TOKENS.inc(value)
+    elif metric_name == "embedding_cache_hit":
+        EMBEDDING_CACHE_HITS.labels(tier=tier).inc(value)
+    elif metric_name == "embedding_cache_miss":
+        EMBEDDING_CACHE_MISSES.inc(value)
+    elif metric_name == "query_embedding_cache_hit":
+        QUERY_EMBEDDING_CACHE_HITS.inc(value)
+    elif metric_name == "query_embedding_cache_miss":
+        QUERY_EMBEDDING_CACHE_MISSES.inc(value)
+    elif metric_name == "query_embedding_cache_bytes":
+        QUERY_EMBEDDING_CACHE_BYTES.set(value)
+    elif metric_name == "query_result_cache_hit":
+        QUERY_RESULT_CACHE_HITS.inc(value)
+    elif metric_name == "query_result_cache_miss":
+        QUERY_RESULT_CACHE_MISSES.inc(value)
+    elif metric_name == "query_result_cache_bytes":
+        QUERY_RESULT_CACHE_BYTES.set(value)
+    elif metric_name == "keyword_index_chunks":
+        KEYWORD_INDEX_CHUNKS.set(value)
+    elif metric_name == "keyword_index_segments":
+        KEYWORD_INDEX_SEGMENTS.set(value)
+    elif metric_name == "keyword_search_latency":
+        KEYWORD_SEARCH_LATENCY.observe(value)
+    elif metric_name == "keyword_search_postings":
+        KEYWORD_SEARCH_POSTINGS.observe(value)
+    elif metric_name == "retrieval_leg_latency":
+        RETRIEVAL_LEG_LATENCY.labels(leg=leg).observe(value)
+    elif metric_name == "retrieval_leg_outcome":
+        RETRIEVAL_LEG_OUTCOMES.labels(leg=leg, outcome=status).inc(value)
+    elif metric_name == "embedding_cache_eviction":
+        EMBEDDING_CACHE_EVICTIONS.labels(tier=tier).inc(value)
+    elif metric_name == "ingest_job":
+        INGEST_JOBS.labels(status=status).inc(value)
+    elif metric_name == "ingest_deduplicated":
+        INGEST_DEDUPLICATED.inc(value)
+    elif metric_name == "qdrant_unconfirmed_batches":
+        QDRANT_UNCONFIRMED_BATCHES.set(value)
+    elif metric_name == "ingest_queue_depth":
+        INGEST_QUEUE_DEPTH.labels(stage=stage).set(value)
+    elif metric_name == "ingest_stage_busy":
+        INGEST_STAGE_BUSY.labels(stage=stage).inc(value)
+    elif metric_name == "event_loop_lag":
+        EVENT_LOOP_LAG.observe(value)
+    elif metric_name == "qdrant_requests_in_flight":
+        QDRANT_REQUESTS_IN_FLIGHT.labels(client=client).set(value)
+    elif metric_name == "qdrant_pool_utilization":
+        QDRANT_POOL_UTILIZATION.labels(client=client).set(value)
+    elif metric_name == "mongo_pool_connections":
+        MONGO_POOL_CONNECTIONS.labels(client=client).set(value)
+    elif metric_name == "mongo_pool_checked_out":
+        MONGO_POOL_CHECKED_OUT.labels(client=client).set(value)
+    elif metric_name == "mongo_pool_utilization":
+        MONGO_POOL_UTILIZATION.labels(client=client).set(value)
+    elif metric_name == "mongo_pool_checkout_latency":
+        MONGO_POOL_CHECKOUT_LATENCY.labels(client=client).observe(value)
+    elif metric_name == "mongo_pool_checkout_failure":
+        MONGO_POOL_CHECKOUT_FAILURES.labels(client=client).inc(value)
 
 
 def prometheus_metrics():
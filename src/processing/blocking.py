@@ -0,0 +1,80 @@
+"""
+Dedicated thread pools for blocking work called from async endpoints.
+
+Short calls (query embedding and search, job-store reads, archive expansion, startup
+steps) run on the blocking pool of ``BLOCKING_EXECUTOR_WORKERS`` threads. Synchronous
+ingest (``POST /ingest`` and ``/ingest/batch``) parses, chunks and embeds whole
+documents and can hold a thread for minutes, so it runs on a separate ingest pool of
+``INGEST_EXECUTOR_WORKERS`` threads. Uploads queue behind each other there without
+delaying queries.
+
+Both pools are separate from the event loop's default executor. ``asyncio.wait_for``
+on a pooled call cannot free the thread when it times out: the call keeps running to
+completion on its pool. Ingest calls are never cancelled once submitted, even while
+still queued, so they can own resources such as the spooled upload they remove.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from src.config.settings import settings
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(name: str, workers: int) -> ThreadPoolExecutor:
+    executor = _executors.get(name)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=name)
+                _executors[name] = executor
+    return executor
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide executor for short blocking calls, creating it on first use.
+    """
+    return _get_executor("blocking", settings.BLOCKING_EXECUTOR_WORKERS)
+
+
+def get_ingest_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide executor for synchronous document ingest, creating it on first use.
+    """
+    return _get_executor("ingest", settings.INGEST_EXECUTOR_WORKERS)
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """
+    Run ``fn(*args, **kwargs)`` on the blocking executor and await its result.
+    """
+    call = functools.partial(fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_blocking_executor(), call)
+
+
+def run_ingest(fn: Callable, *args, **kwargs) -> asyncio.Future:
+    """
+    Submit the ingest call ``fn(*args, **kwargs)`` to the ingest executor and return an
+    awaitable for its result. The call is submitted immediately and runs to completion
+    even if the awaitable is cancelled, e.g. by a timeout or the request going away.
+    Must be called from a running event loop.
+    """
+    future = get_ingest_executor().submit(fn, *args, **kwargs)
+    return asyncio.shield(asyncio.wrap_future(future, loop=asyncio.get_running_loop()))
+
+
+def shutdown_blocking_executor() -> None:
+    """
+    Wait for running blocking and ingest work to finish and release the executors' threads.
+    """
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
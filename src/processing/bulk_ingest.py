@@ -0,0 +1,316 @@
+"""
+Parallel, resumable bulk ingestion of documents from arbitrary directories.
+
+Files are discovered recursively (with glob filters), parsed and chunked in a process
+pool, and fed to a single embedding stage in the main process which stores them in
+cross-document windows (see ``store_chunked_documents``). Every completed file is
+appended to a manifest (path, size, mtime, sha256) so an interrupted run resumes where
+it stopped. Run metrics are printed at the end and pushed to the Prometheus Pushgateway
+when one is configured.
+
+Usage:
+    python -m src.processing.bulk_ingest sample_data/ /data/corpus --include "*.txt" --workers 4
+"""
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional
+
+from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+
+from src.processing.streaming import SUPPORTED_DOC_TYPES, chunk_blocks, file_digest, open_blocks
+
+logger = logging.getLogger("bulk_ingest")
+
+DEFAULT_INCLUDE = ["*.txt", "*.json", "*.pdf"]
+DEFAULT_MANIFEST = "bulk_ingest_manifest.jsonl"
+
+
+def discover_files(paths: List[str], include: List[str], exclude: List[str], recursive: bool = True) -> Iterator[str]:
+    """
+    Yield files under ``paths`` whose name matches an include glob and no exclude glob.
+    Args:
+        paths (List[str]): Files or directories to scan.
+        include (List[str]): Glob patterns a file name must match.
+        exclude (List[str]): Glob patterns (matched against name and relative path) to skip.
+        recursive (bool): Descend into subdirectories.
+    """
+    def wanted(root, path):
+        name = os.path.basename(path)
+        relative = os.path.relpath(path, root)
+        if any(fnmatch.fnmatch(name, pat) or fnmatch.fnmatch(relative, pat) for pat in exclude):
+            return False
+        return any(fnmatch.fnmatch(name, pat) for pat in include)
+
+    for root in paths:
+        if os.path.isfile(root):
+            if wanted(os.path.dirname(root), root):
+                yield os.path.abspath(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            if not recursive:
+                dirnames.clear()
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                if wanted(root, path):
+                    yield os.path.abspath(path)
+
+
+def choose_strategy(doc_type: str, text_length: int):
+    """
+    Heuristic for the best chunking strategy (inherited from batch_ingest_sample_data).
+    Returns:
+        Tuple[str, int, int]: strategy, chunk_size, overlap.
+    """
+    if doc_type == "json":
+        return "semantic", 512, 32
+    if text_length < 1000:
+        return "fixed", 256, 0
+    if text_length < 5000:
+        return "langchain", 512, 64
+    return "sliding", 512, 128
+
+
+def parse_and_chunk(path: str, strategy: str, chunk_size: int, overlap: int) -> dict:
+    """
+    Process-pool worker: hash, parse and chunk one file.
+    Returns:
+        dict: File stats plus ``chunks`` (``ChunkSpans`` for fixed/sliding, so overlapping text
+        is pickled once), their PDF ``pages`` and the chunking parameters used, or ``error``.
+    """
+    stat = os.stat(path)
+    result = {"path": path, "filename": os.path.basename(path), "size": stat.st_size, "mtime": stat.st_mtime}
+    try:
+        result["sha256"] = file_digest(path)
+        doc_type = path.rsplit(".", 1)[-1].lower()
+        if doc_type not in SUPPORTED_DOC_TYPES:
+            raise ValueError(f"Unsupported document type: {doc_type}")
+        blocks, page_tracker = open_blocks(path, doc_type)
+        if strategy == "auto":
+            text = "".join(blocks)
+            strategy, chunk_size, overlap = choose_strategy(doc_type, len(text))
+            blocks = [text]
+        chunks, pages = chunk_blocks(blocks, strategy, chunk_size, overlap, page_tracker)
+        result.update(
+            chunks=chunks,
+            pages=pages,
+            strategy=strategy,
+            chunk_size=chunk_size,
+            overlap=overlap,
+        )
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+class Manifest:
+    """
+    Append-only JSONL record of completed files; the last entry per path wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from an interrupted run
+                    self.entries[entry["path"]] = entry
+
+    def is_unchanged(self, path: str) -> bool:
+        """True if ``path`` was completed and its size and mtime have not changed since."""
+        entry = self.entries.get(path)
+        if entry is None:
+            return False
+        stat = os.stat(path)
+        return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def has_content(self, path: str, sha256: str) -> bool:
+        entry = self.entries.get(path)
+        return entry is not None and entry.get("sha256") == sha256
+
+    def record(self, entries: List[dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self.entries[entry["path"]] = entry
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def push_run_metrics(gateway_url: str, stats: dict, job: str = "bulk_ingest") -> None:
+    """
+    Push the run's totals to a Prometheus Pushgateway.
+    """
+    registry = CollectorRegistry()
+    gauges = {
+        "documents": Gauge("bulk_ingest_documents", "Documents ingested by the last bulk ingest run", registry=registry),
+        "skipped": Gauge("bulk_ingest_skipped", "Documents skipped as already ingested", registry=registry),
+        "failed": Gauge("bulk_ingest_failed", "Documents that failed to ingest", registry=registry),
+        "chunks": Gauge("bulk_ingest_chunks", "Chunks ingested by the last bulk ingest run", registry=registry),
+        "bytes": Gauge("bulk_ingest_bytes", "Bytes ingested by the last bulk ingest run", registry=registry),
+        "elapsed": Gauge("bulk_ingest_duration_seconds", "Wall time of the last bulk ingest run", registry=registry),
+    }
+    for key, gauge in gauges.items():
+        gauge.set(stats[key])
+    push_to_gateway(gateway_url, job=job, registry=registry)
+
+
+def run(paths: List[str], include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+        recursive: bool = True, strategy: str = "auto", chunk_size: int = 512, overlap: int = 64,
+        workers: Optional[int] = None, manifest_path: str = DEFAULT_MANIFEST, doc_metadata: Optional[str] = None,
+        window_chunks: Optional[int] = None, pushgateway_url: Optional[str] = None) -> dict:
+    """
+    Bulk-ingest every matching file under ``paths``, skipping files already in the manifest.
+    Returns:
+        dict: Run statistics (documents, skipped, failed, chunks, bytes, elapsed and rates).
+    """
+    from src.config.settings import settings
+    from src.processing.embeddings import warmup
+    from src.processing.ingest_rag import store_chunked_documents
+    from src.storage.keyword_index import shutdown_keyword_index
+    from src.storage.qdrant_writes import shutdown_upsert_reconciler
+
+    window_chunks = window_chunks or settings.INGEST_BATCH_WINDOW_CHUNKS
+    workers = workers or os.cpu_count() or 1
+    manifest = Manifest(manifest_path)
+    stats = {"documents": 0, "skipped": 0, "failed": 0, "chunks": 0, "bytes": 0}
+    start = time.time()
+
+    candidates = []
+    for path in discover_files(paths, include or DEFAULT_INCLUDE, exclude or [], recursive):
+        if manifest.is_unchanged(path):
+            stats["skipped"] += 1
+        else:
+            candidates.append(path)
+    logger.info(f"{len(candidates)} files to ingest ({stats['skipped']} already in manifest {manifest_path})")
+
+    # Start the pool before loading the model so workers stay small.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    warmup()
+
+    pending: List[dict] = []
+    pending_chunks = 0
+
+    def flush():
+        nonlocal pending, pending_chunks
+        if not pending:
+            return
+        results = store_chunked_documents(
+            [dict(doc, doc_metadata=doc_metadata, content_hash=doc["sha256"]) for doc in pending]
+        )
+        completed = []
+        for doc, result in zip(pending, results):
+            if result["status"] == "success":
+                stats["documents"] += 1
+                stats["chunks"] += result["chunks"]
+                stats["bytes"] += doc["size"]
+                completed.append({
+                    "path": doc["path"], "size": doc["size"], "mtime": doc["mtime"], "sha256": doc["sha256"],
+                    "document_id": result["document_id"], "chunks": result["chunks"], "completed_at": time.time(),
+                })
+                logger.info(f"Ingested {doc['path']} (mongo_id={result['document_id']}, strategy={doc['strategy']})")
+            else:
+                stats["failed"] += 1
+                logger.error(f"Failed to ingest {doc['path']}: {result['error']}")
+        manifest.record(completed)
+        pending, pending_chunks = [], 0
+
+    try:
+        queue = iter(candidates)
+        in_flight = set()
+        max_in_flight = workers * 4
+        while True:
+            while len(in_flight) < max_in_flight:
+                path = next(queue, None)
+                if path is None:
+                    break
+                in_flight.add(pool.submit(parse_and_chunk, path, strategy, chunk_size, overlap))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                parsed = future.result()
+                if "error" in parsed:
+                    stats["failed"] += 1
+                    logger.error(f"Failed to parse {parsed['path']}: {parsed['error']}")
+                    continue
+                if manifest.has_content(parsed["path"], parsed["sha256"]):
+                    # Touched but unchanged: refresh size/mtime without re-ingesting.
+                    manifest.record([dict(manifest.entries[parsed["path"]], size=parsed["size"], mtime=parsed["mtime"])])
+                    stats["skipped"] += 1
+                    continue
+                pending.append(parsed)
+                pending_chunks += len(parsed["chunks"])
+                if pending_chunks >= window_chunks:
+                    flush()
+        flush()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        # Confirm unacknowledged (QDRANT_UPSERT_WAIT=false) writes before reporting.
+        shutdown_upsert_reconciler()
+        shutdown_keyword_index()
+
+    elapsed = max(time.time() - start, 1e-9)
+    stats.update(
+        elapsed=elapsed,
+        docs_per_s=stats["documents"] / elapsed,
+        chunks_per_s=stats["chunks"] / elapsed,
+        mb_per_s=stats["bytes"] / (1024 * 1024) / elapsed,
+    )
+    gateway = pushgateway_url if pushgateway_url is not None else settings.PROMETHEUS_PUSHGATEWAY_URL
+    if gateway:
+        try:
+            push_run_metrics(gateway, stats)
+        except Exception as e:
+            logger.warning(f"Could not push metrics to {gateway}: {e}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest documents from one or more directories.")
+    parser.add_argument("paths", nargs="+", help="Files or directories to ingest.")
+    parser.add_argument("--include", action="append", help="Glob of file names to include (repeatable). Default: *.txt, *.json, *.pdf")
+    parser.add_argument("--exclude", action="append", default=[], help="Glob of names/relative paths to exclude (repeatable).")
+    parser.add_argument("--no-recursive", dest="recursive", action="store_false", help="Do not descend into subdirectories.")
+    parser.add_argument("--strategy", default="auto", choices=["auto", "langchain", "fixed", "sliding", "token", "semantic"],
+                        help="Chunking strategy; 'auto' picks one per file by type and length.")
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None, help="Parse/chunk processes (default: CPU count).")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Manifest of completed files used to resume runs.")
+    parser.add_argument("--metadata", default=None, help="JSON metadata attached to every document.")
+    parser.add_argument("--window-chunks", type=int, default=None, help="Chunks pooled per embed/upsert window.")
+    parser.add_argument("--pushgateway", default=None, help="Pushgateway URL (default: PROMETHEUS_PUSHGATEWAY_URL).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    stats = run(
+        args.paths, include=args.include, exclude=args.exclude, recursive=args.recursive,
+        strategy=args.strategy, chunk_size=args.chunk_size, overlap=args.overlap, workers=args.workers,
+        manifest_path=args.manifest, doc_metadata=args.metadata, window_chunks=args.window_chunks,
+        pushgateway_url=args.pushgateway,
+    )
+    print(
+        f"Ingested {stats['documents']} documents ({stats['chunks']} chunks, {stats['bytes'] / (1024 * 1024):.2f} MB) "
+        f"in {stats['elapsed']:.2f}s; skipped {stats['skipped']}, failed {stats['failed']}\n"
+        f"{stats['docs_per_s']:.2f} docs/s, {stats['chunks_per_s']:.2f} chunks/s, {stats['mb_per_s']:.2f} MB/s"
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
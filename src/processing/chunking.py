@@ -1,15 +1,150 @@
 """
 Chunking module for splitting documents into smaller pieces for embedding and retrieval.
 """
-from typing import List
-import nltk
-from nltk.tokenize import sent_tokenize
+from array import array
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+
+from src.config.settings import settings
+from src.processing.sentences import split_sentences
+
+SPAN_STRATEGIES = ("fixed", "sliding", "token")
+
+
+class ChunkSpans(Sequence[str]):
+    """
+    Chunks stored as (start, end) offsets into one shared text instead of as separate strings.
+    Offsets live in two ``array('q')`` tables (16 bytes per chunk), so overlapping chunks
+    never duplicate text; indexing or iterating materializes the chunk text on demand.
+    Args:
+        text (str): The text the offsets refer to.
+        starts, ends: Optional initial offset tables.
+    """
+
+    __slots__ = ("text", "starts", "ends")
+
+    def __init__(self, text: str, starts: Sequence[int] = (), ends: Sequence[int] = ()):
+        self.text = text
+        self.starts = array("q", starts)
+        self.ends = array("q", ends)
+
+    def append(self, start: int, end: int) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return ChunkSpans(self.text, self.starts[index], self.ends[index])
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in zip(self.starts, self.ends):
+            yield text[start:end]
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self.starts[index], self.ends[index]
+
+    def spans(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+    @property
+    def offsets_nbytes(self) -> int:
+        """Bytes used by the offsets table (the shared text is not counted)."""
+        return (len(self.starts) + len(self.ends)) * self.starts.itemsize
+
+
+def chunk_spans(text: str, strategy: str = "fixed", chunk_size: int = 512, overlap: int = 50) -> ChunkSpans:
+    """
+    Compute fixed, sliding-window or token chunk boundaries without copying any text.
+    The spans materialize to exactly the chunks ``chunk_document`` returns.
+    Args:
+        text (str): The document text.
+        strategy (str): 'fixed', 'sliding' or 'token'.
+        chunk_size (int): Size of each chunk (in model tokens for 'token').
+        overlap (int): Overlap size for sliding window.
+    Returns:
+        ChunkSpans: Offsets of every chunk into ``text``.
+    Raises:
+        ValueError: If the strategy has no span form or the sliding step is not positive.
+    """
+    length = len(text)
+    if strategy == "fixed":
+        starts = range(0, length, chunk_size)
+        return ChunkSpans(text, starts, (min(start + chunk_size, length) for start in starts))
+    if strategy == "sliding":
+        if length <= chunk_size:
+            return ChunkSpans(text, [0], [length])
+        step = chunk_size - overlap
+        if step <= 0:
+            raise ValueError("overlap must be smaller than chunk_size for sliding chunking")
+        starts = range(0, length - chunk_size + 1, step)
+        return ChunkSpans(text, starts, (start + chunk_size for start in starts))
+    if strategy == "token":
+        spans = ChunkSpans(text)
+        for _, start, end in iter_token_spans([text], chunk_size, overlap):
+            spans.append(start, end)
+        return spans
+    raise ValueError(f"Strategy '{strategy}' has no span-based chunker")
+
+
+def token_window(chunk_size: int) -> int:
+    """
+    Effective ``token`` chunk size: at most the embedding model's limit minus the two
+    special tokens ([CLS]/[SEP]) it adds, so no chunk is ever truncated.
+    """
+    return max(1, min(chunk_size, settings.EMBEDDING_MAX_TOKENS - 2))
+
+
+def iter_token_spans(blocks: Iterable[str], chunk_size: int = 254, overlap: int = 32) -> Iterator[Tuple[str, int, int]]:
+    """
+    Stream chunks of ``chunk_size`` embedding-model tokens (``overlap`` tokens shared by
+    consecutive chunks) over text blocks, with their character offsets in the
+    concatenated text. Each block is tokenized once with the model's fast tokenizer;
+    the token that may continue into the next block is carried over with the unfinished tail.
+    Yields:
+        Tuple[str, int, int]: Chunk text, start offset and end offset.
+    Raises:
+        ValueError: If the overlap is not smaller than the chunk size or no fast tokenizer is available.
+    """
+    from src.processing.embeddings import get_tokenizer
+
+    tokenizer = get_tokenizer()
+    if tokenizer is None or not getattr(tokenizer, "is_fast", False):
+        raise ValueError("token chunking needs the embedding model's fast tokenizer")
+    size = token_window(chunk_size)
+    step = size - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than chunk_size for token chunking")
+
+    def offsets(text):
+        return tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)["offset_mapping"]
+
+    buffer = ""
+    buffer_start = 0  # absolute offset of buffer[0]
+    for block in blocks:
+        buffer += block
+        tokens = offsets(buffer)
+        start = 0
+        while start + size < len(tokens):
+            s, e = tokens[start][0], tokens[start + size - 1][1]
+            yield buffer[s:e], buffer_start + s, buffer_start + e
+            start += step
+        if start:
+            cut = tokens[start][0]
+            buffer = buffer[cut:]
+            buffer_start += cut
+    tokens = offsets(buffer)
+    start = 0
+    while start < len(tokens):
+        s, e = tokens[start][0], tokens[min(start + size, len(tokens)) - 1][1]
+        yield buffer[s:e], buffer_start + s, buffer_start + e
+        if start + size >= len(tokens):
+            break
+        start += step
 
-# Ensure punkt is downloaded (safe to call repeatedly)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
 
 def chunk_document(document, doc_type: str, strategy: str = "fixed", chunk_size: int = 512, overlap: int = 50) -> List[str]:
     """
@@ -17,8 +152,8 @@ def chunk_document(document, doc_type: str, strategy: str = "fixed", chunk_size:
     Args:
         document: The document content (str or dict).
         doc_type (str): The type of document (txt, json, pdf).
-        strategy (str): Chunking strategy ('fixed', 'sliding', 'semantic').
-        chunk_size (int): Size of each chunk.
+        strategy (str): Chunking strategy ('fixed', 'sliding', 'token', 'semantic', 'similarity').
+        chunk_size (int): Size of each chunk (in model tokens for 'token').
         overlap (int): Overlap size for sliding window.
     Returns:
         List[str]: List of text chunks.
@@ -28,15 +163,11 @@ def chunk_document(document, doc_type: str, strategy: str = "fixed", chunk_size:
     else:
         text = document
 
-    if strategy == "fixed":
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-    elif strategy == "sliding":
-        if len(text) <= chunk_size:
-            return [text]
-        return [text[i:i+chunk_size] for i in range(0, len(text)-chunk_size+1, chunk_size-overlap)]
+    if strategy in SPAN_STRATEGIES:
+        return list(chunk_spans(text, strategy, chunk_size, overlap))
     elif strategy == "semantic":
-        # Use sentence tokenization, then group sentences into chunks
-        sentences = sent_tokenize(text)
+        # Split into sentences, then group sentences into chunks
+        sentences = split_sentences(text)
         chunks = []
         current_chunk = ""
         for sent in sentences:
@@ -49,5 +180,9 @@ def chunk_document(document, doc_type: str, strategy: str = "fixed", chunk_size:
         if current_chunk:
             chunks.append(current_chunk)
         return chunks
+    elif strategy == "similarity":
+        from src.processing.semantic_chunking import similarity_chunks
+
+        return similarity_chunks([text], chunk_size)
     else:
         raise ValueError(f"Unknown chunking strategy: {strategy}") 
\ No newline at end of file
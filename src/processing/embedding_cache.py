@@ -0,0 +1,405 @@
+"""
+Content-addressed cache for chunk embeddings.
+
+Entries are keyed by (model id, hash of the normalized chunk text) so identical chunk
+text is only ever encoded once per model, regardless of which document or chunking
+strategy produced it. Two tiers are kept:
+
+- an in-memory LRU of recently used vectors, and
+- an optional on-disk tier made of fixed-size, memory-mapped float32 shards. When the
+  disk tier grows past its byte budget the oldest shard is dropped as a whole.
+
+Several processes (the API and the ``bulk_ingest`` CLI) may share one
+``EMBEDDING_CACHE_DIR``: writers serialize on an exclusive ``fcntl`` lock on the
+directory and re-read the shard key files before appending, so rows and keys stay
+aligned and each process picks up the entries the others wrote.
+
+Query vectors have a separate ``QueryEmbeddingCache``: a byte-bounded LRU with an
+optional TTL, so repeated queries skip the encoder entirely.
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+_SHARD_RE = re.compile(r"^shard_(\d{6})_(\d+)\.f32$")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize chunk text before hashing.
+    Unicode is NFC-normalized and whitespace runs are collapsed; neither changes the
+    tokens a BERT-style tokenizer produces, so the embedding is unaffected.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_id: str, text: str) -> str:
+    """
+    Build the content-addressed cache key for a chunk.
+    Args:
+        model_id (str): Identifier of the model (and options) that produced the vector.
+        text (str): Raw chunk text.
+    Returns:
+        str: Hex digest identifying the (model, text) pair.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiskShardStore:
+    """
+    On-disk embedding tier backed by memory-mapped float32 shards.
+
+    Each shard is a pair of files: ``shard_<n>_<dim>.f32`` holding ``shard_rows`` vectors
+    and ``shard_<n>_<dim>.keys`` listing the key stored in each written row. A row is
+    flushed before its key is appended, so a crash never leaves a key without a vector.
+    Writes hold an exclusive lock on ``<directory>/.lock`` and first catch up with the
+    key files, so processes sharing the directory never write the same row.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, shard_rows: int = 4096):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.shard_rows = shard_rows
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._shards: "OrderedDict[int, dict]" = OrderedDict()
+        self._current: Dict[int, int] = {}  # dim -> shard id being filled
+        self._next_id = 0
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock():
+            self._refresh()
+        if self._index:
+            logger.info(f"Loaded {len(self._index)} cached embeddings from {len(self._shards)} shards in {directory}")
+
+    def _paths(self, shard_id: int, dim: int) -> Tuple[str, str]:
+        base = os.path.join(self.directory, f"shard_{shard_id:06d}_{dim}")
+        return base + ".f32", base + ".keys"
+
+    @contextmanager
+    def _write_lock(self):
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """
+        Catch up with shards and keys written or evicted by other processes.
+        Called with the write lock held; only key-file bytes not yet seen are read.
+        """
+        found = {}
+        for name in os.listdir(self.directory):
+            match = _SHARD_RE.match(name)
+            if match:
+                found[int(match.group(1))] = int(match.group(2))
+        for shard_id in [shard_id for shard_id in self._shards if shard_id not in found]:
+            self._forget(shard_id)
+        for shard_id, dim in sorted(found.items()):
+            data_path, keys_path = self._paths(shard_id, dim)
+            shard = self._shards.get(shard_id)
+            if shard is None:
+                vectors = np.memmap(data_path, dtype=np.float32, mode="r+", shape=(self.shard_rows, dim))
+                shard = {"dim": dim, "vectors": vectors, "keys": [], "offset": 0}
+                self._shards[shard_id] = shard
+            if os.path.exists(keys_path):
+                with open(keys_path, "r", encoding="ascii") as f:
+                    f.seek(shard["offset"])
+                    appended = f.read()
+                # A writer that died mid-line leaves a partial key; the next append overwrites it.
+                appended = appended[: appended.rfind("\n") + 1]
+                shard["offset"] += len(appended)
+                for key in appended.split():
+                    if len(shard["keys"]) >= self.shard_rows:
+                        break
+                    self._index.setdefault(key, (shard_id, len(shard["keys"])))
+                    shard["keys"].append(key)
+            if len(shard["keys"]) < self.shard_rows:
+                self._current[dim] = shard_id
+            elif self._current.get(dim) == shard_id:
+                del self._current[dim]
+            self._next_id = max(self._next_id, shard_id + 1)
+        self._shards = OrderedDict(sorted(self._shards.items()))
+
+    def _forget(self, shard_id: int) -> None:
+        shard = self._shards.pop(shard_id)
+        for key in shard["keys"]:
+            if self._index.get(key, (None,))[0] == shard_id:
+                del self._index[key]
+        if self._current.get(shard["dim"]) == shard_id:
+            del self._current[shard["dim"]]
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self.shard_rows * s["dim"] * 4 for s in self._shards.values())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        location = self._index.get(key)
+        if location is None:
+            return None
+        shard_id, row = location
+        return np.array(self._shards[shard_id]["vectors"][row])
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]) -> int:
+        """
+        Append vectors to the current shard for their dimension.
+        All rows are flushed before their keys are recorded.
+        Returns:
+            int: Number of entries evicted to stay within the byte budget.
+        """
+        with self._write_lock():
+            self._refresh()
+            return self._append(items)
+
+    def _append(self, items: Sequence[Tuple[str, np.ndarray]]) -> int:
+        pending: Dict[int, List[str]] = {}
+        for key, vector in items:
+            if key in self._index:
+                continue
+            dim = int(vector.shape[0])
+            shard_id = self._current.get(dim)
+            if shard_id is None or len(self._shards[shard_id]["keys"]) + len(pending.get(shard_id, [])) >= self.shard_rows:
+                shard_id = self._new_shard(dim)
+            shard = self._shards[shard_id]
+            shard_pending = pending.setdefault(shard_id, [])
+            row = len(shard["keys"]) + len(shard_pending)
+            shard["vectors"][row] = vector
+            shard_pending.append(key)
+            self._index[key] = (shard_id, row)
+        for shard_id, keys in pending.items():
+            shard = self._shards[shard_id]
+            shard["vectors"].flush()
+            _, keys_path = self._paths(shard_id, shard["dim"])
+            lines = "".join(key + "\n" for key in keys)
+            with open(keys_path, "r+" if os.path.exists(keys_path) else "w", encoding="ascii") as f:
+                f.seek(shard["offset"])
+                f.write(lines)
+                f.truncate()
+            shard["keys"].extend(keys)
+            shard["offset"] += len(lines)
+        return self._evict() if pending else 0
+
+    def _new_shard(self, dim: int) -> int:
+        shard_id = self._next_id
+        self._next_id += 1
+        data_path, keys_path = self._paths(shard_id, dim)
+        vectors = np.memmap(data_path, dtype=np.float32, mode="w+", shape=(self.shard_rows, dim))
+        open(keys_path, "w").close()
+        self._shards[shard_id] = {"dim": dim, "vectors": vectors, "keys": [], "offset": 0}
+        self._current[dim] = shard_id
+        return shard_id
+
+    def _evict(self) -> int:
+        evicted = 0
+        while len(self._shards) > 1 and self.size_bytes > self.max_bytes:
+            shard_id, shard = next(iter(self._shards.items()))
+            if self._current.get(shard["dim"]) == shard_id:
+                break
+            self._forget(shard_id)
+            evicted += len(shard["keys"])
+            data_path, keys_path = self._paths(shard_id, shard["dim"])
+            del shard["vectors"]
+            for path in (data_path, keys_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    logger.warning(f"Could not remove evicted embedding shard {path}")
+        return evicted
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + optional disk shards) embedding cache. Thread-safe.
+    """
+
+    def __init__(self, memory_entries: int = 10000, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024, shard_rows: int = 4096):
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk = DiskShardStore(disk_dir, max_disk_bytes, shard_rows) if disk_dir else None
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up several keys, promoting disk hits into the memory tier.
+        Returns:
+            List[Optional[np.ndarray]]: The cached vector for each key, or None on a miss.
+        """
+        results: List[Optional[np.ndarray]] = []
+        memory_hits = disk_hits = misses = 0
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    memory_hits += 1
+                elif self._disk is not None and (vector := self._disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    disk_hits += 1
+                else:
+                    misses += 1
+                results.append(vector)
+        if memory_hits:
+            record_metrics("embedding_cache_hit", memory_hits, tier="memory")
+        if disk_hits:
+            record_metrics("embedding_cache_hit", disk_hits, tier="disk")
+        if misses:
+            record_metrics("embedding_cache_miss", misses)
+        return results
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Store freshly computed vectors in both tiers.
+        """
+        disk_evicted = 0
+        with self._lock:
+            items = [(key, np.asarray(vector, dtype=np.float32)) for key, vector in zip(keys, vectors)]
+            for key, vector in items:
+                self._remember(key, vector)
+            if self._disk is not None:
+                disk_evicted = self._disk.put_many(items)
+        if disk_evicted:
+            record_metrics("embedding_cache_eviction", disk_evicted, tier="disk")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        evicted = 0
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            evicted += 1
+        if evicted:
+            record_metrics("embedding_cache_eviction", evicted, tier="memory")
+
+
+class QueryEmbeddingCache:
+    """
+    Byte-bounded LRU of query vectors with an optional time-to-live. Thread-safe.
+    An entry's size is its vector bytes plus its key and a fixed bookkeeping overhead,
+    so the budget holds for any embedding dimension.
+    Args:
+        max_bytes (int): Memory budget; least recently used entries are evicted beyond it.
+        ttl_seconds (float, optional): Age after which an entry is treated as a miss.
+    """
+
+    ENTRY_OVERHEAD_BYTES = 200
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _entry_bytes(self, key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key) + self.ENTRY_OVERHEAD_BYTES
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Return the cached vector for ``key``, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_metrics("query_embedding_cache_hit" if entry is not None else "query_embedding_cache_miss", 1)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: str, vector: Sequence[float]) -> None:
+        """
+        Store a vector, evicting least recently used entries beyond the byte budget.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        size = self._entry_bytes(key, vector)
+        if size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (vector, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                evicted += 1
+            size_bytes = self._bytes
+        if evicted:
+            record_metrics("embedding_cache_eviction", evicted, tier="query")
+        record_metrics("query_embedding_cache_bytes", size_bytes)
+
+    def _drop(self, key: str) -> None:
+        vector, _ = self._entries.pop(key)
+        self._bytes -= self._entry_bytes(key, vector)
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+_query_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Return the process-wide embedding cache, or None when caching is disabled.
+    """
+    global _cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+                    disk_dir=settings.EMBEDDING_CACHE_DIR,
+                    max_disk_bytes=settings.EMBEDDING_CACHE_MAX_DISK_MB * 1024 * 1024,
+                    shard_rows=settings.EMBEDDING_CACHE_SHARD_ROWS,
+                )
+    return _cache
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """
+    Return the process-wide query embedding cache, or None when it is disabled
+    (``QUERY_EMBEDDING_CACHE_MAX_BYTES`` is 0).
+    """
+    global _query_cache
+    if settings.QUERY_EMBEDDING_CACHE_MAX_BYTES <= 0:
+        return None
+    if _query_cache is None:
+        with _cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryEmbeddingCache(
+                    settings.QUERY_EMBEDDING_CACHE_MAX_BYTES, settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+                )
+    return _query_cache
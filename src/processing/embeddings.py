@@ -1,29 +1,326 @@
 """
 Embeddings module for generating vector representations of text chunks using sentence-transformers.
+
+A single process-wide model instance is shared by document ingestion, querying and
+batch ingestion. Call ``warmup()`` once at startup so requests never pay the load cost.
+
+``EMBEDDING_BACKEND=onnx`` runs the model with ONNX Runtime instead of PyTorch, by
+default from its dynamically int8-quantized export (``EMBEDDING_ONNX_FILE``; see
+``src.processing.onnx_export``). Its vectors stay within cosine similarity 0.99 of the
+fp32 model's, so existing collections keep working.
 """
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+import psutil
 from sentence_transformers import SentenceTransformer
-from typing import List
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+from src.processing.embedding_cache import cache_key, get_embedding_cache, get_query_embedding_cache
+
+logger = logging.getLogger(__name__)
 
 _model = None
+_model_lock = threading.Lock()
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_token_stats_enabled = True
+
+
+def _backend_kwargs() -> dict:
+    """
+    SentenceTransformer keyword arguments selecting the configured inference backend.
+    Raises:
+        ValueError: If EMBEDDING_BACKEND is not 'torch' or 'onnx'.
+    """
+    if settings.EMBEDDING_BACKEND == "torch":
+        return {}
+    if settings.EMBEDDING_BACKEND != "onnx":
+        raise ValueError(f"Unknown embedding backend: {settings.EMBEDDING_BACKEND} (expected 'torch' or 'onnx')")
+    model_kwargs = {"file_name": settings.EMBEDDING_ONNX_FILE, "provider": "CPUExecutionProvider"}
+    if settings.EMBEDDING_NUM_THREADS:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = settings.EMBEDDING_NUM_THREADS
+        model_kwargs["session_options"] = options
+    return {"backend": "onnx", "model_kwargs": model_kwargs}
+
+
+def _load_model() -> SentenceTransformer:
+    """
+    Load the configured sentence-transformers model and record load time and memory.
+    Returns:
+        SentenceTransformer: The loaded embedding model.
+    """
+    if settings.EMBEDDING_NUM_THREADS:
+        import torch
+        torch.set_num_threads(settings.EMBEDDING_NUM_THREADS)
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.time()
+    model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME, device=settings.EMBEDDING_DEVICE, **_backend_kwargs())
+    load_time = time.time() - start
+    rss_added = max(process.memory_info().rss - rss_before, 0)
+
+    if getattr(model, "max_seq_length", settings.EMBEDDING_MAX_TOKENS) != settings.EMBEDDING_MAX_TOKENS:
+        logger.warning(
+            f"EMBEDDING_MAX_TOKENS={settings.EMBEDDING_MAX_TOKENS} but {settings.EMBEDDING_MODEL_NAME} "
+            f"truncates at {model.max_seq_length} tokens; token-based chunks will be sized wrongly"
+        )
+    record_metrics("embedding_model_load_time", load_time)
+    record_metrics("embedding_model_memory", rss_added)
+    logger.info(
+        f"Loaded embedding model {settings.EMBEDDING_MODEL_NAME} ({settings.EMBEDDING_BACKEND}) in {load_time:.2f}s "
+        f"(+{rss_added / (1024 * 1024):.1f} MB RSS)"
+    )
+    return model
+
 
 def get_model() -> SentenceTransformer:
     """
-    Load or return a cached instance of the sentence-transformers model.
+    Load or return the shared instance of the sentence-transformers model.
     Returns:
         SentenceTransformer: The loaded embedding model.
     """
     global _model
     if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
     return _model
 
-def embed_chunks(chunks: List[str]) -> List[List[float]]:
+
+def _hub_model_id(name: str) -> str:
+    # sentence-transformers resolves bare model names under the sentence-transformers org.
+    if "/" in name or os.path.isdir(name):
+        return name
+    return f"sentence-transformers/{name}"
+
+
+def get_tokenizer():
+    """
+    Return the fast tokenizer of the embedding model, loaded once per process.
+    The loaded model's own tokenizer is reused; otherwise (e.g. in chunking-only worker
+    processes) only the tokenizer files are loaded, not the model weights.
+    Returns:
+        The tokenizer, or None if the loaded model does not expose one.
+    """
+    global _tokenizer
+    if _tokenizer is not None:
+        return _tokenizer
+    if _model is not None:
+        return getattr(_model, "tokenizer", None)
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            from transformers import AutoTokenizer
+
+            _tokenizer = AutoTokenizer.from_pretrained(_hub_model_id(settings.EMBEDDING_MODEL_NAME), use_fast=True)
+    return _tokenizer
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    """
+    Count the tokens the embedding model sees for each text, special tokens included
+    and before truncation.
+    """
+    tokenizer = get_tokenizer()
+    encoded = tokenizer(list(texts), add_special_tokens=True, return_attention_mask=False,
+                        return_token_type_ids=False, verbose=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def _token_lengths(texts: List[str]) -> Optional[List[int]]:
+    """
+    Count the model tokens of each text, for batching and token metrics.
+    Best effort: disabled for the process if no tokenizer is available.
+    Returns:
+        Optional[List[int]]: Token count per text, or None without a tokenizer.
+    """
+    global _token_stats_enabled
+    if not _token_stats_enabled:
+        return None
+    try:
+        if get_tokenizer() is None:
+            return None
+        return count_tokens(texts)
+    except Exception as e:
+        logger.info(f"Token statistics disabled, tokenizer unavailable: {e}")
+        _token_stats_enabled = False
+        return None
+
+
+def _record_chunk_tokens(lengths: List[int]) -> None:
+    """
+    Record tokens per stored chunk and what EMBEDDING_MAX_TOKENS truncates of them.
+    """
+    limit = settings.EMBEDDING_MAX_TOKENS
+    truncated_chunks = truncated_tokens = 0
+    for length in lengths:
+        record_metrics("chunk_tokens", length)
+        if length > limit:
+            truncated_chunks += 1
+            truncated_tokens += length - limit
+    if truncated_chunks:
+        record_metrics("embedding_truncated_chunks", truncated_chunks)
+        record_metrics("embedding_truncated_tokens", truncated_tokens)
+
+
+def plan_batches(lengths: List[int], token_budget: int, max_items: int) -> List[List[int]]:
+    """
+    Group texts into length-bucketed batches: indices are sorted longest first and each
+    batch grows while its padded size (items x longest item) stays within ``token_budget``,
+    so short texts form large batches and long ones small batches with little padding.
+    Args:
+        lengths (List[int]): Token length of each text (after truncation).
+        token_budget (int): Maximum padded tokens per batch; a single longer text gets a batch of its own.
+        max_items (int): Maximum texts per batch.
+    Returns:
+        List[List[int]]: Indices into ``lengths``, one list per batch.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        if current and (len(current) >= max_items or (len(current) + 1) * lengths[current[0]] > token_budget):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def warmup() -> None:
+    """
+    Load the shared model and run a throwaway encode so the first real request is fast.
+    """
+    _encode(["warmup"])
+
+
+def model_id() -> str:
+    """
+    Identify the model and encode options that determine vector values.
+    Used to key cached embeddings so a model or option change never serves stale vectors.
+    """
+    identity = f"{settings.EMBEDDING_MODEL_NAME}|normalize={settings.EMBEDDING_NORMALIZE}"
+    if settings.EMBEDDING_BACKEND != "torch":
+        # Quantized vectors are close to, not equal to, the fp32 ones; cache them separately.
+        identity += f"|backend={settings.EMBEDDING_BACKEND}:{settings.EMBEDDING_ONNX_FILE}"
+    return identity
+
+
+def _encode(texts: List[str], lengths: Optional[List[int]] = None) -> List[List[float]]:
+    """
+    Encode texts in length-bucketed batches (see ``plan_batches``) and return the
+    vectors in input order. Records tokens/s and the padding ratio when token counts
+    are available.
+    Args:
+        texts (List[str]): Texts to encode.
+        lengths (List[int], optional): Their token counts, if the caller already has them.
+    """
+    model = get_model()
+    if lengths is None:
+        lengths = _token_lengths(texts)
+    measured = lengths is not None
+    if not measured:
+        # No tokenizer: estimate about four characters per token for bucketing.
+        lengths = [len(text) // 4 + 2 for text in texts]
+    clipped = [min(length, settings.EMBEDDING_MAX_TOKENS) for length in lengths]
+    vectors: List[List[float]] = [None] * len(texts)
+    tokens = padding = 0
+    start = time.perf_counter()
+    for batch in plan_batches(clipped, settings.EMBEDDING_BATCH_TOKENS, settings.EMBEDDING_BATCH_SIZE):
+        encoded = model.encode(
+            [texts[i] for i in batch],
+            batch_size=len(batch),
+            normalize_embeddings=settings.EMBEDDING_NORMALIZE,
+            show_progress_bar=False,
+        )
+        for i, vector in zip(batch, encoded):
+            vectors[i] = vector.tolist()
+        used = sum(clipped[i] for i in batch)
+        tokens += used
+        padding += clipped[batch[0]] * len(batch) - used
+    elapsed = time.perf_counter() - start
+    if measured and tokens:
+        record_metrics("embedding_tokens", tokens)
+        record_metrics("embedding_padding_tokens", padding)
+        record_metrics("embedding_padding_ratio", padding / (tokens + padding))
+        if elapsed > 0:
+            record_metrics("embedding_tokens_per_second", tokens / elapsed)
+    return vectors
+
+
+def embed_chunks(chunks: List[str], chunk_stats: bool = True) -> List[List[float]]:
     """
     Generate embeddings for a list of text chunks.
+    Cached vectors are reused and duplicate chunks within the call are encoded once.
+    Token counts are recorded for every chunk, cached or duplicate ones included.
     Args:
         chunks (List[str]): List of text strings to embed.
+        chunk_stats (bool): Record per-chunk token and truncation metrics; False when
+            the texts are not stored chunks (e.g. sentences for similarity chunking).
     Returns:
         List[List[float]]: List of embedding vectors.
     """
-    model = get_model()
-    return model.encode(chunks, show_progress_bar=True).tolist() 
\ No newline at end of file
+    if not chunks:
+        return []
+    lengths = _token_lengths(chunks) if chunk_stats else None
+    if lengths is not None:
+        _record_chunk_tokens(lengths)
+    cache = get_embedding_cache()
+    if cache is None:
+        return _encode(chunks, lengths)
+
+    current_model = model_id()
+    keys = [cache_key(current_model, chunk) for chunk in chunks]
+    unique_keys = list(dict.fromkeys(keys))
+    cached = dict(zip(unique_keys, cache.get_many(unique_keys)))
+    missing = [key for key in unique_keys if cached[key] is None]
+    if missing:
+        first = {}
+        for index, key in enumerate(keys):
+            first.setdefault(key, index)
+        vectors = _encode(
+            [chunks[first[key]] for key in missing],
+            [lengths[first[key]] for key in missing] if lengths is not None else None,
+        )
+        cache.put_many(missing, vectors)
+        cached.update(zip(missing, vectors))
+    return [
+        vector.tolist() if hasattr(vector, "tolist") else list(vector)
+        for vector in (cached[key] for key in keys)
+    ]
+
+
+def embed_query(query: str) -> List[float]:
+    """
+    Generate the embedding for a single query string.
+    Repeated queries are served from the query embedding cache (keyed by model id);
+    with QUERY_BATCHING_ENABLED, concurrent misses are encoded together (see ``query_batcher``).
+    Args:
+        query (str): The search query.
+    Returns:
+        List[float]: The query embedding vector.
+    """
+    cache = get_query_embedding_cache()
+    if cache is not None:
+        key = cache_key(model_id(), query)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.tolist()
+    if settings.QUERY_BATCHING_ENABLED:
+        from src.processing.query_batcher import get_query_batcher
+
+        vector = get_query_batcher(lambda texts: _encode(texts)).embed(query)
+    else:
+        vector = _encode([query])[0]
+    if cache is not None:
+        cache.put(key, vector)
+    return vector
@@ -1,108 +1,278 @@
 import os
 import json
+import hashlib
 import logging
+import threading
 import time
-from pymongo import MongoClient
+import uuid
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import PointStruct, VectorParams, Distance
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from qdrant_client.http.models import PointStruct, VectorParams, Distance, Filter, FieldCondition, MatchValue
 from langsmith import traceable  # Added import
 import datetime
+from itertools import islice
 from src.config.settings import settings
 from urllib.parse import urlparse
 from src.monitoring.metrics import record_metrics
-import uuid
-from src.processing.chunking import chunk_document
+from src.processing.embeddings import embed_chunks
+from src.processing.pipeline import StagedPipeline
+from src.processing.chunking import SPAN_STRATEGIES, ChunkSpans
+from src.processing.semantic_chunking import SimilarityChunks, iter_similarity_chunks
+from src.processing.streaming import chunk_blocks, content_blocks, file_digest, iter_chunk_spans, iter_chunks, open_blocks
+from src.storage.clients import get_clients
+from src.storage.documents import metadata_category
+from src.storage.qdrant_writes import BatchedUpserter, get_upsert_reconciler
+from src.storage.keyword_index import get_keyword_index
+from src.storage.query_cache import bump_corpus_generation
+from src.storage.sparse_vectors import forget_sparse_support, sparse_support, sparse_vectors_config, with_sparse_vectors
+from src.storage.vector_db import point_id
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# MongoDB client for document storage
-MONGODB_URI = settings.MONGODB_URI
-MONGO_DB = "rag_db"
+# MongoDB collection of ingested documents and the Qdrant collection of their chunks
 MONGO_COLL = "documents"
-mongo_client = MongoClient(MONGODB_URI)
-mongo_coll = mongo_client[MONGO_DB][MONGO_COLL]
-
-# Qdrant client for vector storage
-QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
-QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
 QDRANT_COLLECTION = "documents"
-qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, timeout=90.0)
 
-@traceable(name="ingest_document_rag")
-def ingest_document_rag(filename, doc_content, doc_metadata, strategy="langchain", chunk_size=512, overlap=64):
+SUPPORTED_STRATEGIES = ("langchain", "fixed", "sliding", "token", "semantic", "similarity")
+INGEST_PROCESSING = "processing"
+INGEST_COMPLETE = "complete"
+
+
+class IngestInProgressError(RuntimeError):
+    """Raised when the same content is already being ingested under a live lease."""
+
+    def __init__(self, document_id):
+        super().__init__(f"The same content is already being ingested as document {document_id}")
+        self.document_id = document_id
+
+
+_ingest_index_ready = False
+_upserter = None
+_upserter_lock = threading.Lock()
+_collection_lock = threading.Lock()
+
+
+def _documents():
+    return get_clients().collection(MONGO_COLL)
+
+
+def _no_progress(stage, **chunk_counts):
+    pass
+
+
+def _get_upserter():
+    global _upserter
+    if _upserter is None:
+        with _upserter_lock:
+            if _upserter is None:
+                reconciler = None
+                if not settings.QDRANT_UPSERT_WAIT:
+                    reconciler = get_upsert_reconciler(get_clients().qdrant, QDRANT_COLLECTION)
+                _upserter = BatchedUpserter(
+                    get_clients().qdrant,
+                    QDRANT_COLLECTION,
+                    batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+                    parallelism=settings.QDRANT_UPSERT_PARALLELISM,
+                    wait=settings.QDRANT_UPSERT_WAIT,
+                    reconciler=reconciler,
+                )
+    return _upserter
+
+
+def _ensure_collection(dim):
     """
-    Store document in MongoDB, chunk/embed, upsert to Qdrant. Returns mongo_id.
-    Supports strategies: langchain, fixed, sliding, semantic.
-    Args:
-        filename: Name of the file being ingested
-        doc_content: Content of the document
-        doc_metadata: Metadata for the document
-        strategy: Chunking strategy
-        chunk_size: Size of each chunk
-        overlap: Overlap for sliding window
+    Create the Qdrant collection if it does not exist. Returns True if it was created.
+    New collections get the sparse BM25 vector used for server-side hybrid search.
     """
-    logger.info(f"Starting ingestion for {filename} with strategy: {strategy}")
+    with _collection_lock:
+        if get_clients().qdrant.collection_exists(collection_name=QDRANT_COLLECTION):
+            return False
+        logger.info(f"Creating Qdrant collection {QDRANT_COLLECTION}")
+        get_clients().qdrant.create_collection(
+            collection_name=QDRANT_COLLECTION,
+            vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+            sparse_vectors_config=sparse_vectors_config(),
+        )
+        forget_sparse_support(QDRANT_COLLECTION)
+        return True
 
-    # Store in MongoDB
-    doc = {
+
+def _sparse_enabled(dim):
+    """
+    Whether upserted points get sparse BM25 vectors, i.e. the collection has them configured.
+    A missing collection is created first (with sparse vectors); collections created before
+    sparse vectors were introduced keep dense-only points.
+    """
+    supported = sparse_support(get_clients().qdrant, QDRANT_COLLECTION)
+    if supported is None:
+        _ensure_collection(dim)
+        supported = sparse_support(get_clients().qdrant, QDRANT_COLLECTION)
+    return bool(supported)
+
+
+def _upsert_points(points):
+    """
+    Upsert points to Qdrant in parallel batches (see ``BatchedUpserter``), creating
+    the collection on first use. Point ids are deterministic, so re-sending after a
+    failure overwrites whatever part of the batch already landed. Points are sent with
+    a sparse BM25 vector when the collection has one configured.
+    """
+    if not points:
+        return
+    dim = len(points[0].vector)
+    upserter = _get_upserter()
+    # Keyword hits are resolved against Qdrant, so indexing ahead of the upsert never returns
+    # a missing point. Buffered in memory (and searchable) until _flush_keyword_index.
+    try:
+        get_keyword_index().add_points(points)
+    except Exception as e:
+        logger.error(f"Failed to add {len(points)} points to the keyword index: {e}")
+    try:
+        # Creates a missing collection, so the collection and its sparse support are
+        # settled before the points are built.
+        if _sparse_enabled(dim):
+            points = with_sparse_vectors(points)
+        qdrant_start = time.time()
+        upserter.upsert(points)
+        logger.info(f"Upserted {len(points)} points to Qdrant in {time.time() - qdrant_start:.2f}s")
+    except Exception as e:
+        logger.error(f"Failed to upsert to Qdrant: {str(e)}")
+        raise RuntimeError(f"Failed to upsert to Qdrant: {str(e)}")
+    finally:
+        # Part of the batch may have landed even on failure; cached query results are stale either way.
+        bump_corpus_generation()
+
+
+def _flush_keyword_index():
+    """
+    Persist the chunks indexed for keyword search so far, once a flush is due (see
+    ``KeywordIndex.flush_if_due``). Qdrant stays the source of truth, so a failure is
+    logged rather than failing the ingest; the index can be rebuilt with
+    ``python -m src.storage.keyword_index rebuild``.
+    """
+    try:
+        get_keyword_index().flush_if_due()
+    except Exception as e:
+        logger.error(f"Failed to persist the keyword index: {e}")
+
+
+def _parse_metadata(doc_metadata):
+    return json.loads(doc_metadata) if isinstance(doc_metadata, str) else doc_metadata
+
+
+def ingest_key(content_hash, strategy, chunk_size, overlap):
+    """
+    Identify an ingest by the document bytes and the chunking parameters applied to them.
+    The same bytes chunked differently produce different chunks, so they get a different key.
+    """
+    return hashlib.sha256(f"{content_hash}|{strategy}|{chunk_size}|{overlap}".encode("utf-8")).hexdigest()
+
+
+def _ensure_ingest_index():
+    """
+    Create the unique index on ``ingest_key`` once per process. It is sparse so documents
+    stored before content hashing was introduced are unaffected.
+    """
+    global _ingest_index_ready
+    if _ingest_index_ready:
+        return
+    try:
+        _documents().create_index("ingest_key", unique=True, sparse=True)
+    except Exception as e:
+        logger.warning(f"Could not create ingest_key index: {e}")
+    _ingest_index_ready = True
+
+
+def _lease_expiry():
+    return datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.INGEST_LEASE_SECONDS)
+
+
+def _document_record(filename, size, doc_metadata, strategy, chunk_size, overlap, content_hash=None, lease_owner=None):
+    record = {
         "filename": filename,
         "doc_metadata": doc_metadata,
+        "doc_metadata_category": metadata_category(doc_metadata),
         "upload_time": datetime.datetime.utcnow(),
-        "size": len(str(doc_content)),
+        "size": size,
         "chunking_strategy": strategy,
         "chunk_size": chunk_size,
         "overlap": overlap,
     }
+    if content_hash:
+        record.update(
+            content_hash=content_hash,
+            ingest_key=ingest_key(content_hash, strategy, chunk_size, overlap),
+            ingest_status=INGEST_PROCESSING,
+            ingest_lease_owner=lease_owner,
+            ingest_lease_until=_lease_expiry(),
+        )
+    return record
+
+
+def _claim_document(doc):
+    """
+    Insert the document record, or find the record already holding its ingest key.
+    Returns:
+        Tuple[ObjectId, Optional[dict]]: The mongo_id to ingest under and the existing
+        record when the key was already taken (None if a new record was inserted).
+    """
+    if "ingest_key" in doc:
+        _ensure_ingest_index()
+        existing = _documents().find_one({"ingest_key": doc["ingest_key"]})
+        if existing is not None:
+            return existing["_id"], existing
     try:
-        mongo_id = mongo_coll.insert_one(doc).inserted_id
-    except Exception as e:
-        logger.error(f"Failed to store document in MongoDB: {str(e)}")
-        raise RuntimeError(f"Failed to store document in MongoDB: {str(e)}")
+        return _documents().insert_one(doc).inserted_id, None
+    except DuplicateKeyError:
+        # A concurrent upload of the same bytes won the insert.
+        existing = _documents().find_one({"ingest_key": doc["ingest_key"]})
+        if existing is None:
+            raise
+        return existing["_id"], existing
 
-    # Chunking
-    logger.info(f"Processing with strategy: {strategy}")
-    if isinstance(doc_content, dict):
-        text = json.dumps(doc_content)
-        doc_type = "json"
-    else:
-        text = str(doc_content)
-        doc_type = "txt"
-
-    if strategy == "langchain":
-        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
-        chunks = splitter.split_text(text)
-    elif strategy in ("fixed", "sliding", "semantic"):
-        chunks = chunk_document(text, doc_type, strategy=strategy, chunk_size=chunk_size, overlap=overlap)
-    else:
-        logger.warning(f"Strategy '{strategy}' is not supported. Using 'langchain' instead.")
-        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
-        chunks = splitter.split_text(text)
-
-    logger.info(f"Created {len(chunks)} chunks")
-
-    # Record chunk size metrics
-    for chunk in chunks:
-        record_metrics("chunk_size", len(chunk))
-
-    logger.info("Loading HuggingFace embeddings model...")
-    embedder = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    logger.info("Generating embeddings...")
-    embedding_start = time.time()
-    embeddings = embedder.embed_documents(chunks)
-    embedding_time = time.time() - embedding_start
-    record_metrics("embedding_time", embedding_time)
-    logger.info(f"Generated {len(embeddings)} embeddings in {embedding_time:.2f}s")
-
-    # Upsert to Qdrant
-    qdrant = qdrant_client
+
+def _take_over(existing, lease_owner):
+    """
+    Atomically claim an incomplete record whose ingest stopped renewing its lease (the
+    process died or the ingest failed without cleaning up), so it can be resumed.
+    Returns:
+        bool: False if another ingest still holds the lease.
+    """
+    claimed = _documents().find_one_and_update(
+        {
+            "_id": existing["_id"],
+            "ingest_status": INGEST_PROCESSING,
+            "$or": [{"ingest_lease_until": None}, {"ingest_lease_until": {"$lt": datetime.datetime.utcnow()}}],
+        },
+        {"$set": {"ingest_lease_owner": lease_owner, "ingest_lease_until": _lease_expiry()}},
+    )
+    return claimed is not None
+
+
+def _renew_lease(mongo_id, lease_owner):
+    """
+    Extend the lease of a running ingest. Raises if another ingest took the record over.
+    """
+    result = _documents().update_one(
+        {"_id": mongo_id, "ingest_lease_owner": lease_owner}, {"$set": {"ingest_lease_until": _lease_expiry()}}
+    )
+    if result.matched_count == 0:
+        raise RuntimeError(f"Lost the ingest lease of document {mongo_id} to another ingest")
+
+
+def _build_points(mongo_id, filename, chunks, embeddings, start_index, doc_metadata_dict, strategy, chunk_size, overlap,
+                  pages=None, offsets=None):
+    """
+    Build Qdrant points for consecutive chunks of one document, starting at chunk ``start_index``.
+    ``pages`` optionally gives the (first, last) PDF page of each chunk and ``offsets`` its
+    (start, end) character offsets in the document text.
+    """
     points = []
-    doc_metadata_dict = json.loads(doc_metadata) if isinstance(doc_metadata, str) else doc_metadata
-    for i, (emb, chunk) in enumerate(zip(embeddings, chunks)):
+    for offset, (emb, chunk) in enumerate(zip(embeddings, chunks)):
+        i = start_index + offset
         payload = {
             "mongo_id": str(mongo_id),
             "filename": filename,
@@ -113,29 +283,415 @@ def ingest_document_rag(filename, doc_content, doc_metadata, strategy="langchain
             "chunk_size": chunk_size,
             "overlap": overlap,
         }
+        if offsets:
+            payload["char_start"], payload["char_end"] = offsets[offset]
+        page_range = pages[offset] if pages else None
+        if page_range is not None:
+            payload["page_start"], payload["page_end"] = page_range
         # Flatten category for filtering
         if doc_metadata_dict and isinstance(doc_metadata_dict, dict) and "category" in doc_metadata_dict:
             payload["doc_metadata_category"] = doc_metadata_dict["category"]
-        points.append(PointStruct(id=str(uuid.uuid4()), vector=emb, payload=payload))
-    logger.info(f"Prepared {len(points)} points for Qdrant")
+        points.append(PointStruct(id=point_id(mongo_id, i), vector=emb, payload=payload))
+    return points
+
+
+def _remove_partial_document(mongo_id, lease_owner=None):
+    """
+    Best-effort removal of a document whose ingestion failed part way through. With a
+    ``lease_owner`` nothing is removed unless that ingest still holds the record's lease.
+    """
     try:
-        qdrant_start = time.time()
-        qdrant.upsert(collection_name=QDRANT_COLLECTION, points=points)
-        qdrant_time = time.time() - qdrant_start
-        record_metrics("qdrant_latency", qdrant_time, operation="upsert")
-        logger.info(f"Successfully upserted to Qdrant in {qdrant_time:.2f}s")
+        selector = {"_id": mongo_id}
+        if lease_owner is not None:
+            selector["ingest_lease_owner"] = lease_owner
+        if _documents().delete_one(selector).deleted_count == 0 and lease_owner is not None:
+            logger.warning(f"Not cleaning up document {mongo_id}: another ingest has taken it over")
+            return
+        get_clients().qdrant.delete(
+            collection_name=QDRANT_COLLECTION,
+            points_selector=Filter(must=[FieldCondition(key="mongo_id", match=MatchValue(value=str(mongo_id)))]),
+        )
     except Exception as e:
-        if not qdrant_client.collection_exists(collection_name=QDRANT_COLLECTION):
-            logger.info(f"Creating Qdrant collection {QDRANT_COLLECTION}")
-            qdrant_client.recreate_collection(
-                collection_name=QDRANT_COLLECTION,
-                vectors_config=VectorParams(size=len(embeddings[0]), distance=Distance.COSINE),
-            )
-            qdrant.upsert(collection_name=QDRANT_COLLECTION, points=points)
-            logger.info("Successfully created collection and upserted to Qdrant")
+        logger.warning(f"Could not clean up partially ingested document {mongo_id}: {e}")
+    try:
+        get_keyword_index().delete_document(str(mongo_id))
+    except Exception as e:
+        logger.warning(f"Could not remove partially ingested document {mongo_id} from the keyword index: {e}")
+    finally:
+        bump_corpus_generation()
+
+
+def _ingest_blocks(filename, blocks, size, doc_metadata, strategy, chunk_size, overlap, progress, content_hash=None,
+                   page_tracker=None):
+    """
+    Store document metadata in MongoDB, then run the text blocks through a staged
+    parse -> chunk -> embed -> upsert pipeline in windows of INGEST_WINDOW_CHUNKS chunks,
+    so memory stays bounded and stages overlap. Returns mongo_id.
+    When ``content_hash`` is given and the same content was already ingested completely
+    with the same chunking parameters, the existing mongo_id is returned without any work;
+    an incomplete earlier attempt is resumed under its mongo_id, and because point ids
+    are derived from (mongo_id, chunk index) its points are overwritten, not duplicated.
+    Each ingest holds a lease on its record, renewed as windows are upserted; an attempt
+    is only resumed once its lease (``INGEST_LEASE_SECONDS``) has expired, otherwise
+    ``IngestInProgressError`` is raised.
+    With a ``page_tracker`` (PDFs) each chunk's page range is stored in its payload.
+    """
+    if strategy not in SUPPORTED_STRATEGIES:
+        logger.warning(f"Strategy '{strategy}' is not supported. Using 'langchain' instead.")
+        strategy = "langchain"
+    logger.info(f"Starting ingestion for {filename} with strategy: {strategy}")
+
+    # Store in MongoDB
+    lease_owner = uuid.uuid4().hex if content_hash else None
+    doc = _document_record(filename, size, doc_metadata, strategy, chunk_size, overlap, content_hash, lease_owner)
+    try:
+        mongo_id, existing = _claim_document(doc)
+    except Exception as e:
+        logger.error(f"Failed to store document in MongoDB: {str(e)}")
+        raise RuntimeError(f"Failed to store document in MongoDB: {str(e)}")
+    if existing is not None:
+        if existing.get("ingest_status") == INGEST_COMPLETE:
+            logger.info(f"{filename} is identical to already ingested document {mongo_id}; skipping")
+            record_metrics("ingest_deduplicated", 1)
+            progress("done", chunks_total=existing.get("chunk_count", 0))
+            return str(mongo_id)
+        if not _take_over(existing, lease_owner):
+            logger.info(f"{filename} is already being ingested as {mongo_id}")
+            raise IngestInProgressError(str(mongo_id))
+        logger.info(f"Resuming incomplete ingestion of {filename} under mongo_id {mongo_id}")
+
+    doc_metadata_dict = _parse_metadata(doc_metadata)
+
+    def chunk_windows(block_stream):
+        with_offsets = strategy in SPAN_STRATEGIES
+        with_vectors = strategy == "similarity"
+        if with_offsets:
+            chunk_stream = iter_chunk_spans(block_stream, strategy, chunk_size=chunk_size, overlap=overlap)
+        elif with_vectors:
+            # (chunk, vector): vectors are pooled from the sentence embeddings the chunker computed
+            chunk_stream = iter_similarity_chunks(block_stream, chunk_size=chunk_size)
         else:
-            logger.error(f"Failed to upsert to Qdrant: {str(e)}")
-            raise RuntimeError(f"Failed to upsert to Qdrant: {str(e)}")
+            chunk_stream = ((chunk, None, None) for chunk in iter_chunks(
+                block_stream, strategy, chunk_size=chunk_size, overlap=overlap
+            ))
+        while True:
+            window = list(islice(chunk_stream, settings.INGEST_WINDOW_CHUNKS))
+            if not window:
+                return
+            chunks = [item[0] for item in window]
+            for chunk in chunks:
+                record_metrics("chunk_size", len(chunk))
+            offsets = [(start, end) for _, start, end in window] if with_offsets else None
+            vectors = [vector for _, vector in window] if with_vectors else None
+            pages = None
+            if page_tracker is not None:
+                if with_offsets:
+                    pages = [page_tracker.page_range(start, end) for start, end in offsets]
+                else:
+                    pages = [page_tracker.locate(chunk) for chunk in chunks]
+            yield chunks, pages, offsets, vectors
+
+    def embed_windows(windows):
+        for chunks, pages, offsets, vectors in windows:
+            if vectors is not None:
+                yield chunks, pages, offsets, vectors
+                continue
+            embedding_start = time.time()
+            embeddings = embed_chunks(chunks)
+            record_metrics("embedding_time", time.time() - embedding_start)
+            yield chunks, pages, offsets, embeddings
+
+    def upsert_windows(embedded):
+        upserted = 0
+        renewed = time.time()
+        for chunks, pages, offsets, embeddings in embedded:
+            if lease_owner is not None and time.time() - renewed > settings.INGEST_LEASE_SECONDS / 3:
+                _renew_lease(mongo_id, lease_owner)
+                renewed = time.time()
+            points = _build_points(
+                mongo_id, filename, chunks, embeddings, upserted, doc_metadata_dict, strategy, chunk_size, overlap,
+                pages, offsets,
+            )
+            _upsert_points(points)
+            upserted += len(points)
+            yield upserted
 
+    # parse -> chunk -> embed -> upsert on separate threads, so embedding window N+1
+    # overlaps the upsert of window N while bounded queues keep memory flat.
+    pipeline = StagedPipeline(
+        [
+            ("parsing", lambda _: blocks),
+            ("chunking", chunk_windows),
+            ("embedding", embed_windows),
+            ("upserting", upsert_windows),
+        ],
+        queue_size=settings.INGEST_PIPELINE_QUEUE_SIZE,
+    )
+    total_chunks = 0
+    progress("processing")
+    try:
+        for total_chunks in pipeline.run():
+            progress("processing", chunks_upserted=total_chunks)
+    except Exception:
+        _remove_partial_document(mongo_id, lease_owner)
+        raise
+    _flush_keyword_index()
+    timings = pipeline.busy_seconds
+    if content_hash:
+        _documents().update_one(
+            {"_id": mongo_id},
+            {"$set": {"ingest_status": INGEST_COMPLETE, "chunk_count": total_chunks, "ingest_lease_until": None}},
+        )
+
+    logger.info(
+        f"Created, embedded and upserted {total_chunks} chunks "
+        f"(busy: parsing {timings['parsing']:.2f}s, chunking {timings['chunking']:.2f}s, "
+        f"embedding {timings['embedding']:.2f}s, upsert {timings['upserting']:.2f}s)"
+    )
+    progress(
+        "done",
+        timings={stage: round(seconds, 4) for stage, seconds in timings.items()},
+        chunks_total=total_chunks,
+        chunks_embedded=total_chunks,
+        chunks_upserted=total_chunks,
+    )
     logger.info(f"Successfully ingested document {filename} with mongo_id {mongo_id}")
-    return str(mongo_id)
\ No newline at end of file
+    return str(mongo_id)
+
+
+@traceable(name="ingest_document_rag")
+def ingest_document_rag(filename, doc_content, doc_metadata, strategy="langchain", chunk_size=512, overlap=64, progress=None):
+    """
+    Store document in MongoDB, chunk/embed, upsert to Qdrant. Returns mongo_id.
+    Supports strategies: langchain, fixed, sliding, semantic. Re-ingesting identical
+    content with the same parameters returns the existing mongo_id.
+    Args:
+        filename: Name of the file being ingested
+        doc_content: Content of the document
+        doc_metadata: Metadata for the document
+        strategy: Chunking strategy
+        chunk_size: Size of each chunk
+        overlap: Overlap for sliding window
+        progress: Optional callback ``progress(stage, **chunk_counts)`` invoked as stages advance
+    """
+    blocks = list(content_blocks(doc_content, settings.INGEST_READ_BLOCK_CHARS))
+    digest = hashlib.sha256()
+    for block in blocks:
+        digest.update(block.encode("utf-8"))
+    return _ingest_blocks(
+        filename,
+        blocks,
+        len(str(doc_content)),
+        doc_metadata,
+        strategy,
+        chunk_size,
+        overlap,
+        progress or _no_progress,
+        content_hash=digest.hexdigest(),
+    )
+
+
+@traceable(name="ingest_document_stream")
+def ingest_document_stream(filename, path, doc_metadata, strategy="langchain", chunk_size=512, overlap=64, progress=None):
+    """
+    Ingest a document spooled to disk without loading it into memory as a whole.
+    PDFs are processed page by page and TXT/JSON block by block; see ingest_document_rag.
+    Args:
+        filename: Name of the file being ingested (its extension selects the parser)
+        path: Path of the spooled upload
+        doc_metadata: Metadata for the document
+        strategy: Chunking strategy
+        chunk_size: Size of each chunk
+        overlap: Overlap for sliding window
+        progress: Optional callback ``progress(stage, **chunk_counts)`` invoked as stages advance
+    """
+    doc_type = filename.split(".")[-1].lower()
+    blocks, page_tracker = open_blocks(path, doc_type, settings.INGEST_READ_BLOCK_CHARS)
+    return _ingest_blocks(
+        filename,
+        blocks,
+        os.path.getsize(path),
+        doc_metadata,
+        strategy,
+        chunk_size,
+        overlap,
+        progress or _no_progress,
+        content_hash=file_digest(path),
+        page_tracker=page_tracker,
+    )
+
+
+def store_chunked_documents(docs):
+    """
+    Store already-chunked documents with one MongoDB insert_many, embed all of their
+    chunks together and upsert them to Qdrant in one call.
+    Documents carrying a ``content_hash`` are deduplicated: content already ingested with
+    the same chunking parameters (earlier, or earlier in this batch) is not stored again.
+    Incomplete earlier attempts are resumed when their lease has expired; content still
+    being ingested elsewhere is reported with status ``in_progress``.
+    Args:
+        docs: List of dicts with filename, size, chunks (a list or ``ChunkSpans``), strategy, chunk_size, overlap,
+            doc_metadata and optionally content_hash and pages (PDF page range per chunk)
+    Returns:
+        List[dict]: One result per document with status, document_id, chunks, error and duplicate.
+    """
+    lease_owner = uuid.uuid4().hex
+    records = [
+        _document_record(d["filename"], d["size"], d.get("doc_metadata"), d["strategy"], d["chunk_size"], d["overlap"],
+                         d.get("content_hash"), lease_owner)
+        for d in docs
+    ]
+    keys = [record.get("ingest_key") for record in records]
+    try:
+        existing = {}
+        if any(keys):
+            _ensure_ingest_index()
+            existing = {e["ingest_key"]: e for e in _documents().find({"ingest_key": {"$in": [k for k in keys if k]}})}
+        # Index of the document each one is stored as: itself, or an earlier copy in the batch
+        owner = {}
+        sources = [i if key is None else owner.setdefault(key, i) for i, key in enumerate(keys)]
+        new_docs = [i for i, key in enumerate(keys) if sources[i] == i and key not in existing]
+        mongo_ids = {i: existing[key]["_id"] for i, key in enumerate(keys) if sources[i] == i and key in existing}
+        if new_docs:
+            inserted = _documents().insert_many([records[i] for i in new_docs]).inserted_ids
+            mongo_ids.update(zip(new_docs, inserted))
+        busy = {
+            i for i, key in enumerate(keys)
+            if key in existing and sources[i] == i and existing[key].get("ingest_status") != INGEST_COMPLETE
+            and not _take_over(existing[key], lease_owner)
+        }
+    except Exception as e:
+        logger.error(f"Failed to store batch in MongoDB: {str(e)}")
+        error = f"Failed to store document in MongoDB: {str(e)}"
+        return [{"status": "failed", "document_id": None, "chunks": 0, "error": error, "duplicate": False} for _ in docs]
+
+    complete = {
+        i for i, key in enumerate(keys)
+        if key in existing and existing[key].get("ingest_status") == INGEST_COMPLETE
+    }
+    to_ingest = [i for i in range(len(docs)) if sources[i] == i and i not in complete and i not in busy]
+    try:
+        # SimilarityChunks already carry their vectors; only the other documents are encoded.
+        to_encode = [i for i in to_ingest if not isinstance(docs[i]["chunks"], SimilarityChunks)]
+        texts = [chunk for i in to_encode for chunk in docs[i]["chunks"]]
+        embedding_start = time.time()
+        embeddings = embed_chunks(texts)
+        record_metrics("embedding_time", time.time() - embedding_start)
+        points = []
+        offset = 0
+        for i in to_ingest:
+            d = docs[i]
+            count = len(d["chunks"])
+            offsets = d["chunks"].spans() if isinstance(d["chunks"], ChunkSpans) else None
+            if isinstance(d["chunks"], SimilarityChunks):
+                vectors = d["chunks"].vectors
+            else:
+                vectors = embeddings[offset:offset + count]
+                offset += count
+            points.extend(_build_points(
+                mongo_ids[i], d["filename"], d["chunks"], vectors, 0,
+                _parse_metadata(d.get("doc_metadata")), d["strategy"], d["chunk_size"], d["overlap"], d.get("pages"),
+                offsets,
+            ))
+        if points:
+            _upsert_points(points)
+            _flush_keyword_index()
+        updates = [
+            UpdateOne({"_id": mongo_ids[i]}, {"$set": {
+                "ingest_status": INGEST_COMPLETE, "chunk_count": len(docs[i]["chunks"]), "ingest_lease_until": None,
+            }})
+            for i in to_ingest if keys[i]
+        ]
+        if updates:
+            _documents().bulk_write(updates, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to embed/upsert batch of {len(docs)} documents: {str(e)}")
+        for i in to_ingest:
+            _remove_partial_document(mongo_ids[i], lease_owner if keys[i] else None)
+        return [{"status": "failed", "document_id": None, "chunks": 0, "error": str(e), "duplicate": False} for _ in docs]
+
+    duplicates = [i for i in range(len(docs)) if i in complete or sources[i] != i]
+    if duplicates:
+        record_metrics("ingest_deduplicated", len(duplicates))
+    return [
+        {
+            "status": "in_progress",
+            "document_id": str(mongo_ids[sources[i]]),
+            "chunks": 0,
+            "error": str(IngestInProgressError(str(mongo_ids[sources[i]]))),
+            "duplicate": True,
+        }
+        if sources[i] in busy else
+        {
+            "status": "success",
+            "document_id": str(mongo_ids[sources[i]]),
+            "chunks": len(d["chunks"]),
+            "error": None,
+            "duplicate": i in duplicates,
+        }
+        for i, d in enumerate(docs)
+    ]
+
+
+@traceable(name="ingest_documents_batch")
+def ingest_documents_batch(files, doc_metadata=None, strategy="langchain", chunk_size=512, overlap=64):
+    """
+    Ingest many (typically small) documents at once.
+    Files are parsed and chunked one by one, but their chunks are pooled across documents
+    into windows of about INGEST_BATCH_WINDOW_CHUNKS: each window is stored with a single
+    MongoDB insert_many, embedded in full-size batches and upserted in one Qdrant call.
+    Args:
+        files: List of (filename, path) tuples of spooled documents
+        doc_metadata: Metadata applied to every document
+        strategy: Chunking strategy
+        chunk_size: Size of each chunk
+        overlap: Overlap for sliding window
+    Returns:
+        List[dict]: One result per input file, in order, with filename, status,
+        document_id, chunks, error and duplicate.
+    """
+    if strategy not in SUPPORTED_STRATEGIES:
+        logger.warning(f"Strategy '{strategy}' is not supported. Using 'langchain' instead.")
+        strategy = "langchain"
+    _parse_metadata(doc_metadata)  # fail fast on malformed metadata
+    results = [
+        {"filename": filename, "status": "pending", "document_id": None, "chunks": 0, "error": None, "duplicate": False}
+        for filename, _ in files
+    ]
+
+    def flush(pending):
+        for (index, _), result in zip(pending, store_chunked_documents([doc for _, doc in pending])):
+            results[index].update(result)
+
+    pending, pending_chunks = [], 0
+    for index, (filename, path) in enumerate(files):
+        try:
+            doc_type = filename.split(".")[-1].lower()
+            blocks, page_tracker = open_blocks(path, doc_type, settings.INGEST_READ_BLOCK_CHARS)
+            chunks, pages = chunk_blocks(blocks, strategy, chunk_size, overlap, page_tracker)
+        except Exception as e:
+            results[index].update(status="failed", error=str(e))
+            continue
+        for chunk in chunks:
+            record_metrics("chunk_size", len(chunk))
+        pending.append((index, {
+            "filename": filename,
+            "size": os.path.getsize(path),
+            "content_hash": file_digest(path),
+            "chunks": chunks,
+            "pages": pages,
+            "doc_metadata": doc_metadata,
+            "strategy": strategy,
+            "chunk_size": chunk_size,
+            "overlap": overlap,
+        }))
+        pending_chunks += len(chunks)
+        if pending_chunks >= settings.INGEST_BATCH_WINDOW_CHUNKS:
+            flush(pending)
+            pending, pending_chunks = [], 0
+    if pending:
+        flush(pending)
+
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    logger.info(f"Batch ingested {succeeded}/{len(files)} documents")
+    return results
@@ -0,0 +1,227 @@
+"""
+Asynchronous ingest job queue.
+
+Spooled uploads are moved into the job spool directory, recorded as jobs in MongoDB and processed on a bounded
+worker pool, so ``POST /ingest`` can return ``202 Accepted`` immediately. Job state
+(status, current stage, chunk counts and per-stage timings) lives in MongoDB, and jobs
+that were queued or running when the process stopped are picked up again on start.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the ingest queue already holds the maximum number of pending jobs."""
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+class IngestJobQueue:
+    """
+    Bounded worker pool that runs ingest jobs and tracks their state in MongoDB.
+    Args:
+        collection: MongoDB collection holding one document per job.
+        process_job: Callable ``(job, progress) -> document_id`` doing the actual ingest.
+        spool_dir (str): Directory where uploaded bytes are persisted until processed.
+        workers (int): Number of jobs processed concurrently.
+        max_pending (int): Maximum number of queued plus running jobs.
+    """
+
+    def __init__(self, collection, process_job: Callable, spool_dir: str, workers: int = 2, max_pending: int = 100):
+        self.collection = collection
+        self.process_job = process_job
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Start the worker pool and re-enqueue jobs left unfinished by a previous process.
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-job")
+        unfinished = list(self.collection.find(
+            {"status": {"$in": [JOB_QUEUED, JOB_RUNNING]}}, sort=[("created_at", 1)]
+        ))
+        for job in unfinished:
+            if not os.path.exists(job.get("spool_path", "")):
+                self._update(job["_id"], status=JOB_FAILED, error="Upload was lost before processing")
+                continue
+            logger.info(f"Resuming ingest job {job['_id']} ({job['filename']})")
+            self._update(job["_id"], status=JOB_QUEUED, stage=JOB_QUEUED)
+            self._enqueue(job["_id"], force=True)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stop accepting work. Jobs still queued stay in MongoDB and resume on next start.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, filename: str, upload_path: str, params: dict) -> str:
+        """
+        Take ownership of a spooled upload and queue it for ingestion.
+        Args:
+            filename (str): Original file name.
+            upload_path (str): Path of the spooled upload; it is moved into ``spool_dir``.
+            params (dict): Ingest parameters (doc_metadata, strategy, chunk_size, overlap).
+        Returns:
+            str: The new job id.
+        Raises:
+            QueueFullError: If ``max_pending`` jobs are already queued or running.
+        """
+        self.start()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Ingest queue is full ({self.max_pending} pending jobs)")
+            self._pending += 1
+        job_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, f"{job_id}.upload")
+        try:
+            os.replace(upload_path, spool_path)
+            now = _now()
+            self.collection.insert_one({
+                "_id": job_id,
+                "filename": filename,
+                "spool_path": spool_path,
+                "params": params,
+                "status": JOB_QUEUED,
+                "stage": JOB_QUEUED,
+                "document_id": None,
+                "error": None,
+                "chunk_counts": {},
+                "timings": {},
+                "created_at": now,
+                "updated_at": now,
+            })
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            raise
+        self._enqueue(job_id)
+        record_metrics("ingest_job", 1, status=JOB_QUEUED)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.collection.find_one({"_id": job_id})
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+        query = {"status": status} if status else {}
+        return list(self.collection.find(query, sort=[("created_at", -1)], limit=limit))
+
+    def _enqueue(self, job_id: str, force: bool = False) -> None:
+        if force:
+            with self._lock:
+                self._pending += 1
+        self._executor.submit(self._run, job_id)
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = _now()
+        self.collection.update_one({"_id": job_id}, {"$set": fields})
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        stage = {"name": "storing", "start": time.time()}
+        try:
+            self._update(job_id, status=JOB_RUNNING, stage=stage["name"], started_at=_now())
+
+            def progress(next_stage: str, timings: Optional[dict] = None, **chunk_counts):
+                fields = {f"chunk_counts.{name}": value for name, value in chunk_counts.items()}
+                if next_stage != stage["name"]:
+                    now = time.time()
+                    fields[f"timings.{stage['name']}"] = round(now - stage["start"], 4)
+                    fields["stage"] = next_stage
+                    stage.update(name=next_stage, start=now)
+                for name, seconds in (timings or {}).items():
+                    fields[f"timings.{name}"] = seconds
+                self._update(job_id, **fields)
+
+            document_id = self.process_job(job, progress)
+            if stage["name"] != "done":
+                progress("done")
+            self._update(job_id, status=JOB_SUCCEEDED, document_id=document_id, finished_at=_now())
+            record_metrics("ingest_job", 1, status=JOB_SUCCEEDED)
+            if os.path.exists(job["spool_path"]):
+                os.remove(job["spool_path"])
+        except Exception as e:
+            logger.exception(f"Ingest job {job_id} failed")
+            self._update(job_id, status=JOB_FAILED, error=str(e), finished_at=_now())
+            record_metrics("ingest_job", 1, status=JOB_FAILED)
+            if job and os.path.exists(job.get("spool_path", "")):
+                os.remove(job["spool_path"])
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+def process_ingest_job(job: dict, progress: Callable) -> str:
+    """
+    Stream a spooled upload through the RAG ingest pipeline.
+    Returns:
+        str: The MongoDB id of the ingested document.
+    """
+    from src.processing.ingest_rag import ingest_document_stream
+
+    params = job["params"]
+    return ingest_document_stream(
+        job["filename"],
+        job["spool_path"],
+        params.get("doc_metadata"),
+        params.get("strategy", "langchain"),
+        params.get("chunk_size", 512),
+        params.get("overlap", 64),
+        progress=progress,
+    )
+
+
+_queue: Optional[IngestJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> IngestJobQueue:
+    """
+    Return the process-wide ingest job queue, creating it on first use.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from src.storage.clients import get_clients
+
+                collection = get_clients().collection("ingest_jobs")
+                _queue = IngestJobQueue(
+                    collection,
+                    process_ingest_job,
+                    spool_dir=settings.INGEST_SPOOL_DIR,
+                    workers=settings.INGEST_WORKERS,
+                    max_pending=settings.INGEST_MAX_PENDING_JOBS,
+                )
+    return _queue
@@ -0,0 +1,97 @@
+"""
+Export the embedding model to ONNX and quantize it to int8 for ``EMBEDDING_BACKEND=onnx``.
+
+The exported model is saved to a local directory (for air-gapped deployments) together
+with a dynamically int8-quantized copy in ``onnx/model_qint8_<config>.onnx``, and the
+quantized vectors are compared with the fp32 PyTorch ones on a few probe sentences.
+Requires ``pip install sentence-transformers[onnx]``.
+
+Usage:
+    python -m src.processing.onnx_export /models/all-MiniLM-L6-v2 --config avx2
+    EMBEDDING_MODEL_NAME=/models/all-MiniLM-L6-v2 EMBEDDING_BACKEND=onnx \\
+        EMBEDDING_ONNX_FILE=onnx/model_qint8_avx2.onnx ...
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import List
+
+import numpy as np
+
+from src.config.settings import settings
+
+logger = logging.getLogger("onnx_export")
+
+# Minimum cosine similarity between quantized and fp32 vectors of the same text.
+COSINE_TOLERANCE = 0.99
+
+PROBE_TEXTS = [
+    "Qdrant stores the chunk vectors and serves similarity search.",
+    "The invoice is due at the end of the month.",
+    "def embed_chunks(chunks): return model.encode(chunks)",
+    '{"title": "Quarterly report", "category": "finance"}',
+]
+
+
+def cosine_similarities(a, b) -> np.ndarray:
+    """
+    Row-wise cosine similarity of two equally shaped sets of vectors.
+    """
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return np.sum(a * b, axis=1) / np.maximum(np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+
+
+def export_quantized(output_dir: str, model_name: str, config: str = "avx2") -> str:
+    """
+    Export ``model_name`` to ONNX in ``output_dir`` and add an int8-quantized copy.
+    Args:
+        output_dir (str): Directory to save the model to.
+        model_name (str): Hub name or local path of the sentence-transformers model.
+        config (str): Quantization target: 'arm64', 'avx2', 'avx512' or 'avx512_vnni'.
+    Returns:
+        str: ``EMBEDDING_ONNX_FILE`` value of the quantized model, relative to ``output_dir``.
+    """
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(model_name, backend="onnx", model_kwargs={"provider": "CPUExecutionProvider"})
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, quantization_config=config, model_name_or_path=output_dir)
+    return f"onnx/model_qint8_{config}.onnx"
+
+
+def check_tolerance(model_dir: str, onnx_file: str, texts: List[str] = PROBE_TEXTS) -> np.ndarray:
+    """
+    Cosine similarity between the quantized ONNX and fp32 PyTorch vectors of ``texts``.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_dir).encode(texts)
+    quantized = SentenceTransformer(
+        model_dir, backend="onnx", model_kwargs={"file_name": onnx_file, "provider": "CPUExecutionProvider"}
+    ).encode(texts)
+    return cosine_similarities(reference, quantized)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the embedding model to an int8-quantized ONNX model.")
+    parser.add_argument("output_dir", help="Directory to save the exported model to.")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME, help="Model to export (default: EMBEDDING_MODEL_NAME).")
+    parser.add_argument("--config", default="avx2", choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+                        help="Quantization target instruction set.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    onnx_file = export_quantized(args.output_dir, args.model, args.config)
+    similarities = check_tolerance(args.output_dir, onnx_file)
+    print(
+        f"Saved {os.path.join(args.output_dir, onnx_file)}; cosine vs fp32 min {similarities.min():.4f} "
+        f"mean {similarities.mean():.4f} (tolerance {COSINE_TOLERANCE})\n"
+        f"EMBEDDING_MODEL_NAME={os.path.abspath(args.output_dir)} EMBEDDING_BACKEND=onnx EMBEDDING_ONNX_FILE={onnx_file}"
+    )
+    return 0 if similarities.min() >= COSINE_TOLERANCE else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+PDF text extraction.
+
+Text is extracted page by page through a pluggable backend selected with
+``PDF_EXTRACTOR`` (``pypdf2`` by default; ``pymupdf`` and ``pdfminer`` when their
+packages are installed). PDFs with at least ``PDF_PARALLEL_MIN_PAGES`` pages are split
+into page ranges that are extracted on a shared process pool, and pages are yielded
+in order together with their 1-based page number so callers can keep page boundaries.
+
+This module is imported by pool workers, so it keeps its module-level imports light.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PdfSource = Union[str, bytes]
+
+
+def _open(source: PdfSource):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+
+class PyPDF2Extractor:
+    """Pure-Python extractor; always available."""
+
+    def page_count(self, source: PdfSource) -> int:
+        from PyPDF2 import PdfReader
+
+        with _open(source) as f:
+            return len(PdfReader(f).pages)
+
+    def iter_pages(self, source: PdfSource, start: int, stop: int) -> Iterator[str]:
+        from PyPDF2 import PdfReader
+
+        with _open(source) as f:
+            pages = PdfReader(f).pages
+            for i in range(start, min(stop, len(pages))):
+                yield pages[i].extract_text() or ""
+
+
+class PyMuPDFExtractor:
+    """MuPDF-based extractor (``pip install pymupdf``); much faster than PyPDF2."""
+
+    def _document(self, source: PdfSource):
+        import fitz
+
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype="pdf")
+        return fitz.open(source)
+
+    def page_count(self, source: PdfSource) -> int:
+        with self._document(source) as doc:
+            return doc.page_count
+
+    def iter_pages(self, source: PdfSource, start: int, stop: int) -> Iterator[str]:
+        with self._document(source) as doc:
+            for i in range(start, min(stop, doc.page_count)):
+                yield doc[i].get_text()
+
+
+class PdfMinerExtractor:
+    """pdfminer.six extractor (``pip install pdfminer.six``); best layout fidelity, slowest."""
+
+    def page_count(self, source: PdfSource) -> int:
+        from pdfminer.pdfpage import PDFPage
+
+        with _open(source) as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def iter_pages(self, source: PdfSource, start: int, stop: int) -> Iterator[str]:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        # What extract_text does per call, but with one parse and one walk of the page tree
+        # for the whole range; the converter's output is taken and reset after every page.
+        with _open(source) as f, io.StringIO() as output:
+            resources = PDFResourceManager(caching=True)
+            device = TextConverter(resources, output, laparams=LAParams())
+            interpreter = PDFPageInterpreter(resources, device)
+            try:
+                for i, page in enumerate(PDFPage.get_pages(f)):
+                    if i >= stop:
+                        break
+                    if i < start:
+                        continue
+                    interpreter.process_page(page)
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            finally:
+                device.close()
+
+
+_EXTRACTORS: Dict[str, Callable[[], object]] = {
+    "pypdf2": PyPDF2Extractor,
+    "pymupdf": PyMuPDFExtractor,
+    "pdfminer": PdfMinerExtractor,
+}
+
+
+def register_extractor(name: str, factory: Callable[[], object]) -> None:
+    """
+    Register an extractor backend.
+    Args:
+        name (str): Name used in ``PDF_EXTRACTOR``.
+        factory: Zero-argument callable returning an object with
+            ``page_count(source)`` and ``iter_pages(source, start, stop)`` (yielding the
+            text of pages ``start`` to ``stop - 1``). It must be
+            importable by name in pool workers to be used for parallel extraction.
+    """
+    _EXTRACTORS[name] = factory
+
+
+def available_extractors() -> List[str]:
+    """
+    Names of registered backends whose dependencies are installed.
+    """
+    available = []
+    for name, factory in _EXTRACTORS.items():
+        try:
+            factory().page_count(_EMPTY_PDF)
+        except ImportError:
+            continue
+        except Exception:
+            pass
+        available.append(name)
+    return available
+
+
+def get_extractor(name: str):
+    """
+    Instantiate the backend registered under ``name``.
+    Raises:
+        ValueError: If no backend of that name is registered.
+    """
+    try:
+        return _EXTRACTORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown PDF extractor: {name} (available: {', '.join(sorted(_EXTRACTORS))})")
+
+
+def _extract_range(backend: str, path: str, start: int, stop: int) -> List[str]:
+    return list(get_extractor(backend).iter_pages(path, start, stop))
+
+
+# One pool per worker count. A pool is never replaced while it lives: extractions submit
+# ranges lazily, so another thread may still be using a pool of a different size.
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+def iter_pdf_pages(source: PdfSource, backend: Optional[str] = None, workers: Optional[int] = None,
+                   min_pages_parallel: Optional[int] = None, pages_per_task: Optional[int] = None
+                   ) -> Iterator[Tuple[int, str]]:
+    """
+    Yield ``(page_number, text)`` for every page of a PDF, in order. Page numbers start at 1.
+    Large PDFs are extracted in parallel page ranges; at most two ranges per worker are
+    in flight, so memory stays bounded for very long documents.
+    Args:
+        source: Path of the PDF, or its bytes.
+        backend (str, optional): Extractor name; defaults to ``PDF_EXTRACTOR``.
+        workers (int, optional): Pool size; defaults to ``PDF_EXTRACT_WORKERS``.
+        min_pages_parallel (int, optional): Smallest page count extracted in parallel.
+        pages_per_task (int, optional): Pages extracted per pool task.
+    """
+    from src.config.settings import settings
+
+    backend = backend or settings.PDF_EXTRACTOR
+    workers = workers if workers is not None else settings.PDF_EXTRACT_WORKERS
+    min_pages_parallel = min_pages_parallel if min_pages_parallel is not None else settings.PDF_PARALLEL_MIN_PAGES
+    pages_per_task = max(1, pages_per_task or settings.PDF_PAGES_PER_TASK)
+    extractor = get_extractor(backend)
+    page_count = extractor.page_count(source)
+
+    parallel = (
+        workers > 1
+        and page_count >= min_pages_parallel
+        # Pool workers (e.g. the bulk ingest CLI's) extract serially instead of nesting pools.
+        and multiprocessing.parent_process() is None
+    )
+    if not parallel:
+        yield from enumerate(extractor.iter_pages(source, 0, page_count), start=1)
+        return
+
+    if isinstance(source, str):
+        yield from _iter_parallel(backend, os.path.abspath(source), page_count, workers, pages_per_task)
+        return
+    # Workers open the PDF by path, so spool in-memory PDFs to a temporary file.
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield from _iter_parallel(backend, path, page_count, workers, pages_per_task)
+    finally:
+        os.remove(path)
+
+
+def _iter_parallel(backend: str, path: str, page_count: int, workers: int, pages_per_task: int):
+    logger.info(f"Extracting {page_count} PDF pages with {workers} {backend} workers")
+    pool = _get_pool(workers)
+    ranges = iter(range(0, page_count, pages_per_task))
+    in_flight = []
+    while True:
+        while len(in_flight) < workers * 2:
+            start = next(ranges, None)
+            if start is None:
+                break
+            in_flight.append((start, pool.submit(_extract_range, backend, path, start, start + pages_per_task)))
+        if not in_flight:
+            return
+        start, future = in_flight.pop(0)
+        yield from enumerate(future.result(), start=start + 1)
+
+
+def extract_pdf_text(source: PdfSource, **options) -> str:
+    """
+    Extract the text of a whole PDF, pages concatenated in order.
+    """
+    return "".join(text for _, text in iter_pdf_pages(source, **options))
+
+
+# Smallest valid PDF (one empty page); used to probe whether a backend is installed.
+_EMPTY_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 10 10]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF"
+)
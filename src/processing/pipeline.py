@@ -0,0 +1,141 @@
+"""
+Staged ingest pipeline.
+
+Each stage runs on its own thread and hands its output to the next stage through a
+bounded queue, so while stage N works on item k, stage N+1 can already work on item
+k-1 (e.g. the embedding of one window overlaps the Qdrant upsert of the previous one).
+Bounded queues keep memory flat: a fast stage blocks once the slower stage after it
+is ``queue_size`` items behind.
+
+For every stage the pipeline tracks busy time (time spent in the stage itself, not
+waiting on its neighbours) and exports it, together with the depth of the queue
+feeding the stage, as Prometheus metrics so the bottleneck stage is visible.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+class _Stopped(BaseException):
+    """Raised inside a stage thread when the pipeline is being torn down."""
+
+
+class StagedPipeline:
+    """
+    Run a chain of generator stages on threads connected by bounded queues.
+    Args:
+        stages: ``(name, fn)`` pairs. ``fn`` receives an iterator over the previous
+            stage's output (an empty iterator for the first stage) and returns an
+            iterable of its own output. Stages may emit more or fewer items than they read.
+        queue_size (int): Maximum number of items waiting between two stages.
+    """
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable[[Iterator], Iterable]]], queue_size: int = 2):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.busy_seconds: Dict[str, float] = {name: 0.0 for name, _ in self.stages}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+
+    def run(self) -> Iterator:
+        """
+        Start all stages and yield the output of the last one.
+        The first exception raised by any stage stops the pipeline and is re-raised here.
+        Closing the generator early stops the stages as well.
+        """
+        # queues[i] feeds stage i; the last one feeds the caller ("output").
+        names = [name for name, _ in self.stages[1:]] + ["output"]
+        queues = [(name, queue.Queue(maxsize=self.queue_size)) for name in names]
+        threads = []
+        for index, (name, fn) in enumerate(self.stages):
+            inbox = queues[index - 1] if index > 0 else None
+            thread = threading.Thread(
+                target=self._run_stage, args=(name, fn, inbox, queues[index]), name=f"pipeline-{name}", daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _END:
+                    break
+                yield item
+        except _Stopped:
+            pass
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            for name, seconds in self.busy_seconds.items():
+                record_metrics("ingest_stage_busy", seconds, stage=name)
+        if self._error is not None:
+            raise self._error
+
+    def _run_stage(self, name: str, fn: Callable, inbox: Optional[tuple], outbox: tuple) -> None:
+        waited = 0.0
+
+        def inputs():
+            nonlocal waited
+            if inbox is None:
+                return
+            while True:
+                wait_start = time.perf_counter()
+                item = self._get(inbox)
+                waited += time.perf_counter() - wait_start
+                if item is _END:
+                    return
+                yield item
+
+        start = time.perf_counter()
+        try:
+            for item in fn(inputs()):
+                wait_start = time.perf_counter()
+                self._put(outbox, item)
+                waited += time.perf_counter() - wait_start
+            self._put(outbox, _END)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+                    logger.error(f"Pipeline stage '{name}' failed: {e}")
+            self._stop.set()
+        finally:
+            self.busy_seconds[name] = max(time.perf_counter() - start - waited, 0.0)
+
+    def _put(self, named_queue: tuple, item) -> None:
+        name, q = named_queue
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+            except queue.Full:
+                continue
+            record_metrics("ingest_queue_depth", q.qsize(), stage=name)
+            return
+
+    def _get(self, named_queue: tuple):
+        name, q = named_queue
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                item = q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            record_metrics("ingest_queue_depth", q.qsize(), stage=name)
+            return item
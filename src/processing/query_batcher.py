@@ -0,0 +1,136 @@
+"""
+Cross-request micro-batching of query embeddings.
+
+Concurrent ``/query`` requests each need one query vector. Instead of one batch-size-1
+forward pass per request, callers hand their text to a ``QueryEmbeddingBatcher``
+which collects texts for at most ``QUERY_BATCH_MAX_WAIT_MS`` after the first one
+arrives (or until ``QUERY_BATCH_MAX_SIZE`` are waiting), encodes them in a single call
+and resolves each caller's future. Under light load a query waits at most the max
+wait; under heavy load texts that arrive while the model is busy join the next batch.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Encode concurrently submitted texts together on a background thread.
+    Args:
+        encode: Function mapping a list of texts to their vectors, in order.
+        max_wait_ms (float): Longest a text waits for others to join its batch.
+        max_batch (int): Maximum texts per encode call.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]], max_wait_ms: float = 2.0, max_batch: int = 32):
+        self.encode = encode
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[str, Future, float]] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for the next batch.
+        Returns:
+            Future: Resolves to the text's vector, or to the encode error.
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Query embedding batcher is stopped")
+            self._pending.append((text, future, time.monotonic()))
+            self._ensure_started()
+            self._cond.notify()
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        Embed one text, batched with any concurrent callers.
+        """
+        return self.submit(text).result(timeout)
+
+    def stop(self) -> None:
+        """
+        Encode what is still queued, then stop the background thread.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="query-embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[str, Future, float]]:
+        with self._cond:
+            while not self._pending and not self._stopped:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            record_metrics("query_embedding_batch_size", len(batch))
+            try:
+                vectors = self.encode([text for text, _, _ in batch])
+            except Exception as e:
+                logger.warning(f"Batched query embedding of {len(batch)} texts failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+_batcher: Optional[QueryEmbeddingBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_query_batcher(encode: Callable[[List[str]], List[List[float]]]) -> QueryEmbeddingBatcher:
+    """
+    Return the process-wide query batcher, creating it with ``encode`` on first use.
+    """
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = QueryEmbeddingBatcher(
+                    encode, max_wait_ms=settings.QUERY_BATCH_MAX_WAIT_MS, max_batch=settings.QUERY_BATCH_MAX_SIZE
+                )
+    return _batcher
+
+
+def shutdown_query_batcher() -> None:
+    """
+    Stop the process-wide query batcher after it has encoded queued texts.
+    """
+    global _batcher
+    with _batcher_lock:
+        batcher, _batcher = _batcher, None
+    if batcher is not None:
+        batcher.stop()
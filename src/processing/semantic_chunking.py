@@ -0,0 +1,105 @@
+"""
+Embedding-similarity chunking (the ``similarity`` strategy).
+
+Sentences are embedded in large batches (``SEMANTIC_SENTENCE_BATCH``) with the shared
+embedding model. A chunk boundary is placed where consecutive sentences are unusually
+dissimilar: where their cosine distance is non-zero and reaches the
+``SEMANTIC_BREAKPOINT_PERCENTILE`` percentile of the distances in the batch. Chunks are also closed before they would
+exceed ``chunk_size`` characters.
+
+Each chunk's vector is the length-weighted mean of its sentence vectors, so chunks
+need no second encode pass, and because every sentence is encoded on its own, no part
+of a long chunk is lost to the model's token limit.
+"""
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+from src.processing.sentences import iter_sentences
+
+
+class SimilarityChunks(list):
+    """
+    Chunk texts that carry their pooled embedding vectors in ``vectors``.
+    """
+
+    def __init__(self, chunks: Iterable[str] = (), vectors: Iterable[List[float]] = ()):
+        super().__init__(chunks)
+        self.vectors = list(vectors)
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _pool(sentences: List[str], vectors: List[np.ndarray]) -> List[float]:
+    pooled = np.average(np.vstack(vectors), axis=0, weights=[len(s) for s in sentences])
+    if settings.EMBEDDING_NORMALIZE:
+        pooled = pooled / max(float(np.linalg.norm(pooled)), 1e-12)
+    return pooled.tolist()
+
+
+def iter_similarity_chunks(blocks: Iterable[str], chunk_size: int = 512, percentile: Optional[float] = None,
+                           batch_sentences: Optional[int] = None) -> Iterator[Tuple[str, List[float]]]:
+    """
+    Stream similarity-bounded chunks of a sequence of text blocks.
+    Args:
+        blocks: Iterable of text blocks.
+        chunk_size (int): Maximum chunk length in characters (a single longer sentence
+            becomes a chunk of its own).
+        percentile (float, optional): Distance percentile at which a boundary is placed;
+            defaults to ``SEMANTIC_BREAKPOINT_PERCENTILE``.
+        batch_sentences (int, optional): Sentences embedded per encode call; defaults to
+            ``SEMANTIC_SENTENCE_BATCH``.
+    Yields:
+        Tuple[str, List[float]]: Chunk text (sentences joined by spaces) and its pooled vector.
+    """
+    from src.processing.embeddings import embed_chunks
+
+    percentile = settings.SEMANTIC_BREAKPOINT_PERCENTILE if percentile is None else percentile
+    batch_sentences = max(2, batch_sentences or settings.SEMANTIC_SENTENCE_BATCH)
+    sentences = iter_sentences(blocks)
+    # The open chunk is carried across batches, so a batch edge never forces a boundary.
+    open_sentences: List[str] = []
+    open_vectors: List[np.ndarray] = []
+    open_length = 0
+    while True:
+        batch = list(islice(sentences, batch_sentences))
+        if not batch:
+            break
+        embedding_start = time.time()
+        # Sentences, not stored chunks: keep them out of the per-chunk token metrics.
+        vectors = np.asarray(embed_chunks(batch, chunk_stats=False), dtype=np.float32)
+        record_metrics("embedding_time", time.time() - embedding_start)
+        unit = _unit(vectors)
+        previous = np.vstack([_unit(open_vectors[-1][None, :]) if open_vectors else unit[:1], unit[:-1]])
+        distances = 1.0 - np.sum(unit * previous, axis=1)
+        threshold = float(np.percentile(distances, percentile))
+        for sentence, vector, distance in zip(batch, vectors, distances):
+            drop = distance > 0 and distance >= threshold
+            if open_sentences and (drop or open_length + 1 + len(sentence) > chunk_size):
+                yield " ".join(open_sentences), _pool(open_sentences, open_vectors)
+                open_sentences, open_vectors, open_length = [], [], 0
+            open_length += len(sentence) + (1 if open_sentences else 0)
+            open_sentences.append(sentence)
+            open_vectors.append(vector)
+    if open_sentences:
+        yield " ".join(open_sentences), _pool(open_sentences, open_vectors)
+
+
+def similarity_chunks(blocks: Iterable[str], chunk_size: int = 512, **options) -> SimilarityChunks:
+    """
+    Chunk a whole document with ``iter_similarity_chunks``.
+    Returns:
+        SimilarityChunks: The chunks, with their vectors in ``vectors``.
+    """
+    chunks = SimilarityChunks()
+    for chunk, vector in iter_similarity_chunks(blocks, chunk_size, **options):
+        chunks.append(chunk)
+        chunks.vectors.append(vector)
+    return chunks
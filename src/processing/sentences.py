@@ -0,0 +1,120 @@
+"""
+Sentence segmentation for the ``semantic`` chunking strategy.
+
+The default ``rules`` backend is a precompiled regular-expression segmenter: a sentence
+ends at a run of ``.``, ``!`` or ``?`` (plus closing quotes/brackets) followed by
+whitespace and an upper-case letter, digit or opening quote, or at a blank line. A
+period after a known abbreviation or a single-letter initial does not end a sentence.
+It needs no model data, so importing it never touches the network, and it segments
+streams of text blocks exactly as it would segment their concatenation.
+
+``SENTENCE_SEGMENTER=nltk`` selects NLTK's Punkt tokenizer instead. NLTK is optional:
+it is imported on first use and its ``punkt`` data must already be installed
+(``python -m nltk.downloader punkt``); it is never downloaded at runtime.
+"""
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.config.settings import settings
+
+# Terminators and closers, with the whitespace and sentence start that must follow them.
+_BOUNDARY = re.compile(
+    r"""[.!?]+["'”’)\]]*(?=\s+["'“‘(\[]*[A-Z0-9À-ÖØ-Þ])"""
+    r"|\n[ \t]*\n"
+)
+_WORD_BEFORE = re.compile(r"[\w.'’-]+\Z")
+# Characters a boundary match can consist of; a match may only extend past the
+# buffered text if it starts inside a trailing run of them.
+_BOUNDARY_CHARS = frozenset(".!?\"')]”’ \t\r\n\f\v")
+
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "ft", "rev", "gen", "col", "capt", "lt", "sgt", "gov",
+    "sen", "rep", "hon", "vs", "etc", "e.g", "i.e", "cf", "al", "approx", "dept", "est", "fig", "figs", "no", "nos",
+    "vol", "vols", "pp", "ch", "sec", "eq", "inc", "ltd", "co", "corp", "bros", "jan", "feb", "mar", "apr", "jun",
+    "jul", "aug", "sep", "sept", "oct", "nov", "dec", "u.s", "u.k", "a.m", "p.m", "ph.d",
+})
+
+
+def _is_boundary(text: str, match: re.Match) -> bool:
+    if text[match.start()] != "." or match.group(0).startswith(".."):
+        return True
+    word = _WORD_BEFORE.search(text, max(0, match.start() - 32), match.start())
+    if word is None:
+        return True
+    word = word.group(0).lower()
+    return word not in ABBREVIATIONS and not (len(word) == 1 and word.isalpha())
+
+
+def _rule_sentences(blocks: Iterable[str]) -> Iterator[str]:
+    buffer = ""
+    scan_from = 0
+    for block in blocks:
+        buffer += block
+        sentence_start = 0
+        for match in _BOUNDARY.finditer(buffer, scan_from):
+            if not _is_boundary(buffer, match):
+                continue
+            sentence = buffer[sentence_start:match.end()].strip()
+            if sentence:
+                yield sentence
+            sentence_start = match.end()
+        buffer = buffer[sentence_start:]
+        # Only a boundary that starts in the trailing run of boundary characters can
+        # still complete once more text arrives; everything before it was scanned.
+        scan_from = len(buffer)
+        while scan_from and buffer[scan_from - 1] in _BOUNDARY_CHARS:
+            scan_from -= 1
+    tail = buffer.strip()
+    if tail:
+        yield tail
+
+
+def _nltk_sentences(blocks: Iterable[str]) -> Iterator[str]:
+    from nltk.tokenize import sent_tokenize
+
+    carry = ""
+    for block in blocks:
+        text = carry + block
+        sentences = sent_tokenize(text)
+        if not sentences:
+            carry = text
+            continue
+        # The last sentence may continue in the next block; carry it (with any
+        # trailing whitespace) over so the tokenizer sees the real boundary.
+        last = sentences.pop()
+        carry = text[text.rfind(last):]
+        yield from sentences
+    if carry.strip():
+        yield from sent_tokenize(carry)
+
+
+_SEGMENTERS: Dict[str, Callable[[Iterable[str]], Iterator[str]]] = {
+    "rules": _rule_sentences,
+    "nltk": _nltk_sentences,
+}
+
+
+def iter_sentences(blocks: Iterable[str], backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream the sentences of a sequence of text blocks, as if they were one string.
+    Args:
+        blocks: Iterable of text blocks.
+        backend (str, optional): 'rules' or 'nltk'; defaults to ``SENTENCE_SEGMENTER``.
+    Yields:
+        str: Sentences with surrounding whitespace removed.
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = backend or settings.SENTENCE_SEGMENTER
+    try:
+        segmenter = _SEGMENTERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown sentence segmenter: {backend} (available: {', '.join(sorted(_SEGMENTERS))})")
+    return segmenter(blocks)
+
+
+def split_sentences(text: str, backend: Optional[str] = None) -> List[str]:
+    """
+    Split a text into sentences; see ``iter_sentences``.
+    """
+    return list(iter_sentences([text], backend))
@@ -0,0 +1,385 @@
+"""
+Streaming document processing.
+
+Uploads are spooled to disk and read back as a sequence of text blocks (PDF pages, or
+fixed-size blocks of TXT/JSON text). ``iter_chunks`` turns those blocks into chunks while
+holding at most one block plus a small carry-over in memory, so the ingest pipeline can
+extract, chunk, embed and upsert a document in bounded windows.
+"""
+import hashlib
+import bisect
+import json
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.processing.chunking import SPAN_STRATEGIES, chunk_spans, iter_token_spans
+from src.processing.pdf_extraction import iter_pdf_pages
+from src.processing.semantic_chunking import iter_similarity_chunks, similarity_chunks
+from src.processing.sentences import iter_sentences
+
+SUPPORTED_DOC_TYPES = {"txt", "json", "pdf"}
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+UPLOAD_READ_BYTES = 1024 * 1024
+
+
+async def spool_upload(upload, spool_dir: str, read_bytes: int = UPLOAD_READ_BYTES) -> str:
+    """
+    Copy an uploaded file to disk without holding it in memory.
+    Args:
+        upload: FastAPI ``UploadFile`` (anything with ``async read(n)``).
+        spool_dir (str): Directory for the spooled file.
+        read_bytes (int): Bytes read from the upload per iteration.
+    Returns:
+        str: Path of the spooled file. The caller owns (and removes) it.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=spool_dir, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                data = await upload.read(read_bytes)
+                if not data:
+                    break
+                f.write(data)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def file_digest(path: str, read_bytes: int = UPLOAD_READ_BYTES) -> str:
+    """
+    SHA-256 of a file's bytes, read incrementally.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(read_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _safe_member_path(dest_dir: str, name: str):
+    normalized = os.path.normpath(name)
+    if os.path.isabs(normalized) or normalized.startswith("..") or normalized.startswith("__MACOSX"):
+        return None
+    return os.path.join(dest_dir, normalized)
+
+
+def expand_archive(path: str, filename: str, dest_dir: str) -> List[Tuple[str, str]]:
+    """
+    Extract the regular files of a zip or tar archive.
+    Members with absolute paths or ``..`` components are skipped.
+    Args:
+        path (str): Path of the spooled archive.
+        filename (str): Original archive name (selects zip vs tar).
+        dest_dir (str): Directory to extract into.
+    Returns:
+        List[Tuple[str, str]]: (member name, extracted path) for each file, in archive order.
+    """
+    extracted = []
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                target = _safe_member_path(dest_dir, info.filename)
+                if info.is_dir() or target is None:
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                extracted.append((info.filename, target))
+    else:
+        with tarfile.open(path, "r:*") as archive:
+            for member in archive:
+                target = _safe_member_path(dest_dir, member.name)
+                if not member.isfile() or target is None:
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.extractfile(member) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                extracted.append((member.name, target))
+    return extracted
+
+
+def iter_text_blocks(path: str, doc_type: str, block_size: int = 65536) -> Iterator[str]:
+    """
+    Yield the text of a spooled document block by block.
+    PDFs are yielded page by page; TXT is decoded incrementally; JSON is parsed and
+    re-serialized incrementally (identical to ``json.dumps`` of the parsed document).
+    Args:
+        path (str): Path to the document on disk.
+        doc_type (str): The type of document (txt, json, pdf).
+        block_size (int): Approximate number of characters per TXT/JSON block.
+    Raises:
+        ValueError: If the document type is unsupported.
+    """
+    if doc_type == "txt":
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+    elif doc_type == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        yield from _join_pieces(json.JSONEncoder().iterencode(content), block_size)
+    elif doc_type == "pdf":
+        for _, text in iter_pdf_pages(path):
+            yield text
+    else:
+        raise ValueError(f"Unsupported document type: {doc_type}")
+
+
+class PageTracker:
+    """
+    Pass PDF page texts through to a chunker while remembering where each page starts,
+    so the pages a chunk came from can be looked up afterwards with ``locate``.
+
+    Iterating yields the page texts. ``page_range`` maps chunks with known offsets
+    exactly; ``locate`` finds other chunks in the text consumed so far (ignoring
+    whitespace differences introduced by the splitters). Either must be called for
+    chunks in the order the chunker produced them, and only a bounded tail of the text
+    is kept in memory.
+    """
+
+    _LOCATE_WORDS = 8
+
+    def __init__(self, pages: Iterable[Tuple[int, str]], keep_chars: int = 8192):
+        self._pages = pages
+        self._keep_chars = keep_chars
+        self._starts: List[int] = []  # absolute offset where each page starts
+        self._numbers: List[int] = []
+        self._buffer = ""
+        self._buffer_start = 0  # absolute offset of self._buffer[0]
+        self._cursor = -1  # absolute offset where the last located chunk starts
+
+    def __iter__(self) -> Iterator[str]:
+        for number, text in self._pages:
+            self._starts.append(self._buffer_start + len(self._buffer))
+            self._numbers.append(number)
+            self._buffer += text
+            yield text
+
+    def _page_at(self, offset: int) -> Optional[int]:
+        index = bisect.bisect_right(self._starts, offset) - 1
+        return self._numbers[index] if index >= 0 else None
+
+    def page_range(self, start: int, end: int) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Return ``(first_page, last_page)`` of the text between two absolute offsets.
+        Exact, for chunkers that report offsets (see ``iter_chunk_spans``).
+        """
+        self._advance(start)
+        return self._page_at(start), self._page_at(max(end - 1, start))
+
+    def _find(self, words: List[str], start: int) -> Optional[re.Match]:
+        pattern = r"\s*".join(re.escape(word) for word in words)
+        return re.compile(pattern).search(self._buffer, max(start - self._buffer_start, 0))
+
+    def locate(self, chunk: str) -> Optional[Tuple[int, int]]:
+        """
+        Return ``(first_page, last_page)`` of a chunk, or None if it cannot be found.
+        """
+        words = chunk.split()
+        if not words:
+            return None
+        # Chunks start strictly after one another, even when they overlap.
+        head = self._find(words[:self._LOCATE_WORDS], self._cursor + 1)
+        if head is None:
+            return None
+        start = self._buffer_start + head.start()
+        tail = self._find(words[-self._LOCATE_WORDS:], start) if len(words) > self._LOCATE_WORDS else head
+        end = self._buffer_start + (tail.end() if tail is not None else head.end()) - 1
+        self._advance(start)
+        return self._page_at(start), self._page_at(end)
+
+    def _advance(self, cursor: int) -> None:
+        self._cursor = cursor
+        # Drop text well before the cursor; overlapping chunks never reach back that far.
+        drop = cursor - self._keep_chars - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+
+
+def open_blocks(path: str, doc_type: str, block_size: int = 65536) -> Tuple[Iterable[str], Optional[PageTracker]]:
+    """
+    Text blocks of a spooled document (see ``iter_text_blocks``), plus a ``PageTracker``
+    for PDFs (None otherwise) that maps chunks of those blocks back to page numbers.
+    """
+    if doc_type == "pdf":
+        tracker = PageTracker(iter_pdf_pages(path))
+        return tracker, tracker
+    return iter_text_blocks(path, doc_type, block_size), None
+
+
+def chunk_blocks(blocks: Iterable[str], strategy: str, chunk_size: int = 512, overlap: int = 64,
+                 page_tracker: Optional[PageTracker] = None) -> Tuple[Sequence[str], Optional[list]]:
+    """
+    Chunk a whole (small) document in memory.
+    ``fixed``, ``sliding`` and ``token`` chunks are returned as ``ChunkSpans`` over the joined text,
+    so overlapping chunks share one copy of it until they are embedded; ``similarity``
+    chunks as ``SimilarityChunks`` carrying their already computed vectors.
+    Returns:
+        Tuple: The chunks, and each chunk's (first_page, last_page) when a ``page_tracker``
+        is given (None otherwise).
+    """
+    if strategy in SPAN_STRATEGIES:
+        chunks = chunk_spans("".join(blocks), strategy, chunk_size, overlap)
+        pages = None
+        if page_tracker is not None:
+            pages = [page_tracker.page_range(start, end) for start, end in zip(chunks.starts, chunks.ends)]
+    else:
+        if strategy == "similarity":
+            chunks = similarity_chunks(blocks, chunk_size)
+        else:
+            chunks = list(iter_chunks(blocks, strategy, chunk_size=chunk_size, overlap=overlap))
+        pages = [page_tracker.locate(chunk) for chunk in chunks] if page_tracker is not None else None
+    return chunks, pages
+
+
+def content_blocks(doc_content, block_size: int = 65536) -> Iterator[str]:
+    """
+    Yield already-parsed document content (as returned by ``validate_document``) as text blocks.
+    """
+    if isinstance(doc_content, dict):
+        yield from _join_pieces(json.JSONEncoder().iterencode(doc_content), block_size)
+    else:
+        text = str(doc_content)
+        for i in range(0, len(text), block_size):
+            yield text[i:i + block_size]
+
+
+def _join_pieces(pieces: Iterable[str], block_size: int) -> Iterator[str]:
+    buffer: List[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= block_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_chunks(blocks: Iterable[str], strategy: str, chunk_size: int = 512, overlap: int = 64) -> Iterator[str]:
+    """
+    Chunk a stream of text blocks as if they had been concatenated into one string.
+    ``fixed``, ``sliding``, ``token`` and (with the default rule-based segmenter)
+    ``semantic`` produce exactly the chunks of ``chunk_document`` on the whole text;
+    ``langchain`` carries the unfinished tail of each block over to the next one, so
+    boundaries only differ where a block split text the splitter would have merged differently.
+    Args:
+        blocks: Iterable of text blocks.
+        strategy (str): Chunking strategy ('langchain', 'fixed', 'sliding', 'token', 'semantic', 'similarity').
+        chunk_size (int): Size of each chunk (in model tokens for 'token').
+        overlap (int): Overlap size for sliding window / langchain.
+    Raises:
+        ValueError: If the strategy is unknown or the sliding step is not positive.
+    """
+    if strategy == "fixed":
+        yield from _fixed_chunks(blocks, chunk_size)
+    elif strategy == "sliding":
+        yield from _sliding_chunks(blocks, chunk_size, overlap)
+    elif strategy == "token":
+        for chunk, _, _ in iter_token_spans(blocks, chunk_size, overlap):
+            yield chunk
+    elif strategy == "semantic":
+        yield from _semantic_chunks(blocks, chunk_size)
+    elif strategy == "similarity":
+        for chunk, _ in iter_similarity_chunks(blocks, chunk_size):
+            yield chunk
+    elif strategy == "langchain":
+        yield from _langchain_chunks(blocks, chunk_size, overlap)
+    else:
+        raise ValueError(f"Unknown chunking strategy: {strategy}")
+
+
+def iter_chunk_spans(blocks: Iterable[str], strategy: str, chunk_size: int = 512,
+                     overlap: int = 64) -> Iterator[Tuple[str, int, int]]:
+    """
+    Stream ``fixed``, ``sliding`` or ``token`` chunks together with their (start, end) character
+    offsets in the concatenated text; see ``chunk_spans`` for the in-memory form.
+    Yields:
+        Tuple[str, int, int]: Chunk text, start offset and end offset.
+    Raises:
+        ValueError: If the strategy has no span form or the sliding step is not positive.
+    """
+    if strategy == "token":
+        yield from iter_token_spans(blocks, chunk_size, overlap)
+        return
+    if strategy == "fixed":
+        step = chunk_size
+    elif strategy == "sliding":
+        step = chunk_size - overlap
+        if step <= 0:
+            raise ValueError("overlap must be smaller than chunk_size for sliding chunking")
+    else:
+        raise ValueError(f"Strategy '{strategy}' has no span-based chunker")
+    buffer = ""
+    buffer_start = 0  # absolute offset of buffer[0]
+    emitted = False
+    for block in blocks:
+        buffer += block
+        start = 0
+        while len(buffer) - start >= chunk_size:
+            yield buffer[start:start + chunk_size], buffer_start + start, buffer_start + start + chunk_size
+            emitted = True
+            start += step
+        buffer = buffer[start:]
+        buffer_start += start
+    # fixed keeps its short tail; sliding only emits a short document as a whole
+    if buffer and (strategy == "fixed" or not emitted):
+        yield buffer, buffer_start, buffer_start + len(buffer)
+
+
+def _fixed_chunks(blocks, chunk_size):
+    for chunk, _, _ in iter_chunk_spans(blocks, "fixed", chunk_size):
+        yield chunk
+
+
+def _sliding_chunks(blocks, chunk_size, overlap):
+    for chunk, _, _ in iter_chunk_spans(blocks, "sliding", chunk_size, overlap):
+        yield chunk
+
+
+def _semantic_chunks(blocks, chunk_size):
+    current_chunk = ""
+    for sent in iter_sentences(blocks):
+        if len(current_chunk) + len(sent) + 1 <= chunk_size:
+            current_chunk += (" " if current_chunk else "") + sent
+        else:
+            if current_chunk:
+                yield current_chunk
+            current_chunk = sent
+    if current_chunk:
+        yield current_chunk
+
+
+def _langchain_chunks(blocks, chunk_size, overlap):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        chunks = splitter.split_text(buffer)
+        if len(chunks) < 2:
+            continue
+        # Re-split from the start of the last chunk once more text has arrived.
+        last = chunks.pop()
+        yield from chunks
+        position = buffer.rfind(last)
+        buffer = buffer[position:] if position >= 0 else last
+    if buffer:
+        yield from splitter.split_text(buffer)
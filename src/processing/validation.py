@@ -2,8 +2,7 @@
 Validation module for document type checking and parsing.
 """
 import json
-import io
-from PyPDF2 import PdfReader
+from src.processing.pdf_extraction import extract_pdf_text
 
 def validate_document(doc_bytes: bytes, doc_type: str):
     """
@@ -21,10 +20,6 @@ def validate_document(doc_bytes: bytes, doc_type: str):
     elif doc_type == "json":
         return json.loads(doc_bytes.decode("utf-8"))
     elif doc_type == "pdf":
-        reader = PdfReader(io.BytesIO(doc_bytes))
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
+        return extract_pdf_text(doc_bytes)
     else:
         raise ValueError(f"Unsupported document type: {doc_type}") 
\ No newline at end of file
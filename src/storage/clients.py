@@ -0,0 +1,295 @@
+"""
+Process-wide registry of Qdrant and MongoDB clients.
+
+Every module that talks to Qdrant or MongoDB gets its client from ``get_clients()``,
+so the process holds one pooled client per backend instead of one per module or
+per request. The API creates the registry in its lifespan and closes it on shutdown;
+other entry points (bulk ingest, CLIs) create it on first use.
+
+- Qdrant: one synchronous client for search, upserts and administration, using gRPC
+  when ``QDRANT_PREFER_GRPC`` is set. Its REST pool keeps up to ``QDRANT_POOL_SIZE``
+  keep-alive connections. Without explicit limits qdrant-client disables keep-alive
+  for ``localhost`` and opens a connection per request.
+- MongoDB: one ``MongoClient`` with a bounded pool (``MONGO_MAX_POOL_SIZE``, idle
+  trimming, bounded wait for a free connection).
+- Async endpoints use ``AsyncQdrantClient`` and ``AsyncMongoClient`` with the same
+  settings. These are bound to the event loop they were first used on, so each accessor
+  returns the client of the running loop (test clients without a lifespan run each
+  request on a fresh loop).
+
+Pool utilization is exported per client: in-flight Qdrant requests relative to
+``QDRANT_POOL_SIZE``, and MongoDB connections open, checked out and checkout wait
+times from pymongo's pool events.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+MONGO_DB = "rag_db"
+
+
+class TrackedQdrantClient:
+    """
+    Proxy to a (sync or async) Qdrant client that counts requests in flight.
+    Args:
+        client: The ``QdrantClient`` or ``AsyncQdrantClient`` to wrap.
+        name (str): ``client`` label of the exported metrics.
+        pool_size (int): Connections the client may open; utilization is in-flight / pool_size.
+    """
+
+    def __init__(self, client, name: str, pool_size: int):
+        self._client = client
+        self._name = name
+        self._pool_size = max(1, pool_size)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            in_flight = self._in_flight
+        record_metrics("qdrant_requests_in_flight", in_flight, client=self._name)
+        record_metrics("qdrant_pool_utilization", in_flight / self._pool_size, client=self._name)
+
+    def __getattr__(self, attr):
+        value = getattr(self._client, attr)
+        if attr.startswith("_") or not callable(value):
+            return value
+        if inspect.iscoroutinefunction(value):
+            @functools.wraps(value)
+            async def call(*args, **kwargs):
+                self._track(1)
+                try:
+                    return await value(*args, **kwargs)
+                finally:
+                    self._track(-1)
+        else:
+            @functools.wraps(value)
+            def call(*args, **kwargs):
+                self._track(1)
+                try:
+                    return value(*args, **kwargs)
+                finally:
+                    self._track(-1)
+        return call
+
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    pymongo connection pool listener exporting pool size and utilization of one client.
+    Utilization is reported for the busiest server pool: checked-out connections / maxPoolSize.
+    Args:
+        name (str): ``client`` label of the exported metrics.
+        max_pool_size (int): The client's ``maxPoolSize``.
+    """
+
+    def __init__(self, name: str, max_pool_size: int):
+        self.name = name
+        self.max_pool_size = max(1, max_pool_size)
+        self._open: Dict[Tuple, int] = {}
+        self._checked_out: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def open_connections(self) -> int:
+        return sum(self._open.values())
+
+    @property
+    def checked_out(self) -> int:
+        return sum(self._checked_out.values())
+
+    def _count(self, counts: Dict[Tuple, int], address, delta: int) -> None:
+        with self._lock:
+            counts[address] = max(counts.get(address, 0) + delta, 0)
+            open_connections, checked_out = self.open_connections, self.checked_out
+            busiest = max(self._checked_out.values(), default=0)
+        record_metrics("mongo_pool_connections", open_connections, client=self.name)
+        record_metrics("mongo_pool_checked_out", checked_out, client=self.name)
+        record_metrics("mongo_pool_utilization", busiest / self.max_pool_size, client=self.name)
+
+    def connection_created(self, event):
+        self._count(self._open, event.address, 1)
+
+    def connection_closed(self, event):
+        self._count(self._open, event.address, -1)
+
+    def connection_checked_out(self, event):
+        record_metrics("mongo_pool_checkout_latency", event.duration, client=self.name)
+        self._count(self._checked_out, event.address, 1)
+
+    def connection_checked_in(self, event):
+        self._count(self._checked_out, event.address, -1)
+
+    def connection_check_out_failed(self, event):
+        record_metrics("mongo_pool_checkout_failure", 1, client=self.name)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+def _qdrant_options() -> dict:
+    return dict(
+        host=settings.QDRANT_HOST,
+        port=settings.QDRANT_PORT,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        timeout=settings.QDRANT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.QDRANT_POOL_SIZE,
+            max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+        ),
+    )
+
+
+def _mongo_options(listener: MongoPoolMonitor) -> dict:
+    return dict(
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[listener],
+    )
+
+
+class ClientRegistry:
+    """
+    Owner of the process's Qdrant and MongoDB clients; see the module docstring.
+    """
+
+    def __init__(self):
+        self.qdrant = TrackedQdrantClient(QdrantClient(**_qdrant_options()), "sync", settings.QDRANT_POOL_SIZE)
+        self.mongo_pool = MongoPoolMonitor("sync", settings.MONGO_MAX_POOL_SIZE)
+        self.mongo = MongoClient(settings.MONGODB_URI, **_mongo_options(self.mongo_pool))
+        self.async_mongo_pool = MongoPoolMonitor("async", settings.MONGO_MAX_POOL_SIZE)
+        self._async_qdrant: Optional[Tuple[asyncio.AbstractEventLoop, TrackedQdrantClient]] = None
+        self._async_mongo: Optional[Tuple[asyncio.AbstractEventLoop, AsyncMongoClient]] = None
+        self._lock = threading.Lock()
+
+    def collection(self, name: str):
+        """
+        A collection of the application database on the synchronous client.
+        """
+        return self.mongo[MONGO_DB][name]
+
+    def async_qdrant(self) -> TrackedQdrantClient:
+        """
+        Return the async Qdrant client of the running event loop, creating it on first use.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_qdrant is None or self._async_qdrant[0] is not loop:
+                # The version compatibility probe is a synchronous HTTP call; skip it on the event loop.
+                client = AsyncQdrantClient(**_qdrant_options(), check_compatibility=False)
+                self._async_qdrant = (loop, TrackedQdrantClient(client, "async", settings.QDRANT_POOL_SIZE))
+            return self._async_qdrant[1]
+
+    def async_mongo(self) -> AsyncMongoClient:
+        """
+        Return the async MongoDB client of the running event loop, creating it on first use.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_mongo is None or self._async_mongo[0] is not loop:
+                self._async_mongo = (loop, AsyncMongoClient(settings.MONGODB_URI, **_mongo_options(self.async_mongo_pool)))
+            return self._async_mongo[1]
+
+    def async_collection(self, name: str):
+        """
+        A collection of the application database on the async client.
+        """
+        return self.async_mongo()[MONGO_DB][name]
+
+    def pool_stats(self) -> dict:
+        return {
+            "qdrant": {"in_flight": self.qdrant.in_flight, "pool_size": settings.QDRANT_POOL_SIZE,
+                       "transport": "grpc" if settings.QDRANT_PREFER_GRPC else "rest"},
+            "mongodb": {"open": self.mongo_pool.open_connections, "checked_out": self.mongo_pool.checked_out,
+                        "max_pool_size": settings.MONGO_MAX_POOL_SIZE},
+        }
+
+    async def aclose(self) -> None:
+        """
+        Close the async clients created on the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            qdrant, mongo = self._async_qdrant, self._async_mongo
+            if qdrant is not None and qdrant[0] is loop:
+                self._async_qdrant = None
+            if mongo is not None and mongo[0] is loop:
+                self._async_mongo = None
+        if qdrant is not None and qdrant[0] is loop:
+            await qdrant[1].close()
+        if mongo is not None and mongo[0] is loop:
+            await mongo[1].close()
+
+    def close(self) -> None:
+        """
+        Close the synchronous clients.
+        """
+        self.qdrant.close()
+        self.mongo.close()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_clients() -> ClientRegistry:
+    """
+    Return the process-wide client registry, creating it on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+                logger.info(
+                    f"Created clients: Qdrant {settings.QDRANT_HOST} "
+                    f"({'gRPC' if settings.QDRANT_PREFER_GRPC else 'REST'}, pool {settings.QDRANT_POOL_SIZE}), "
+                    f"MongoDB pool {settings.MONGO_MIN_POOL_SIZE}-{settings.MONGO_MAX_POOL_SIZE}"
+                )
+    return _registry
+
+
+def close_clients() -> None:
+    """
+    Close the synchronous clients of the process-wide registry and drop it.
+    Async clients must be closed first, on their event loop (``ClientRegistry.aclose``).
+    """
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        registry.close()
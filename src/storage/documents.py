@@ -0,0 +1,144 @@
+"""
+Listing of ingested documents stored in MongoDB.
+
+``GET /documents`` pages through the ``documents`` collection newest first with keyset
+(cursor) pagination: a page is the first ``limit`` records ordered by
+(``upload_time``, ``_id``) descending that sort after the last record of the previous
+page. Each page is one index range scan no matter how deep it is, unlike skip/limit,
+and records inserted while a client pages never shift or repeat entries.
+The cursor is an opaque token encoding the sort key of the last record returned.
+
+Filters (filename prefix, metadata category, chunking strategy) are applied by MongoDB
+and backed by compound indexes created at API startup by ``ensure_document_indexes``.
+"""
+import base64
+import datetime
+import json
+import logging
+import re
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+logger = logging.getLogger(__name__)
+
+# Fields returned per document; content and ingest bookkeeping stay out of listings.
+LISTING_PROJECTION = {
+    "_id": 1, "filename": 1, "doc_metadata": 1, "upload_time": 1,
+    "chunking_strategy": 1, "chunk_size": 1, "overlap": 1,
+}
+LISTING_SORT = [("upload_time", -1), ("_id", -1)]
+LISTING_INDEXES = (
+    [("upload_time", -1), ("_id", -1)],
+    [("chunking_strategy", 1), ("upload_time", -1), ("_id", -1)],
+    [("doc_metadata_category", 1), ("upload_time", -1), ("_id", -1)],
+    [("filename", 1)],
+)
+
+
+def metadata_category(doc_metadata) -> Optional[str]:
+    """
+    The ``category`` of a document's metadata (a JSON string or dict), if it has one.
+    Stored on the record as ``doc_metadata_category`` so listings can filter on it.
+    """
+    try:
+        parsed = json.loads(doc_metadata) if isinstance(doc_metadata, str) else doc_metadata
+    except ValueError:
+        return None
+    category = parsed.get("category") if isinstance(parsed, dict) else None
+    return str(category) if category is not None else None
+
+
+def encode_cursor(doc: dict) -> str:
+    """
+    Opaque cursor pointing just after ``doc`` in listing order.
+    """
+    upload_time = doc.get("upload_time")
+    key = [upload_time.isoformat() if upload_time else None, str(doc["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor from ``encode_cursor``.
+    Returns:
+        Tuple[Optional[datetime.datetime], ObjectId]: Sort key of the last record already returned.
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        upload_time, object_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (datetime.datetime.fromisoformat(upload_time) if upload_time else None), ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def listing_filter(filename_prefix: Optional[str] = None, category: Optional[str] = None,
+                   strategy: Optional[str] = None, cursor: Optional[str] = None) -> dict:
+    """
+    MongoDB filter selecting the documents of a listing page.
+    Args:
+        filename_prefix (str, optional): Only filenames starting with this (case-sensitive).
+        category (str, optional): Only documents whose metadata category equals this.
+        strategy (str, optional): Only documents chunked with this strategy.
+        cursor (str, optional): Only documents after this cursor in listing order.
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    conditions = []
+    if filename_prefix:
+        # An anchored, case-sensitive prefix regex is answered from the filename index.
+        conditions.append({"filename": {"$regex": "^" + re.escape(filename_prefix)}})
+    if category:
+        conditions.append({"doc_metadata_category": category})
+    if strategy:
+        conditions.append({"chunking_strategy": strategy})
+    if cursor:
+        upload_time, object_id = decode_cursor(cursor)
+        if upload_time is None:
+            # Records without upload_time sort last (null sorts lowest).
+            conditions.append({"upload_time": None, "_id": {"$lt": object_id}})
+        else:
+            conditions.append({"$or": [
+                {"upload_time": {"$lt": upload_time}},
+                {"upload_time": upload_time, "_id": {"$lt": object_id}},
+                {"upload_time": None},
+            ]})
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def document_summary(doc: dict) -> dict:
+    """
+    API representation of a listed document record.
+    """
+    upload_time = doc.get("upload_time")
+    return {
+        "document_id": str(doc["_id"]),
+        "filename": doc.get("filename"),
+        # Convert None to empty string for doc_metadata
+        "doc_metadata": doc.get("doc_metadata") or "",
+        "upload_time": upload_time.isoformat() if isinstance(upload_time, datetime.datetime) else upload_time,
+        "chunking_strategy": doc.get("chunking_strategy", "unknown"),
+        "chunk_size": doc.get("chunk_size"),
+        "overlap": doc.get("overlap"),
+    }
+
+
+def ensure_document_indexes(collection) -> None:
+    """
+    Create the listing indexes and store ``doc_metadata_category`` on records ingested
+    before it existed. Both are idempotent; the backfill marks records it has seen.
+    Args:
+        collection: The synchronous ``documents`` collection.
+    """
+    for keys in LISTING_INDEXES:
+        collection.create_index(keys)
+    backfilled = 0
+    for doc in collection.find({"doc_metadata_category": {"$exists": False}}, {"doc_metadata": 1}):
+        collection.update_one({"_id": doc["_id"]}, {"$set": {"doc_metadata_category": metadata_category(doc.get("doc_metadata"))}})
+        backfilled += 1
+    if backfilled:
+        logger.info(f"Stored doc_metadata_category on {backfilled} existing documents")
@@ -0,0 +1,699 @@
+"""
+Persistent, incrementally updated BM25 index for the keyword leg of hybrid search.
+
+Chunks are tokenized by ``analyze`` (shared by indexing and querying) into an inverted
+index stored as immutable on-disk segments. Each segment directory holds:
+
+- ``terms.json``: term -> [offset, count] into the postings arrays,
+- ``postings.npy`` / ``freqs.npy``: chunk ordinals and term frequencies, grouped by term,
+- ``lengths.npy``: token count of every chunk,
+- ``docs.json``: Qdrant point id and document id of every chunk.
+
+Postings are memory-mapped, so a query only reads the postings of its own terms and
+scores them with vectorized BM25; its cost depends on how many chunks contain the query
+terms, not on the size of the corpus. New chunks are buffered in memory (and searched
+from there) until ``flush`` writes them as a new segment. Deletions are tombstones kept
+in ``manifest.json`` and dropped when segments are merged; merges keep the number of
+segments logarithmic in the number of chunks. Ingest calls ``flush_if_due``, which
+flushes once ``KEYWORD_INDEX_FLUSH_CHUNKS`` chunks are buffered or
+``KEYWORD_INDEX_FLUSH_INTERVAL_SECONDS`` have passed since the last flush.
+
+Searches never wait for a flush: segments are written and merged outside the index
+lock, which is held only to take a snapshot of the buffer and segment list and to swap
+in the new segments. Scoring runs on the snapshot, outside the lock.
+
+Writers (the API and bulk ingest worker processes) serialize on a file lock and re-read
+the manifest before writing; readers pick up other processes' segments when the
+manifest changes. Chunks are identified by Qdrant point id, so re-indexing a point
+replaces its earlier copy.
+
+Usage (rebuild the index from the Qdrant collection, e.g. after upgrading):
+    python -m src.storage.keyword_index rebuild
+"""
+import abc
+import argparse
+import fcntl
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+MANIFEST = "manifest.json"
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Split text into index terms: NFKC-normalized, case-folded runs of word characters.
+    """
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class _Source(abc.ABC):
+    """
+    Chunks of one segment (or of the in-memory buffer) with their live mask.
+    """
+
+    point_ids: List[str]
+    document_ids: List[str]
+    lengths: np.ndarray
+    live: np.ndarray
+
+    @abc.abstractmethod
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Chunk ordinals containing ``term`` and its frequency in each.
+        """
+
+    @abc.abstractmethod
+    def terms(self) -> Iterable[str]:
+        """
+        Every term with postings in this source.
+        """
+
+    def locate_points(self, point_ids: Set[str]) -> List[int]:
+        return [i for i, p in enumerate(self.point_ids) if p in point_ids]
+
+    def locate_documents(self, document_ids: Set[str]) -> List[int]:
+        return [i for i, d in enumerate(self.document_ids) if d in document_ids]
+
+    def refresh_stats(self) -> None:
+        self.live_count = int(self.live.sum())
+        self.live_length = int(self.lengths[self.live].sum())
+
+
+class _Segment(_Source):
+    def __init__(self, directory: str, name: str, deleted: Iterable[int] = ()):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        with open(os.path.join(self.path, "terms.json"), "r", encoding="utf-8") as f:
+            self._terms: Dict[str, List[int]] = json.load(f)
+        with open(os.path.join(self.path, "docs.json"), "r", encoding="utf-8") as f:
+            docs = json.load(f)
+        self.point_ids, self.document_ids = docs["point_ids"], docs["document_ids"]
+        self._postings = np.load(os.path.join(self.path, "postings.npy"), mmap_mode="r")
+        self._freqs = np.load(os.path.join(self.path, "freqs.npy"), mmap_mode="r")
+        self.lengths = np.load(os.path.join(self.path, "lengths.npy"))
+        self._point_index = {p: i for i, p in enumerate(self.point_ids)}
+        self._document_index: Optional[Dict[str, List[int]]] = None
+        self.set_deleted(deleted)
+
+    def set_deleted(self, deleted: Iterable[int]) -> None:
+        self.deleted = set(deleted)
+        self.live = np.ones(len(self.point_ids), dtype=bool)
+        if self.deleted:
+            self.live[list(self.deleted)] = False
+        self.refresh_stats()
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        entry = self._terms.get(term)
+        if entry is None:
+            return _EMPTY, _EMPTY
+        start, count = entry
+        return self._postings[start:start + count], self._freqs[start:start + count]
+
+    def terms(self) -> Iterable[str]:
+        return self._terms.keys()
+
+    def locate_points(self, point_ids: Set[str]) -> List[int]:
+        return [self._point_index[p] for p in point_ids if p in self._point_index]
+
+    def locate_documents(self, document_ids: Set[str]) -> List[int]:
+        if self._document_index is None:
+            self._document_index = {}
+            for i, document_id in enumerate(self.document_ids):
+                self._document_index.setdefault(document_id, []).append(i)
+        return [i for d in document_ids for i in self._document_index.get(d, ())]
+
+
+class _Buffer(_Source):
+    """
+    Chunks indexed since the last flush; searched directly from memory.
+    """
+
+    def __init__(self):
+        self.point_ids, self.document_ids = [], []
+        self._lengths: List[int] = []
+        self._live: List[bool] = []
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._point_index: Dict[str, int] = {}
+        self._dirty = True
+        self.sync()
+
+    def __len__(self) -> int:
+        return len(self.point_ids)
+
+    def add(self, point_id: str, document_id: str, text: str) -> None:
+        previous = self._point_index.get(point_id)
+        if previous is not None:
+            self._live[previous] = False
+        ordinal = len(self.point_ids)
+        terms = Counter(analyze(text))
+        for term, tf in terms.items():
+            ordinals, freqs = self._postings.setdefault(term, ([], []))
+            ordinals.append(ordinal)
+            freqs.append(tf)
+        self.point_ids.append(point_id)
+        self.document_ids.append(document_id)
+        self._lengths.append(sum(terms.values()))
+        self._live.append(True)
+        self._point_index[point_id] = ordinal
+        self._arrays.clear()
+        self._dirty = True
+
+    def kill(self, ordinals: Iterable[int]) -> None:
+        for ordinal in ordinals:
+            self._live[ordinal] = False
+        self._dirty = True
+
+    def sync(self) -> None:
+        """
+        Refresh the array views of the buffered chunks after adds or kills.
+        """
+        if self._dirty:
+            self.lengths = np.asarray(self._lengths, dtype=np.int32)
+            self.live = np.asarray(self._live, dtype=bool)
+            self.refresh_stats()
+            self._dirty = False
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        if term not in self._postings:
+            return _EMPTY, _EMPTY
+        if term not in self._arrays:
+            ordinals, freqs = self._postings[term]
+            self._arrays[term] = (np.asarray(ordinals, dtype=np.int32), np.asarray(freqs, dtype=np.int32))
+        return self._arrays[term]
+
+    def terms(self) -> Iterable[str]:
+        return self._postings.keys()
+
+    def locate_points(self, point_ids: Set[str]) -> List[int]:
+        return [self._point_index[p] for p in point_ids if p in self._point_index]
+
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class _Snapshot:
+    """
+    Read-only view of a source for one search. Segment postings are immutable and read
+    lazily; buffer postings can change after the lock is released, so the query terms'
+    postings are copied up front.
+    """
+
+    def __init__(self, source: _Source, terms: Iterable[str]):
+        self.point_ids = source.point_ids
+        self.size = len(source.point_ids)
+        self.lengths, self.live = source.lengths, source.live
+        self.live_count, self.live_length = source.live_count, source.live_length
+        self._source = source
+        self._postings = {term: source.postings(term) for term in terms} if isinstance(source, _Buffer) else None
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        if self._postings is not None:
+            return self._postings[term]
+        return self._source.postings(term)
+
+
+def _write_segment(path: str, sources: List[_Source]) -> int:
+    """
+    Write the live chunks of ``sources`` as one segment at ``path``.
+    Returns:
+        int: Number of chunks written.
+    """
+    remaps, point_ids, document_ids, lengths = [], [], [], []
+    base = 0
+    for source in sources:
+        remap = np.cumsum(source.live, dtype=np.int64) - 1 + base
+        remaps.append(remap)
+        for i in np.flatnonzero(source.live):
+            point_ids.append(source.point_ids[i])
+            document_ids.append(source.document_ids[i])
+        lengths.append(source.lengths[source.live])
+        base += source.live_count
+    terms: Dict[str, List[int]] = {}
+    postings, freqs = [], []
+    offset = 0
+    for term in sorted(set().union(*(source.terms() for source in sources))):
+        term_postings, term_freqs = [], []
+        for source, remap in zip(sources, remaps):
+            ordinals, tfs = source.postings(term)
+            if len(ordinals):
+                mask = source.live[ordinals]
+                term_postings.append(remap[ordinals[mask]])
+                term_freqs.append(tfs[mask])
+        count = sum(len(p) for p in term_postings)
+        if count:
+            terms[term] = [offset, count]
+            postings.extend(term_postings)
+            freqs.extend(term_freqs)
+            offset += count
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "postings.npy"), np.concatenate(postings).astype(np.int32) if postings else _EMPTY)
+    np.save(os.path.join(tmp, "freqs.npy"), np.concatenate(freqs).astype(np.int32) if freqs else _EMPTY)
+    np.save(os.path.join(tmp, "lengths.npy"), np.concatenate(lengths).astype(np.int32) if lengths else _EMPTY)
+    with open(os.path.join(tmp, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f)
+    with open(os.path.join(tmp, "docs.json"), "w", encoding="utf-8") as f:
+        json.dump({"point_ids": point_ids, "document_ids": document_ids}, f)
+    os.rename(tmp, path)
+    return base
+
+
+class KeywordIndex:
+    """
+    BM25 inverted index over chunk texts, persisted as memory-mapped segments. Thread-safe.
+    Args:
+        directory (str): Directory holding the manifest and segments (created if missing).
+        flush_chunks (int): Buffered chunks that trigger an automatic flush.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, directory: str, flush_chunks: int = 10000, flush_interval: float = 30.0):
+        self.directory = directory
+        self.flush_chunks = flush_chunks
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        self._buffer = _Buffer()
+        # Buffers taken by a flush that has not committed yet (or failed); still searched.
+        self._frozen: List[_Buffer] = []
+        self._deleted_points: Set[str] = set()
+        self._deleted_documents: Set[str] = set()
+        self._manifest_stamp = None
+        self._next_segment = 0
+        self._last_flush = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        os.makedirs(directory, exist_ok=True)
+        self._reload()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def has_manifest(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._maybe_reload()
+            return sum(source.live_count for source in self._sources())
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def _sources(self) -> List[_Source]:
+        for buffer in (*self._frozen, self._buffer):
+            buffer.sync()
+        return [*self._segments, *self._frozen, self._buffer]
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        # The manifest is replaced, never rewritten in place, so its inode changes on every write.
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _maybe_reload(self) -> None:
+        if self._stamp() != self._manifest_stamp:
+            self._reload()
+
+    def _reload(self, attempts: int = 3) -> None:
+        """
+        Bring the segment list in line with the manifest on disk, keeping segments that are
+        already open and re-applying this process's unflushed deletions.
+        """
+        for attempt in range(attempts):
+            try:
+                self._load_manifest()
+                break
+            except FileNotFoundError:
+                # Another process merged away a segment between our manifest read and its open.
+                if attempt == attempts - 1:
+                    raise
+        self._apply_deletions(self._deleted_points, self._deleted_documents)
+        self._record_size()
+
+    def _load_manifest(self) -> None:
+        stamp = self._stamp()
+        manifest = {"segments": [], "next_segment": 0}
+        if stamp is not None:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        opened = {segment.name: segment for segment in self._segments}
+        segments = []
+        for entry in manifest["segments"]:
+            segment = opened.get(entry["name"])
+            if segment is None:
+                segment = _Segment(self.directory, entry["name"], entry["deleted"])
+            else:
+                segment.set_deleted(entry["deleted"])
+            segments.append(segment)
+        self._segments = segments
+        self._next_segment = manifest["next_segment"]
+        self._manifest_stamp = stamp
+
+    def _apply_deletions(self, point_ids: Set[str], document_ids: Set[str]) -> None:
+        if not point_ids and not document_ids:
+            return
+        for segment in self._segments:
+            dead = segment.locate_points(point_ids) + segment.locate_documents(document_ids)
+            if dead:
+                segment.set_deleted(segment.deleted.union(dead))
+        for buffer in self._frozen:
+            buffer.kill(buffer.locate_points(point_ids) + buffer.locate_documents(document_ids))
+
+    def add(self, chunks: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        Index chunks, replacing earlier copies of the same point ids.
+        Args:
+            chunks: (point_id, document_id, text) tuples.
+        """
+        with self._lock:
+            added = set()
+            for point_id, document_id, text in chunks:
+                self._buffer.add(point_id, document_id, text)
+                added.add(point_id)
+            # Copies of these points in segments are superseded by the buffered ones.
+            self._deleted_points |= added
+            self._apply_deletions(added, set())
+            full = len(self._buffer) >= self.flush_chunks
+        if full:
+            self.flush()
+
+    def add_points(self, points) -> None:
+        """
+        Index Qdrant points (``PointStruct`` or records) by their payload text.
+        """
+        self.add(
+            (str(p.id), str(p.payload.get("document_id") or p.payload.get("mongo_id", "")), p.payload.get("text", ""))
+            for p in points if p.payload and p.payload.get("text")
+        )
+
+    def delete_document(self, document_id: str) -> None:
+        """
+        Remove all chunks of a document and persist the deletion.
+        """
+        with self._lock:
+            self._buffer.kill(self._buffer.locate_documents({document_id}))
+            self._deleted_documents.add(document_id)
+            self._apply_deletions(set(), {document_id})
+        self.flush()
+
+    def _has_pending(self) -> bool:
+        return bool(len(self._buffer) or self._frozen or self._deleted_points or self._deleted_documents)
+
+    def flush_if_due(self) -> None:
+        """
+        Flush if ``flush_chunks`` chunks are buffered or ``flush_interval`` seconds have
+        passed since the last flush; otherwise make sure a timer flushes the pending
+        changes once the interval is up.
+        """
+        with self._lock:
+            if not self._has_pending():
+                return
+            wait = self._last_flush + self.flush_interval - time.time()
+            if len(self._buffer) < self.flush_chunks and wait > 0:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(wait, self._flush_pending)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def _flush_pending(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to persist the keyword index: {e}")
+
+    def flush(self) -> None:
+        """
+        Persist buffered chunks and deletions: write the buffer as a new segment, merge
+        segments where needed and atomically replace the manifest. Segments are built
+        under the cross-process write lock only; searches keep running on the current
+        segments and buffer until the new ones are swapped in.
+        """
+        with self._write_lock():
+            with self._lock:
+                self._reload()
+                if len(self._buffer):
+                    self._frozen.append(self._buffer)
+                    self._buffer = _Buffer()
+                frozen = list(self._frozen)
+                segments = [segment for segment in self._segments if segment.live_count]
+                next_segment = self._next_segment
+                # Deletions up to here are written with these segments; later ones stay pending.
+                flushed = self._deleted_points, self._deleted_documents
+                self._deleted_points, self._deleted_documents = set(), set()
+                for buffer in frozen:
+                    buffer.sync()
+            written = []
+            try:
+                if any(buffer.live_count for buffer in frozen):
+                    segments.append(self._new_segment(frozen, f"seg_{next_segment:08d}"))
+                    next_segment += 1
+                    written.append(segments[-1])
+                # Merge while the previous segment is not much larger than the newest,
+                # so segment sizes grow geometrically and their number stays logarithmic.
+                while len(segments) > 1 and segments[-2].live_count <= 2 * segments[-1].live_count:
+                    segments[-2:] = [self._new_segment(segments[-2:], f"seg_{next_segment:08d}")]
+                    next_segment += 1
+                    written.append(segments[-1])
+                with self._lock:
+                    # Deletions made while building reached the old segments; carry them over.
+                    self._next_segment = next_segment
+                    self._replace_segments(segments, written)
+                    self._frozen = [buffer for buffer in self._frozen if buffer not in frozen]
+                    self._apply_deletions(self._deleted_points, self._deleted_documents)
+                    self._last_flush = time.time()
+            except BaseException:
+                with self._lock:
+                    self._deleted_points |= flushed[0]
+                    self._deleted_documents |= flushed[1]
+                for segment in written:
+                    shutil.rmtree(segment.path, ignore_errors=True)
+                raise
+        self._record_size()
+
+    def clear(self) -> None:
+        """
+        Remove every chunk from the index, including other processes' flushed chunks.
+        """
+        with self._write_lock(), self._lock:
+            self._reload()
+            self._replace_segments([], [])
+            self._buffer = _Buffer()
+            self._frozen = []
+            self._deleted_points.clear()
+            self._deleted_documents.clear()
+        self._record_size()
+
+    @contextmanager
+    def _write_lock(self):
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _replace_segments(self, segments: List[_Segment], written: List[_Segment]) -> None:
+        """
+        Commit a new segment list and remove the files of segments no longer referenced,
+        including intermediate merge results.
+        """
+        self._write_manifest(segments)
+        kept = {segment.name for segment in segments}
+        for segment in [*self._segments, *written]:
+            if segment.name not in kept:
+                shutil.rmtree(segment.path, ignore_errors=True)
+        self._segments = segments
+
+    def _new_segment(self, sources: List[_Source], name: str) -> _Segment:
+        _write_segment(os.path.join(self.directory, name), sources)
+        return _Segment(self.directory, name)
+
+    def _write_manifest(self, segments: List[_Segment]) -> None:
+        manifest = {
+            "segments": [{"name": s.name, "deleted": sorted(s.deleted)} for s in segments],
+            "next_segment": self._next_segment,
+        }
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+        self._manifest_stamp = self._stamp()
+
+    def _record_size(self) -> None:
+        record_metrics("keyword_index_chunks", sum(source.live_count for source in self._sources()))
+        record_metrics("keyword_index_segments", len(self._segments))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Score chunks containing any query term with BM25.
+        Args:
+            query (str): Query text, analyzed like the indexed chunks.
+            limit (int, optional): Return only the best ``limit`` chunks.
+        Returns:
+            List[Tuple[str, float]]: (point_id, score), best first.
+        """
+        start = time.time()
+        terms = Counter(analyze(query))
+        with self._lock:
+            self._maybe_reload()
+            sources = [_Snapshot(source, terms) for source in self._sources()]
+        chunk_count = sum(source.live_count for source in sources)
+        if not terms or not chunk_count:
+            return []
+        avgdl = max(sum(source.live_length for source in sources) / chunk_count, 1e-9)
+        offsets = np.cumsum([0] + [source.size for source in sources])
+        keys, contributions = [], []
+        for term, query_tf in terms.items():
+            matches = []
+            for offset, source in zip(offsets, sources):
+                ordinals, tfs = source.postings(term)
+                if len(ordinals):
+                    mask = source.live[ordinals]
+                    ordinals = ordinals[mask]
+                    matches.append((ordinals + offset, tfs[mask], source.lengths[ordinals]))
+            df = sum(len(m[0]) for m in matches)
+            if not df:
+                continue
+            idf = math.log(1.0 + (chunk_count - df + 0.5) / (df + 0.5))
+            for ordinals, tfs, lengths in matches:
+                tfs = tfs.astype(np.float64)
+                norm = self.K1 * (1.0 - self.B + self.B * lengths / avgdl)
+                keys.append(ordinals)
+                contributions.append(query_tf * idf * tfs * (self.K1 + 1.0) / (tfs + norm))
+        if not keys:
+            return []
+        keys = np.concatenate(keys)
+        matched, inverse = np.unique(keys, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        if limit is not None and limit < len(scores):
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        owners = np.searchsorted(offsets, matched[best], side="right") - 1
+        hits = [
+            (sources[owner].point_ids[int(key) - int(offsets[owner])], float(scores[i]))
+            for i, owner, key in zip(best, owners, matched[best])
+        ]
+        record_metrics("keyword_search_postings", len(keys))
+        record_metrics("keyword_search_latency", time.time() - start)
+        return hits
+
+
+_index: Optional[KeywordIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_keyword_index() -> KeywordIndex:
+    """
+    Return the process-wide keyword index stored in ``KEYWORD_INDEX_DIR``.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = KeywordIndex(
+                    settings.KEYWORD_INDEX_DIR,
+                    flush_chunks=settings.KEYWORD_INDEX_FLUSH_CHUNKS,
+                    flush_interval=settings.KEYWORD_INDEX_FLUSH_INTERVAL_SECONDS,
+                )
+    return _index
+
+
+def shutdown_keyword_index() -> None:
+    """
+    Persist changes still waiting for a timed flush before the process exits.
+    """
+    if _index is not None:
+        with _index._lock:
+            timer, _index._flush_timer = _index._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        if _index._has_pending():
+            _index.flush()
+
+
+def rebuild(client, collection_name: str, index: Optional[KeywordIndex] = None, page_size: int = 1000) -> int:
+    """
+    Re-index every point of a Qdrant collection, replacing the current index contents.
+    Returns:
+        int: Number of chunks indexed.
+    """
+    index = index or get_keyword_index()
+    index.clear()
+    total, offset = 0, None
+    if client.collection_exists(collection_name=collection_name):
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name, limit=page_size, offset=offset,
+                with_payload=["text", "document_id", "mongo_id"], with_vectors=False,
+            )
+            index.add_points(points)
+            total += len(points)
+            if offset is None:
+                break
+    index.flush()
+    return total
+
+
+def ensure_keyword_index(client, collection_name: str) -> None:
+    """
+    Build the keyword index from Qdrant if it has never been written (e.g. after upgrading).
+    """
+    index = get_keyword_index()
+    if not index.has_manifest():
+        logger.info(f"Keyword index in {index.directory} is missing; rebuilding it from Qdrant")
+        logger.info(f"Indexed {rebuild(client, collection_name, index)} chunks")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the BM25 keyword index.")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: re-index every chunk stored in Qdrant.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "rebuild":
+        from src.storage.clients import get_clients
+        from src.storage.vector_db import COLLECTION_NAME
+
+        start = time.time()
+        count = rebuild(get_clients().qdrant, COLLECTION_NAME)
+        print(f"Indexed {count} chunks into {settings.KEYWORD_INDEX_DIR} in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
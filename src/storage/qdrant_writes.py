@@ -0,0 +1,271 @@
+"""
+Batched, parallel Qdrant upserts.
+
+Large point lists are split into batches of ``QDRANT_UPSERT_BATCH_SIZE`` and sent with
+at most ``QDRANT_UPSERT_PARALLELISM`` requests in flight. With ``QDRANT_UPSERT_WAIT``
+enabled every request blocks until Qdrant has applied the write (read-your-writes).
+Without it Qdrant only acknowledges receipt, and the batches are handed to an
+``UpsertReconciler`` that confirms in the background that the points became
+visible, re-sending any batch that did not. Pending batches keep their vectors as
+float32 arrays rather than lists of Python floats (about an eighth of the memory),
+and at most ``QDRANT_RECONCILE_MAX_PENDING_POINTS`` points await confirmation.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+from src.storage.query_cache import bump_corpus_generation
+
+logger = logging.getLogger(__name__)
+
+
+def _batches(points: Sequence, batch_size: int) -> List[Sequence]:
+    batch_size = max(1, batch_size)
+    return [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+
+
+def _compact_vector(vector):
+    if isinstance(vector, dict):
+        return {name: _compact_vector(v) for name, v in vector.items()}
+    if isinstance(vector, (list, tuple)):
+        return np.asarray(vector, dtype=np.float32)
+    return vector  # sparse vectors are already compact
+
+
+def _expand_vector(vector):
+    if isinstance(vector, dict):
+        return {name: _expand_vector(v) for name, v in vector.items()}
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return vector
+
+
+def _compact_points(points: Sequence) -> List[tuple]:
+    return [(p.id, _compact_vector(p.vector), p.payload) for p in points]
+
+
+def _expand_points(points: Sequence[tuple]) -> List[PointStruct]:
+    return [PointStruct(id=i, vector=_expand_vector(v), payload=payload) for i, v, payload in points]
+
+
+class UpsertReconciler:
+    """
+    Confirm unacknowledged (``wait=False``) upserts in the background.
+    Each tracked batch is checked by retrieving its point ids; missing points cause the
+    batch to be re-sent with ``wait=True``, up to ``max_attempts`` times.
+    Args:
+        client: Qdrant client.
+        collection (str): Collection the batches were written to.
+        interval (float): Seconds between reconciliation passes.
+        max_attempts (int): Checks per batch before it is reported as lost.
+        max_pending_points (int): Maximum number of points awaiting confirmation. When a
+            batch would exceed it ``track`` reconciles synchronously first, and if the
+            backlog is still full re-sends the batch with ``wait=True`` instead of tracking it.
+    """
+
+    def __init__(self, client, collection: str, interval: float = 2.0, max_attempts: int = 3,
+                 max_pending_points: int = 20000):
+        self.client = client
+        self.collection = collection
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.max_pending_points = max_pending_points
+        self._pending: List[dict] = []
+        self._pending_points = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, points: Sequence) -> None:
+        """
+        Register a batch written with ``wait=False`` for later confirmation.
+        """
+        if not self._has_room(len(points)):
+            self.reconcile_once()
+            if not self._has_room(len(points)):
+                # Backlog still full (Qdrant slow or down): confirm this batch inline instead.
+                self.client.upsert(collection_name=self.collection, points=points, wait=True)
+                return
+        with self._lock:
+            self._pending.append({"points": _compact_points(points), "attempts": 0, "sent_at": time.time()})
+            self._pending_points += len(points)
+            record_metrics("qdrant_unconfirmed_batches", len(self._pending))
+        self._ensure_started()
+
+    def _has_room(self, points: int) -> bool:
+        with self._lock:
+            return not self._pending or self._pending_points + points <= self.max_pending_points
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def reconcile_once(self) -> int:
+        """
+        Check every pending batch once.
+        Returns:
+            int: Number of batches confirmed in this pass.
+        """
+        with self._lock:
+            batches, self._pending = self._pending, []
+            self._pending_points = 0
+        confirmed = 0
+        retry = []
+        for batch in batches:
+            ids = [point[0] for point in batch["points"]]
+            try:
+                found = {str(p.id) for p in self.client.retrieve(
+                    collection_name=self.collection, ids=ids, with_payload=False, with_vectors=False
+                )}
+            except Exception as e:
+                logger.warning(f"Could not confirm Qdrant upsert of {len(ids)} points: {e}")
+                found = None
+            if found is not None and all(str(i) in found for i in ids):
+                confirmed += 1
+                record_metrics("qdrant_latency", time.time() - batch["sent_at"], operation="upsert_confirm")
+                continue
+            batch["attempts"] += 1
+            if batch["attempts"] >= self.max_attempts:
+                logger.error(f"Qdrant upsert of {len(ids)} points was not confirmed after {batch['attempts']} checks")
+                record_metrics("error_count", 1, endpoint="qdrant_reconcile")
+                continue
+            if found is not None:
+                # Points are missing: the acknowledged write was lost, send it again and wait for it.
+                try:
+                    self.client.upsert(collection_name=self.collection, points=_expand_points(batch["points"]), wait=True)
+                except Exception as e:
+                    logger.warning(f"Re-sending unconfirmed Qdrant upsert failed: {e}")
+            retry.append(batch)
+        with self._lock:
+            self._pending = retry + self._pending
+            self._pending_points = sum(len(b["points"]) for b in self._pending)
+            record_metrics("qdrant_unconfirmed_batches", len(self._pending))
+        if confirmed or retry:
+            # Unacknowledged writes became (or were re-sent to become) visible after the upsert returned.
+            bump_corpus_generation()
+        return confirmed
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Reconcile until nothing is pending or ``timeout`` expires.
+        Returns:
+            bool: True if every tracked batch was confirmed or given up on.
+        """
+        deadline = time.time() + timeout
+        while self.pending and time.time() < deadline:
+            self.reconcile_once()
+            if self.pending:
+                time.sleep(min(self.interval, max(deadline - time.time(), 0)))
+        return not self.pending
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stop the background thread after a final flush.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="qdrant-reconciler", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self.pending:
+                self.reconcile_once()
+
+
+class BatchedUpserter:
+    """
+    Split point lists into batches and upsert them with bounded parallelism.
+    Args:
+        client: Qdrant client.
+        collection (str): Target collection.
+        batch_size (int): Points per upsert request.
+        parallelism (int): Maximum concurrent upsert requests.
+        wait (bool): Block each request until the write is applied; when False the
+            batches are confirmed later by ``reconciler``.
+        reconciler (UpsertReconciler, optional): Required when ``wait`` is False.
+    """
+
+    def __init__(self, client, collection: str, batch_size: int = 256, parallelism: int = 4, wait: bool = True,
+                 reconciler: Optional[UpsertReconciler] = None):
+        self.client = client
+        self.collection = collection
+        self.batch_size = batch_size
+        self.wait = wait
+        self.reconciler = reconciler
+        self._executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="qdrant-upsert")
+
+    def upsert(self, points: Sequence) -> None:
+        """
+        Upsert all points; returns once every batch was applied (``wait=True``) or
+        acknowledged (``wait=False``). The first failing batch's error is raised.
+        """
+        batches = _batches(points, self.batch_size)
+        if len(batches) == 1:
+            self._send(batches[0])
+            return
+        futures = [self._executor.submit(self._send, batch) for batch in batches]
+        errors = [f.exception() for f in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _send(self, batch: Sequence) -> None:
+        start = time.time()
+        self.client.upsert(collection_name=self.collection, points=batch, wait=self.wait)
+        record_metrics("qdrant_latency", time.time() - start, operation="upsert")
+        if not self.wait and self.reconciler is not None:
+            self.reconciler.track(batch)
+
+
+_reconciler: Optional[UpsertReconciler] = None
+_reconciler_lock = threading.Lock()
+
+
+def get_upsert_reconciler(client, collection: str) -> UpsertReconciler:
+    """
+    Return the process-wide reconciler, creating it on first use.
+    """
+    global _reconciler
+    if _reconciler is None:
+        with _reconciler_lock:
+            if _reconciler is None:
+                _reconciler = UpsertReconciler(
+                    client,
+                    collection,
+                    interval=settings.QDRANT_RECONCILE_INTERVAL_SECONDS,
+                    max_attempts=settings.QDRANT_RECONCILE_MAX_ATTEMPTS,
+                    max_pending_points=settings.QDRANT_RECONCILE_MAX_PENDING_POINTS,
+                )
+    return _reconciler
+
+
+def shutdown_upsert_reconciler(timeout: float = 30.0) -> None:
+    """
+    Confirm outstanding unacknowledged writes before the process exits.
+    """
+    if _reconciler is not None:
+        _reconciler.stop(timeout)
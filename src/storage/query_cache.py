@@ -0,0 +1,154 @@
+"""
+Query result cache with generation-based invalidation.
+
+Every write to the corpus (ingest upserts, document deletes, clean-up of failed
+ingests) bumps a process-wide corpus generation. Cached ``query_documents`` results
+are keyed by the generation current when the query started plus the normalized
+request, so a write makes every earlier entry unreachable and results are never
+stale after writes made by this process. Unreachable entries age out of the
+byte-bounded LRU; ``QUERY_RESULT_CACHE_TTL_SECONDS`` bounds staleness for writes made
+by other processes (e.g. the bulk ingest CLI).
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+from src.processing.embedding_cache import normalize_text
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def bump_corpus_generation() -> int:
+    """
+    Record that the corpus changed; invalidates all cached query results.
+    Returns:
+        int: The new generation.
+    """
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def corpus_generation() -> int:
+    return _generation
+
+
+def request_key(query: str, top_k: int, similarity_threshold: float, filters: Optional[dict], use_hybrid: bool) -> str:
+    """
+    Normalize a query request into a cache key. Whitespace differences in the query
+    and key order in ``filters`` do not change the results, so they map to the same key.
+    """
+    return json.dumps(
+        [normalize_text(query), int(top_k), float(similarity_threshold), filters or {}, bool(use_hybrid)],
+        sort_keys=True, default=str,
+    )
+
+
+class QueryResultCache:
+    """
+    Byte-bounded LRU of query results with an optional time-to-live. Thread-safe.
+    An entry's size is estimated from its key and result texts plus a fixed overhead per result.
+    Args:
+        max_bytes (int): Memory budget; least recently used entries are evicted beyond it.
+        ttl_seconds (float, optional): Age after which an entry is treated as a miss.
+    """
+
+    RESULT_OVERHEAD_BYTES = 512
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[List[dict], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry_bytes(self, key: Tuple[int, str], results: List[dict]) -> int:
+        return len(key[1]) + sum(len(str(r.get("text", ""))) + self.RESULT_OVERHEAD_BYTES for r in results)
+
+    def get(self, generation: int, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get((generation, key))
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                self._drop((generation, key))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((generation, key))
+        record_metrics("query_result_cache_hit" if entry is not None else "query_result_cache_miss", 1)
+        return entry[0] if entry is not None else None
+
+    def put(self, generation: int, key: str, results: List[dict]) -> None:
+        size = self._entry_bytes((generation, key), results)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != _generation:
+                return  # the corpus changed while the query ran
+            if (generation, key) in self._entries:
+                self._drop((generation, key))
+            self._entries[(generation, key)] = (results, time.monotonic(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+            size_bytes = self._bytes
+        record_metrics("query_result_cache_bytes", size_bytes)
+
+    def _drop(self, key: Tuple[int, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+_cache: Optional[QueryResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_result_cache() -> Optional[QueryResultCache]:
+    """
+    Return the process-wide query result cache, or None when it is disabled
+    (``QUERY_RESULT_CACHE_MAX_BYTES`` is 0).
+    """
+    global _cache
+    if settings.QUERY_RESULT_CACHE_MAX_BYTES <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryResultCache(settings.QUERY_RESULT_CACHE_MAX_BYTES, settings.QUERY_RESULT_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def cached_query_documents(query: str, top_k: int = 5, similarity_threshold: float = 0.7, filters: Optional[dict] = None,
+                           use_hybrid: bool = True) -> Tuple[List[dict], float, bool]:
+    """
+    ``query_documents`` behind the result cache.
+    Empty results are not cached, since ``query_documents`` also returns them on failure.
+    Returns:
+        Tuple[List[dict], float, bool]: Results, latency (ms) and whether they came from the cache.
+    """
+    from src.storage.vector_db import query_documents
+
+    cache = get_query_result_cache()
+    if cache is None:
+        return (*query_documents(query, top_k, similarity_threshold, filters, use_hybrid), False)
+    start = time.time()
+    generation = corpus_generation()
+    key = request_key(query, top_k, similarity_threshold, filters, use_hybrid)
+    results = cache.get(generation, key)
+    if results is not None:
+        return results, (time.time() - start) * 1000, True
+    results, latency = query_documents(query, top_k, similarity_threshold, filters, use_hybrid)
+    if results:
+        cache.put(generation, key, results)
+    return results, latency, False
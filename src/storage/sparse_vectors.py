@@ -0,0 +1,120 @@
+"""
+Sparse BM25 term-weight vectors for server-side hybrid search in Qdrant.
+
+Collections created by this service carry a named sparse vector (``SPARSE_VECTOR_NAME``)
+next to the unnamed dense one. A chunk's sparse vector holds the BM25 term-frequency
+weight of each of its terms (analyzed like the keyword index), hashed to a uint32
+index. Length normalization uses a fixed average chunk length and the collection is
+configured with ``Modifier.IDF``, so Qdrant applies the inverse document frequency from
+its own statistics at query time; stored vectors never need recomputing as the corpus
+grows. A query then runs the dense and sparse legs as prefetches of one Qdrant request
+fused server-side with reciprocal rank fusion.
+
+Qdrant cannot add a vector to an existing collection, so collections created before
+sparse vectors keep dense-only points and are searched with the client-side keyword
+index (see ``keyword_index``).
+"""
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from qdrant_client.http.models import Modifier, PointStruct, SparseVector, SparseVectorParams
+
+from src.storage.keyword_index import KeywordIndex, analyze
+
+SPARSE_VECTOR_NAME = "bm25"
+DENSE_VECTOR_NAME = ""  # the collection's unnamed dense vector
+# Typical number of analyzer terms in a 512-character chunk; only scales length normalization.
+AVG_CHUNK_TERMS = 80
+
+_support: Dict[Tuple[int, str], bool] = {}
+_support_lock = threading.Lock()
+
+
+def term_index(term: str) -> int:
+    """
+    Stable uint32 index of a term in the sparse vector space.
+    """
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def _sparse(weights: Dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def chunk_sparse_vector(text: str, k1: float = KeywordIndex.K1, b: float = KeywordIndex.B) -> SparseVector:
+    """
+    BM25 term-frequency weights of a chunk; Qdrant multiplies them by the IDF at query time.
+    Terms whose hashes collide share one index and their weights are summed.
+    """
+    terms = Counter(analyze(text))
+    norm = k1 * (1.0 - b + b * sum(terms.values()) / AVG_CHUNK_TERMS)
+    weights: Dict[int, float] = {}
+    for term, tf in terms.items():
+        index = term_index(term)
+        weights[index] = weights.get(index, 0.0) + tf * (k1 + 1.0) / (tf + norm)
+    return _sparse(weights)
+
+
+def query_sparse_vector(query: str) -> SparseVector:
+    """
+    Sparse query vector: each query term weighted by how often it occurs in the query.
+    """
+    weights: Dict[int, float] = {}
+    for term, count in Counter(analyze(query)).items():
+        index = term_index(term)
+        weights[index] = weights.get(index, 0.0) + float(count)
+    return _sparse(weights)
+
+
+def sparse_vectors_config() -> dict:
+    return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def with_sparse_vectors(points):
+    """
+    Copy dense-only points with the sparse vector of their payload text added.
+    """
+    return [
+        PointStruct(
+            id=p.id,
+            vector={DENSE_VECTOR_NAME: p.vector, SPARSE_VECTOR_NAME: chunk_sparse_vector(p.payload.get("text", ""))},
+            payload=p.payload,
+        )
+        for p in points
+    ]
+
+
+def dense_vector(vector):
+    """
+    The dense vector of a retrieved point, whether or not it also has a sparse vector.
+    """
+    return vector.get(DENSE_VECTOR_NAME) if isinstance(vector, dict) else vector
+
+
+def sparse_support(client, collection_name: str) -> Optional[bool]:
+    """
+    Whether the collection has the sparse vector configured, or None if it does not exist.
+    Cached per client once the collection exists; see ``forget_sparse_support``.
+    """
+    key = (id(client), collection_name)
+    supported = _support.get(key)
+    if supported is None:
+        if not client.collection_exists(collection_name=collection_name):
+            return None
+        sparse = client.get_collection(collection_name=collection_name).config.params.sparse_vectors or {}
+        supported = SPARSE_VECTOR_NAME in sparse
+        with _support_lock:
+            _support[key] = supported
+    return supported
+
+
+def forget_sparse_support(collection_name: str) -> None:
+    """
+    Drop cached support checks for a collection that was (re)created.
+    """
+    with _support_lock:
+        for key in [key for key in _support if key[1] == collection_name]:
+            del _support[key]
@@ -1,42 +1,85 @@
 """
 Vector DB module for storing, querying, and deleting document embeddings in Qdrant.
-Implements hybrid search (vector + BM25 keyword).
+Implements hybrid search: dense and sparse BM25 vectors fused by Qdrant (see
+``sparse_vectors``), or vector search merged with the local BM25 ``keyword_index``.
 """
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.http.models import (
+    PointStruct, Filter, FieldCondition, HasIdCondition, MatchValue, Prefetch, FusionQuery, Fusion
+)
 from qdrant_client.http.exceptions import UnexpectedResponse
 import uuid
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Tuple, Dict, Any
-from rank_bm25 import BM25Okapi
 from tenacity import retry, stop_after_attempt, wait_exponential
 import time
 from src.config.settings import settings
+from src.monitoring.metrics import record_metrics
+from src.storage.clients import get_clients
+from src.storage.keyword_index import analyze, get_keyword_index
+from src.storage.query_cache import bump_corpus_generation
+from src.storage.sparse_vectors import SPARSE_VECTOR_NAME, query_sparse_vector, sparse_support, with_sparse_vectors
 from urllib.parse import urlparse
 
-# Get Qdrant connection details from environment
-QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
-QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
 COLLECTION_NAME = "documents"
 
-client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, timeout=90.0)
+# Namespace for deterministic point ids; changing it would orphan every stored point.
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2b7e-4d3a-5e8f-9a0b-1c2d3e4f5a6b")
+
+
+def _update_keyword_index(points=None, deleted_document_id=None):
+    """
+    Index stored points, or drop a deleted document, in the keyword index. Keyword hits are
+    resolved against Qdrant, so an index left behind by a failed update only costs recall
+    until the next rebuild.
+    """
+    try:
+        index = get_keyword_index()
+        if points:
+            index.add_points(points)
+            index.flush_if_due()
+        if deleted_document_id is not None:
+            index.delete_document(deleted_document_id)
+    except Exception as e:
+        print(f"Keyword index update failed: {e}")
+
+
+def point_id(document_id, chunk_index):
+    """
+    Derive the Qdrant point id of a chunk from its document id and position.
+    Upserting the same chunk again (a retry, or a resumed ingest) overwrites the
+    existing point instead of adding a duplicate.
+    Args:
+        document_id (str): Document ID the chunk belongs to.
+        chunk_index (int): Position of the chunk within the document.
+    Returns:
+        str: UUID string usable as a Qdrant point id.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{document_id}:{chunk_index}"))
+
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=5))
-def store_document(filename, embeddings, chunks, metadata=None):
+def _upsert_with_retry(points):
+    get_clients().qdrant.upsert(collection_name=COLLECTION_NAME, points=points)
+
+
+def store_document(filename, embeddings, chunks, metadata=None, doc_id=None):
     """
     Store document chunks and their embeddings in Qdrant.
+    Point ids are derived from (doc_id, chunk index), so retried upserts overwrite.
     Args:
         filename (str): Name of the document file.
         embeddings (List[List[float]]): Embedding vectors.
         chunks (List[str]): Text chunks.
         metadata (str, optional): Additional metadata.
+        doc_id (str, optional): Document ID to store under; a new one is generated if omitted.
     Returns:
         str: Document ID.
     """
-    doc_id = str(uuid.uuid4())
+    doc_id = doc_id or str(uuid.uuid4())
     points = [
         PointStruct(
-            id=str(uuid.uuid4()),
+            id=point_id(doc_id, i),
             vector=emb,
             payload={
                 "document_id": doc_id,
@@ -48,12 +91,173 @@ def store_document(filename, embeddings, chunks, metadata=None):
         )
         for i, (emb, chunk) in enumerate(zip(embeddings, chunks))
     ]
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
+    try:
+        if sparse_support(get_clients().qdrant, COLLECTION_NAME):
+            points = with_sparse_vectors(points)
+        _upsert_with_retry(points)
+        _update_keyword_index(points=points)
+    finally:
+        bump_corpus_generation()
     return doc_id
 
+
+def _point_result(point, score, bm25):
+    return {
+        "document_id": point.payload.get("document_id") or point.payload.get("mongo_id", ""),
+        "chunk_index": point.payload.get("chunk_index", 0),
+        "text": point.payload.get("text", ""),
+        "score": score,
+        "filename": point.payload.get("filename", ""),
+        "doc_metadata": point.payload.get("doc_metadata", ""),
+        "doc_metadata_category": point.payload.get("doc_metadata_category", ""),
+        "bm25": bm25
+    }
+
+
+def keyword_search(query, top_k=5, search_filter=None):
+    """
+    BM25 keyword search over the persistent keyword index; payloads of the best chunks
+    are fetched from Qdrant. With a filter, ranked candidates are checked against it in
+    growing windows until ``top_k`` of them match or the candidates run out.
+    Args:
+        query (str): The search query.
+        top_k (int): Number of results to return.
+        search_filter (Filter, optional): Qdrant filter the results must match.
+    Returns:
+        List[dict]: Results with their BM25 score, best first.
+    """
+    index = get_keyword_index()
+    limit = top_k if search_filter is None else top_k * 4
+    results, checked = [], 0
+    while True:
+        hits = index.search(query, limit=limit)
+        window = dict(hits[checked:])
+        if window:
+            if search_filter is None:
+                points = get_clients().qdrant.retrieve(collection_name=COLLECTION_NAME, ids=list(window), with_payload=True)
+            else:
+                points = get_clients().qdrant.scroll(
+                    collection_name=COLLECTION_NAME,
+                    scroll_filter=Filter(must=[HasIdCondition(has_id=list(window)), *search_filter.must]),
+                    limit=len(window),
+                    with_payload=True,
+                )[0]
+            results.extend(_point_result(p, window[str(p.id)], True) for p in points)
+        checked = len(hits)
+        if len(results) >= top_k or len(hits) < limit:
+            break
+        limit *= 4
+    return sorted(results, key=lambda r: r["score"], reverse=True)[:top_k]
+
+def vector_search(query, top_k=5, similarity_threshold=0.7, search_filter=None):
+    """
+    Embed the query and search the dense vectors.
+    Returns:
+        List[ScoredPoint]: Hits above ``similarity_threshold``, best first.
+    """
+    from src.processing.embeddings import embed_query
+
+    query_vec = embed_query(query)
+    return get_clients().qdrant.search(
+        collection_name=COLLECTION_NAME,
+        query_vector=query_vec,
+        limit=top_k,
+        score_threshold=similarity_threshold,
+        query_filter=search_filter,
+        with_payload=True,
+    )
+
+
+_leg_executor = None
+_leg_executor_lock = threading.Lock()
+
+
+def _get_leg_executor():
+    global _leg_executor
+    if _leg_executor is None:
+        with _leg_executor_lock:
+            if _leg_executor is None:
+                _leg_executor = ThreadPoolExecutor(
+                    max_workers=settings.RETRIEVAL_LEG_WORKERS, thread_name_prefix="retrieval-leg"
+                )
+    return _leg_executor
+
+
+def _timed_leg(name, run):
+    leg_start = time.time()
+    try:
+        return run()
+    finally:
+        record_metrics("retrieval_leg_latency", time.time() - leg_start, leg=name)
+
+
+def run_retrieval_legs(legs):
+    """
+    Run retrieval legs concurrently, each against its own deadline measured from the start.
+    A leg that raises or misses its deadline yields no results, so the query degrades to the
+    legs that answered in time; a timed-out leg finishes in the background.
+    Args:
+        legs (Dict[str, Tuple[Callable[[], list], float]]): Leg name -> (function, timeout in ms).
+    Returns:
+        Dict[str, list]: Results of each leg.
+    """
+    start = time.monotonic()
+    executor = _get_leg_executor()
+    futures = {name: executor.submit(_timed_leg, name, run) for name, (run, _) in legs.items()}
+    results = {}
+    for name, future in futures.items():
+        timeout_ms = legs[name][1]
+        try:
+            results[name] = future.result(timeout=max(0.0, start + timeout_ms / 1000.0 - time.monotonic()))
+            outcome = "ok"
+        except FutureTimeoutError:
+            print(f"{name} retrieval leg timed out after {timeout_ms:.0f} ms")
+            results[name], outcome = [], "timeout"
+        except Exception as e:
+            print(f"{name} retrieval leg failed: {e}")
+            results[name], outcome = [], "error"
+        record_metrics("retrieval_leg_outcome", 1, leg=name, status=outcome)
+    return results
+
+
+def fused_search(query, query_vec, top_k=5, similarity_threshold=0.7, search_filter=None):
+    """
+    Hybrid search in one Qdrant request: the dense leg (above ``similarity_threshold``) and
+    the sparse BM25 leg are prefetched and fused server-side with reciprocal rank fusion.
+    Scores are fusion scores, not cosine similarities; ``bm25`` marks results that contain
+    a query term.
+    Args:
+        query (str): The search query.
+        query_vec (List[float]): Dense embedding of the query.
+        top_k (int): Number of results to return.
+        similarity_threshold (float): Minimum cosine similarity for dense candidates.
+        search_filter (Filter, optional): Qdrant filter applied to both legs.
+    Returns:
+        List[dict]: Results, best first.
+    """
+    limit = max(top_k, settings.HYBRID_PREFETCH_LIMIT)
+    prefetch = [Prefetch(query=query_vec, limit=limit, score_threshold=similarity_threshold, filter=search_filter)]
+    sparse = query_sparse_vector(query)
+    if sparse.indices:
+        prefetch.append(Prefetch(query=sparse, using=SPARSE_VECTOR_NAME, limit=limit, filter=search_filter))
+    qdrant_start = time.time()
+    points = get_clients().qdrant.query_points(
+        collection_name=COLLECTION_NAME,
+        prefetch=prefetch,
+        query=FusionQuery(fusion=Fusion.RRF),
+        limit=top_k,
+        with_payload=True,
+    ).points
+    record_metrics("qdrant_latency", time.time() - qdrant_start, operation="hybrid_query")
+    terms = set(analyze(query))
+    return [_point_result(p, p.score, not terms.isdisjoint(analyze(p.payload.get("text", "")))) for p in points]
+
+
 def query_documents(query, top_k=5, similarity_threshold=0.7, filters=None, use_hybrid=True):
     """
     Query Qdrant for similar document chunks using vector search and BM25 keyword search.
+    With HYBRID_SEARCH_MODE=server and a collection that has sparse vectors, both run as one
+    Qdrant query fused server-side; otherwise vector hits are merged with the keyword index.
     Args:
         query (str): The search query.
         top_k (int): Number of results to return.
@@ -72,65 +276,42 @@ def query_documents(query, top_k=5, similarity_threshold=0.7, filters=None, use_
                 conditions.append(FieldCondition(key=k, match=MatchValue(value=v)))
             search_filter = Filter(must=conditions)
         
-        # Get embeddings model
-        try:
-            from src.processing.embeddings import get_model
-            query_vec = get_model().encode([query])[0]
-        except Exception as e:
-            # Fallback to simple text search if embeddings fail
-            print(f"Embedding generation failed: {e}")
-            return [], 0.0
-        
-        # Vector search
-        try:
-            vector_results = client.search(
-                collection_name=COLLECTION_NAME,
-                query_vector=query_vec,
-                limit=top_k,
-                score_threshold=similarity_threshold,
-                query_filter=search_filter,
-                with_payload=True,
-            )
-        except Exception as e:
-            print(f"Vector search failed: {e}")
-            vector_results = []
-        
-        # BM25 keyword search (hybrid)
+        # Server-side hybrid search when the collection has sparse vectors
+        server_side = False
+        if use_hybrid and settings.HYBRID_SEARCH_MODE == "server":
+            try:
+                server_side = bool(sparse_support(get_clients().qdrant, COLLECTION_NAME))
+            except Exception as e:
+                print(f"Could not inspect collection {COLLECTION_NAME}: {e}")
+        if server_side:
+            try:
+                from src.processing.embeddings import embed_query
+                query_vec = embed_query(query)
+            except Exception as e:
+                print(f"Embedding generation failed: {e}")
+                return [], 0.0
+            try:
+                results = fused_search(query, query_vec, top_k, similarity_threshold, search_filter)
+                return results, (time.time() - start) * 1000
+            except Exception as e:
+                print(f"Server-side hybrid search failed, merging vector and keyword results instead: {e}")
+
         if use_hybrid:
+            # Both legs run concurrently; one that fails or misses its deadline contributes nothing
+            legs = run_retrieval_legs({
+                "vector": (lambda: vector_search(query, top_k, similarity_threshold, search_filter),
+                           settings.VECTOR_LEG_TIMEOUT_MS),
+                "keyword": (lambda: keyword_search(query, top_k, search_filter), settings.KEYWORD_LEG_TIMEOUT_MS),
+            })
+            vector_results, bm25_results = legs["vector"], legs["keyword"]
+        else:
             try:
-                # Get points for BM25 with filter if provided
-                if search_filter:
-                    points = client.scroll(collection_name=COLLECTION_NAME, scroll_filter=search_filter, limit=1000)[0]
-                else:
-                    points = client.scroll(collection_name=COLLECTION_NAME, limit=1000)[0]
-                if points:
-                    corpus = [p.payload.get("text", "") for p in points if p.payload.get("text")]
-                    if corpus:
-                        bm25 = BM25Okapi([doc.split() for doc in corpus])
-                        bm25_scores = bm25.get_scores(query.split())
-                        # Get top_k BM25 results
-                        bm25_indices = sorted(range(len(bm25_scores)), key=lambda i: bm25_scores[i], reverse=True)[:top_k]
-                        bm25_results = [
-                            {
-                                "document_id": points[i].payload.get("document_id") or points[i].payload.get("mongo_id", ""),
-                                "chunk_index": points[i].payload.get("chunk_index", 0),
-                                "text": points[i].payload.get("text", ""),
-                                "score": float(bm25_scores[i]),
-                                "filename": points[i].payload.get("filename", ""),
-                                "doc_metadata": points[i].payload.get("doc_metadata", ""),
-                                "doc_metadata_category": points[i].payload.get("doc_metadata_category", ""),
-                                "bm25": True
-                            }
-                            for i in bm25_indices if bm25_scores[i] > 0 and i < len(points)
-                        ]
-                    else:
-                        bm25_results = []
-                else:
-                    bm25_results = []
+                vector_results = vector_search(query, top_k, similarity_threshold, search_filter)
             except Exception as e:
-                print(f"BM25 search failed: {e}")
-                bm25_results = []
-            
+                print(f"Vector search failed: {e}")
+                vector_results = []
+
+        if use_hybrid:
             # Combine and deduplicate results (prefer vector score if present)
             combined = {}
             for r in vector_results:
@@ -194,7 +375,7 @@ def list_documents():
         List[dict]: List of document metadata.
     """
     try:
-        points = client.scroll(collection_name=COLLECTION_NAME, limit=1000)[0]
+        points = get_clients().qdrant.scroll(collection_name=COLLECTION_NAME, limit=1000)[0]
     except UnexpectedResponse as e:
         if "doesn't exist" in str(e):
             return []
@@ -211,6 +392,14 @@ def list_documents():
             }
     return list(docs.values())
 
+def _document_filter(document_id):
+    # Ingested chunks carry the MongoDB id as mongo_id; store_document writes document_id.
+    return Filter(should=[
+        FieldCondition(key="document_id", match=MatchValue(value=document_id)),
+        FieldCondition(key="mongo_id", match=MatchValue(value=document_id)),
+    ])
+
+
 def delete_document(document_id):
     """
     Delete all chunks and embeddings for a document from Qdrant.
@@ -218,13 +407,37 @@ def delete_document(document_id):
         document_id (str): The document ID to delete.
     """
     try:
-        # Use Qdrant's Filter object instead of a raw dict
-        qdrant_filter = Filter(must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))])
-        client.delete(
+        get_clients().qdrant.delete(
             collection_name=COLLECTION_NAME,
-            points_selector=qdrant_filter
+            points_selector=_document_filter(document_id)
         )
     except UnexpectedResponse as e:
         if "doesn't exist" in str(e):
             return
-        raise 
\ No newline at end of file
+        raise
+    finally:
+        _update_keyword_index(deleted_document_id=document_id)
+        bump_corpus_generation()
+
+
+async def delete_document_async(document_id, async_client):
+    """
+    ``delete_document`` for async endpoints: the Qdrant delete runs on ``async_client``
+    and the keyword index update (file I/O under a lock) on the blocking executor.
+    Args:
+        document_id (str): The document ID to delete.
+        async_client: An ``AsyncQdrantClient``.
+    """
+    from src.processing.blocking import run_blocking
+
+    try:
+        await async_client.delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=_document_filter(document_id)
+        )
+    except UnexpectedResponse as e:
+        if "doesn't exist" not in str(e):
+            raise
+    finally:
+        await run_blocking(_update_keyword_index, deleted_document_id=document_id)
+        bump_corpus_generation()
\ No newline at end of file
@@ -0,0 +1,18 @@
+import os
+
+# Connection settings are required; tests never reach these servers.
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("QDRANT_HOST", "localhost")
+
+import pytest
+import src.storage.keyword_index as keyword_index
+from src.config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_keyword_index(tmp_path, monkeypatch):
+    """
+    Give every test its own keyword index directory instead of KEYWORD_INDEX_DIR.
+    """
+    monkeypatch.setattr(settings, "KEYWORD_INDEX_DIR", str(tmp_path / "keyword_index"))
+    monkeypatch.setattr(keyword_index, "_index", None)
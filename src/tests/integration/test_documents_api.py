@@ -1,3 +1,6 @@
+import json
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
 from src.api.routes import app
@@ -39,4 +42,38 @@ def test_list_and_delete_documents(monkeypatch):
     assert del_response.json()["status"] == "deleted"
     del_response2 = client.delete(f"/documents/{doc_id2}", headers=headers)
     assert del_response2.status_code == 200
-    assert del_response2.json()["status"] == "deleted" 
\ No newline at end of file
+    assert del_response2.json()["status"] == "deleted" 
+
+def test_documents_pagination_and_export():
+    headers = {"Authorization": f"Bearer {settings.LANGSMITH_API_KEY}"}
+    prefix = f"paging-{uuid.uuid4().hex[:8]}-"
+    doc_ids = []
+    for i in range(3):
+        response = client.post(
+            "/ingest",
+            files={"file": (f"{prefix}{i}.txt", f"Pagination test document {i}.".encode())},
+            data={"metadata": json.dumps({"category": prefix}), "chunking_strategy": "langchain"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+        doc_ids.append(response.json()["document_id"])
+    try:
+        # Walk the filtered listing one document per page, newest first
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 1, "filename_prefix": prefix}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get("/documents", params=params, headers=headers).json()
+            seen += [d["document_id"] for d in page["documents"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == doc_ids[::-1]
+        # Stream every document of the category
+        export = client.get("/documents", params={"category": prefix, "format": "ndjson"}, headers=headers)
+        assert export.status_code == 200
+        assert [json.loads(line)["document_id"] for line in export.text.splitlines()] == doc_ids[::-1]
+    finally:
+        for doc_id in doc_ids:
+            client.delete(f"/documents/{doc_id}", headers=headers)
@@ -0,0 +1,40 @@
+import time
+from fastapi.testclient import TestClient
+from src.api.routes import app
+
+client = TestClient(app)
+
+NUM_FILES = 1000
+FILE_BYTES = 2048
+
+
+def make_file(idx):
+    body = (f"Batch ingest performance document {idx}. " * 64).encode()[:FILE_BYTES]
+    return (f"batch_perf_{idx}.txt", body)
+
+
+def test_batch_ingest_throughput(monkeypatch):
+    monkeypatch.setattr("src.api.routes.verify_token", lambda x: None)
+    headers = {"Authorization": "Bearer changeme"}
+    files = [make_file(i) for i in range(NUM_FILES)]
+
+    # Baseline: one request per file (sampled to keep the test short)
+    sample = files[:50]
+    start = time.time()
+    for name, body in sample:
+        response = client.post("/ingest", files={"file": (name, body)}, data={"chunking_strategy": "fixed"}, headers=headers)
+        assert response.status_code == 201
+    per_file_rate = len(sample) / (time.time() - start)
+
+    start = time.time()
+    response = client.post(
+        "/ingest/batch",
+        files=[("files", f) for f in files],
+        data={"chunking_strategy": "fixed"},
+        headers=headers,
+    )
+    batch_rate = NUM_FILES / (time.time() - start)
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == NUM_FILES
+    print(f"Per-file: {per_file_rate:.1f} docs/s, batch: {batch_rate:.1f} docs/s ({batch_rate / per_file_rate:.1f}x)")
+    assert batch_rate > 3 * per_file_rate
@@ -0,0 +1,46 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from src.processing.onnx_export import COSINE_TOLERANCE, cosine_similarities
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+SAMPLE_FILES = sorted(glob.glob(os.path.join(ROOT, "sample_data", "*.txt")))
+
+# Each backend runs in a fresh interpreter so its RSS is measured without the other model loaded.
+BENCH = """
+import json, sys, time, psutil
+from src.processing.chunking import chunk_document
+from src.processing import embeddings
+chunks = []
+for path in sys.argv[1:]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        chunks.extend(chunk_document(f.read(), "txt", strategy="fixed", chunk_size=512))
+embeddings.warmup()
+start = time.perf_counter()
+vectors = embeddings._encode(chunks)
+elapsed = time.perf_counter() - start
+print(json.dumps({"chunks": len(chunks), "seconds": elapsed, "rss": psutil.Process().memory_info().rss,
+                  "vectors": vectors}))
+"""
+
+
+def _run(backend):
+    env = dict(os.environ, EMBEDDING_BACKEND=backend, EMBEDDING_CACHE_ENABLED="false")
+    result = subprocess.run([sys.executable, "-c", BENCH, *SAMPLE_FILES], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_embedding_backend_throughput_and_tolerance():
+    results = {backend: _run(backend) for backend in ("torch", "onnx")}
+    rows = [
+        f"{backend:<6} {r['chunks']:>6} chunks  {r['chunks'] / r['seconds']:8.1f} chunks/s  RSS {r['rss'] / 2 ** 20:7.1f} MB"
+        for backend, r in results.items()
+    ]
+    similarities = cosine_similarities(results["torch"]["vectors"], results["onnx"]["vectors"])
+    rows.append(f"int8 vs fp32 cosine: min {similarities.min():.4f}  mean {np.mean(similarities):.4f}")
+    print("\n" + "\n".join(rows))
+    assert similarities.min() >= COSINE_TOLERANCE
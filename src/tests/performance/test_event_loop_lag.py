@@ -0,0 +1,62 @@
+import asyncio
+import gc
+import time
+
+import httpx
+
+import src.api.routes as routes
+import src.storage.query_cache as query_cache
+from src.config.settings import settings
+from src.monitoring.loop_lag import EventLoopLagMonitor, freeze_startup_heap
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+
+def test_event_loop_stays_responsive_under_mixed_ingest_and_query_load(monkeypatch, tmp_path):
+    """
+    Ingests and queries whose pipelines block for hundreds of milliseconds run
+    concurrently; the loop-lag probe must keep firing on time throughout.
+    """
+    def slow_ingest(filename, path, *args):
+        time.sleep(0.3)  # parsing, chunking, embedding
+        return "doc-" + filename
+
+    def slow_query(**kwargs):
+        time.sleep(0.05)  # query embedding and search
+        return [{"document_id": "d1", "text": "t", "score": 0.9}], 50.0, False
+
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    monkeypatch.setattr(settings, "INGEST_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(routes, "ingest_document_stream", slow_ingest)
+    monkeypatch.setattr(query_cache, "cached_query_documents", slow_query)
+
+    async def load():
+        monitor = EventLoopLagMonitor(interval_ms=10)
+        transport = httpx.ASGITransport(app=routes.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Warm up first-request work (lazy imports, multipart parser) and freeze the
+            # heap as the lifespan does at startup, then measure.
+            await client.post("/ingest", files={"file": ("warmup.txt", b"text")}, headers=HEADERS)
+            await client.post("/query", json={"query": "warmup"}, headers=HEADERS)
+            freeze_startup_heap()
+            monitor.start()
+            ingests = [
+                client.post("/ingest", files={"file": (f"doc{i}.txt", b"some text " * 1000)}, headers=HEADERS)
+                for i in range(8)
+            ]
+            queries = [client.post("/query", json={"query": f"question {i}"}, headers=HEADERS) for i in range(40)]
+            started = time.monotonic()
+            responses = await asyncio.gather(*ingests, *queries)
+            elapsed = time.monotonic() - started
+        await monitor.stop()
+        return responses, elapsed, monitor
+
+    try:
+        responses, elapsed, monitor = asyncio.run(load())
+    finally:
+        gc.unfreeze()
+    assert [r.status_code for r in responses[:8]] == [201] * 8
+    assert all(r.status_code == 200 for r in responses[8:])
+    print(f"\n48 requests in {elapsed:.2f}s, {monitor.samples} probes, max event loop lag {monitor.max_lag * 1000:.1f} ms")
+    assert monitor.samples >= 10
+    assert monitor.max_lag < 0.1
@@ -0,0 +1,43 @@
+import random
+import time
+from src.storage.keyword_index import KeywordIndex
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+SIZES = (10_000, 100_000)
+QUERIES = 200
+
+
+def _build(directory, size, seed=7):
+    rng = random.Random(seed)
+    index = KeywordIndex(directory, flush_chunks=50_000)
+    chunks = [(f"p{i}", f"d{i // 20}", " ".join(rng.choices(VOCABULARY, k=60))) for i in range(size)]
+    # A selective term occurring in the same number of chunks whatever the corpus size
+    for i in range(0, size, size // 10):
+        chunks[i] = (chunks[i][0], chunks[i][1], chunks[i][2] + " needle")
+    start = time.perf_counter()
+    index.add(chunks)
+    index.flush()
+    return index, time.perf_counter() - start
+
+
+def _latency(index, query):
+    index.search(query, limit=5)
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        index.search(query, limit=5)
+    return (time.perf_counter() - start) / QUERIES
+
+
+def test_selective_query_latency_is_independent_of_corpus_size(tmp_path):
+    rows, selective = [], {}
+    for size in SIZES:
+        index, build_seconds = _build(str(tmp_path / str(size)), size)
+        selective[size] = _latency(index, "needle")
+        common = _latency(index, "word1 word2 word3")
+        rows.append(
+            f"{size:>7} chunks  build {size / build_seconds:9.0f} chunks/s  {index.segment_count} segments  "
+            f"selective {selective[size] * 1e3:7.3f} ms  common {common * 1e3:7.3f} ms"
+        )
+        assert len(index.search("needle")) == 10
+    print("\n" + "\n".join(rows))
+    assert selective[SIZES[-1]] < 3 * selective[SIZES[0]] + 1e-3
@@ -0,0 +1,50 @@
+import glob
+import os
+import time
+from src.processing.pdf_extraction import available_extractors, get_extractor, iter_pdf_pages
+from src.tests.unit.test_pdf_extraction import make_text_pdf
+
+SAMPLE_PDFS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "..", "sample_data", "*.pdf")))
+SYNTHETIC_PAGES = [20, 400]
+WORKERS = 4
+
+
+def _readable(path, backend):
+    try:
+        get_extractor(backend).page_count(path)
+        return True
+    except ImportError:
+        raise
+    except Exception:
+        return False
+
+
+def _time_pages(path, backend, workers):
+    start = time.perf_counter()
+    pages = list(iter_pdf_pages(path, backend=backend, workers=workers, min_pages_parallel=2))
+    return pages, time.perf_counter() - start
+
+
+def test_pdf_extractor_throughput(tmp_path):
+    documents = list(SAMPLE_PDFS)
+    for pages in SYNTHETIC_PAGES:
+        documents.append(make_text_pdf(str(tmp_path / f"synthetic_{pages}.pdf"), pages=pages, lines_per_page=40))
+
+    rows = []
+    for backend in available_extractors():
+        for path in documents:
+            if not _readable(path, backend):
+                rows.append(f"{backend:<9} {os.path.basename(path):<22} unreadable")
+                continue
+            serial, serial_s = _time_pages(path, backend, workers=1)
+            # Warm the pool so process start-up is not charged to the first document.
+            _time_pages(path, backend, workers=WORKERS)
+            parallel, parallel_s = _time_pages(path, backend, workers=WORKERS)
+            assert parallel == serial
+            rows.append(
+                f"{backend:<9} {os.path.basename(path):<22} {len(serial):>4} pages  "
+                f"serial {len(serial) / serial_s:8.1f} pages/s  {WORKERS} workers {len(parallel) / parallel_s:8.1f} pages/s"
+            )
+            if len(serial) >= 400 and (os.cpu_count() or 1) >= WORKERS:
+                assert parallel_s < serial_s
+    print("\n" + "\n".join(rows))
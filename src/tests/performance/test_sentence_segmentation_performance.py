@@ -0,0 +1,46 @@
+import glob
+import os
+import time
+from src.processing.sentences import iter_sentences, split_sentences
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "sample_data")
+REPEAT = 50  # sample files are small; repeat them for stable timings
+
+
+def _nltk_available():
+    try:
+        split_sentences("One. Two.", backend="nltk")
+        return True
+    except (ImportError, LookupError):
+        return False
+
+
+def _time(text, backend):
+    start = time.perf_counter()
+    sentences = split_sentences(text, backend=backend)
+    return sentences, time.perf_counter() - start
+
+
+def test_sentence_segmenter_throughput():
+    paths = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.txt")) + glob.glob(os.path.join(SAMPLE_DIR, "*.json")))
+    backends = ["rules"] + (["nltk"] if _nltk_available() else [])
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read() * REPEAT
+        blocks = [text[i:i + 65536] for i in range(0, len(text), 65536)]
+        results = {}
+        for backend in backends:
+            sentences, seconds = _time(text, backend)
+            results[backend] = sentences
+            rows.append(
+                f"{backend:<6} {os.path.basename(path):<14} {len(text) / 1e6:6.2f} MB  {len(sentences):>7} sentences  "
+                f"{len(text) / 1e6 / seconds:8.2f} MB/s"
+            )
+        assert list(iter_sentences(blocks, "rules")) == results["rules"]
+        if "nltk" in results:
+            agreement = len(set(results["rules"]) & set(results["nltk"])) / max(len(set(results["nltk"])), 1)
+            rows.append(f"{'':<6} {os.path.basename(path):<14} rules/nltk sentence agreement {agreement:.1%}")
+    if "nltk" not in backends:
+        rows.append("nltk: not installed or punkt data missing; only the rule-based segmenter was timed")
+    print("\n" + "\n".join(rows))
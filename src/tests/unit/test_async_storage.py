@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import pytest
+from bson import ObjectId
+
+import src.storage.vector_db as vector_db
+from src.monitoring.loop_lag import EventLoopLagMonitor
+from src.processing.blocking import run_blocking, run_ingest
+from src.storage.clients import ClientRegistry, get_clients
+from src.storage.query_cache import corpus_generation
+
+
+def test_lag_monitor_measures_blocking_callbacks():
+    async def scenario(block):
+        monitor = EventLoopLagMonitor(interval_ms=5)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        if block:
+            time.sleep(0.2)  # a synchronous call on the loop
+        else:
+            await run_blocking(time.sleep, 0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    blocked = asyncio.run(scenario(block=True))
+    offloaded = asyncio.run(scenario(block=False))
+    assert blocked.max_lag >= 0.15
+    assert offloaded.max_lag < 0.1 and offloaded.samples > 20
+
+
+def test_async_clients_are_bound_to_their_event_loop():
+    registry = ClientRegistry()
+
+    async def clients():
+        pair = (registry.async_qdrant(), registry.async_mongo())
+        assert pair == (registry.async_qdrant(), registry.async_mongo())
+        return pair
+
+    async def close():
+        registry.async_qdrant(), registry.async_mongo()
+        await registry.aclose()
+        return registry._async_qdrant is None and registry._async_mongo is None
+
+    first = asyncio.run(clients())
+    second = asyncio.run(clients())
+    assert first[0] is not second[0] and first[1] is not second[1]
+    assert asyncio.run(close())
+    registry.close()
+
+
+class AsyncCollection:
+    def __init__(self):
+        self.deleted = []
+
+    async def delete_one(self, selector):
+        self.deleted.append(selector)
+
+
+class AsyncQdrant:
+    def __init__(self):
+        self.selectors = []
+
+    async def delete(self, collection_name, points_selector):
+        self.selectors.append(points_selector)
+
+
+def test_delete_route_uses_async_clients(monkeypatch):
+    from fastapi.testclient import TestClient
+    import src.api.routes as routes
+    from src.config.settings import settings
+
+    collection, qdrant, removed = AsyncCollection(), AsyncQdrant(), []
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    monkeypatch.setattr(get_clients(), "async_collection", lambda name: collection)
+    monkeypatch.setattr(get_clients(), "async_qdrant", lambda: qdrant)
+    monkeypatch.setattr(vector_db, "_update_keyword_index", lambda deleted_document_id: removed.append(deleted_document_id))
+    document_id = str(ObjectId())
+    before = corpus_generation()
+
+    response = TestClient(routes.app).delete(f"/documents/{document_id}", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 200
+    assert collection.deleted == [{"_id": ObjectId(document_id)}]
+    assert {c.key for c in qdrant.selectors[0].should} == {"document_id", "mongo_id"}
+    assert removed == [document_id]
+    assert corpus_generation() == before + 1
+
+
+def test_async_delete_tolerates_missing_collection(monkeypatch):
+    from qdrant_client.http.exceptions import UnexpectedResponse
+
+    class MissingCollection:
+        async def delete(self, **kwargs):
+            raise UnexpectedResponse(404, "Not Found", b"Collection `documents` doesn't exist!", {})
+
+    removed = []
+    monkeypatch.setattr(vector_db, "_update_keyword_index", lambda deleted_document_id: removed.append(deleted_document_id))
+    asyncio.run(vector_db.delete_document_async("abc", MissingCollection()))
+    assert removed == ["abc"]
+
+
+def test_ingest_does_not_queue_short_blocking_calls(monkeypatch):
+    import src.processing.blocking as blocking
+    from src.config.settings import settings
+
+    monkeypatch.setattr(blocking, "_executors", {})
+    monkeypatch.setattr(settings, "BLOCKING_EXECUTOR_WORKERS", 1)
+    monkeypatch.setattr(settings, "INGEST_EXECUTOR_WORKERS", 1)
+
+    async def scenario():
+        ingests = [asyncio.ensure_future(run_ingest(time.sleep, 0.3)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        await run_blocking(time.sleep, 0.01)
+        waited = time.monotonic() - started
+        await asyncio.gather(*ingests)
+        return waited
+
+    try:
+        assert asyncio.run(scenario()) < 0.2
+    finally:
+        blocking.shutdown_blocking_executor()
+
+
+def test_timed_out_ingest_keeps_its_upload_until_it_finishes(monkeypatch, tmp_path):
+    import threading
+
+    from fastapi.testclient import TestClient
+
+    import src.api.routes as routes
+    import src.processing.blocking as blocking
+    from src.config.settings import settings
+
+    release, ingested = threading.Event(), []
+
+    def slow_ingest(filename, path, *args):
+        release.wait(5)
+        with open(path, "rb") as f:
+            ingested.append(f.read())
+        return "doc-1"
+
+    wait_for = asyncio.wait_for
+    monkeypatch.setattr(blocking, "_executors", {})
+    monkeypatch.setattr(settings, "INGEST_EXECUTOR_WORKERS", 1)
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    monkeypatch.setattr(settings, "INGEST_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(routes, "ingest_document_stream", slow_ingest)
+    monkeypatch.setattr(routes.asyncio, "wait_for", lambda aw, timeout: wait_for(aw, 0.05))
+    client = TestClient(routes.app)
+    try:
+        # The first upload times out while running, the second while queued behind it.
+        for body in (b"first", b"second"):
+            response = client.post("/ingest", files={"file": ("a.txt", body)}, headers={"Authorization": "Bearer test-token"})
+            assert response.status_code == 408
+        release.set()
+    finally:
+        blocking.shutdown_blocking_executor()
+    assert ingested == [b"first", b"second"]
+    assert list(tmp_path.iterdir()) == []
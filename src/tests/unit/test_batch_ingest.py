@@ -0,0 +1,79 @@
+import io
+import tarfile
+import zipfile
+from src.processing.streaming import expand_archive, is_archive
+
+
+class FakeColl:
+    def __init__(self):
+        self.batches = []
+
+    def insert_many(self, docs):
+        self.batches.append(docs)
+
+        class Result:
+            inserted_ids = [f"id{len(self.batches)}-{i}" for i in range(len(docs))]
+        return Result()
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find(self, query):
+        return []
+
+    def bulk_write(self, requests, ordered=True):
+        pass
+
+
+def test_batch_ingest_pools_chunks_across_documents(tmp_path, monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+
+    files = []
+    for i in range(5):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(str(i) * 250)
+        files.append((f"doc{i}.txt", str(path)))
+    bad = tmp_path / "bad.exe"
+    bad.write_bytes(b"nope")
+    files.insert(2, ("bad.exe", str(bad)))
+
+    coll, embeds, upserts = FakeColl(), [], []
+    monkeypatch.setattr(ingest_rag, "_documents", lambda: coll)
+    monkeypatch.setattr(ingest_rag, "embed_chunks", lambda chunks: embeds.append(len(chunks)) or [[0.0]] * len(chunks))
+    monkeypatch.setattr(ingest_rag, "_upsert_points", lambda points: upserts.append(points))
+    monkeypatch.setattr(ingest_rag.settings, "INGEST_BATCH_WINDOW_CHUNKS", 9)
+
+    results = ingest_rag.ingest_documents_batch(files, None, strategy="fixed", chunk_size=100, overlap=0)
+
+    assert [r["status"] for r in results] == ["success", "success", "failed", "success", "success", "success"]
+    assert "Unsupported document type" in results[2]["error"]
+    assert all(r["chunks"] == 3 for r in results if r["status"] == "success")
+    # Three documents (9 chunks) per window: one insert_many, one embed call and one upsert each
+    assert [len(b) for b in coll.batches] == [3, 2]
+    assert embeds == [9, 6]
+    assert [len(u) for u in upserts] == [9, 6]
+    assert {p.payload["mongo_id"] for p in upserts[0]} == {"id1-0", "id1-1", "id1-2"}
+
+
+def test_expand_zip_skips_unsafe_members(tmp_path):
+    archive = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.txt", "alpha")
+        zf.writestr("nested/b.json", "{}")
+        zf.writestr("../evil.txt", "nope")
+    out = tmp_path / "out"
+    members = expand_archive(str(archive), "docs.zip", str(out))
+    assert [name for name, _ in members] == ["a.txt", "nested/b.json"]
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_expand_tar(tmp_path):
+    archive = tmp_path / "docs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        data = b"hello"
+        info = tarfile.TarInfo("c.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+    assert is_archive("docs.tar.gz") and not is_archive("docs.txt")
+    [(name, path)] = expand_archive(str(archive), "docs.tar.gz", str(tmp_path / "out"))
+    assert name == "c.txt" and open(path, "rb").read() == b"hello"
@@ -0,0 +1,72 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from src.processing.bulk_ingest import discover_files, run
+
+
+def make_tree(root):
+    (root / "sub").mkdir()
+    (root / "a.txt").write_text("alpha " * 50)
+    (root / "b.json").write_text('{"content": "beta"}')
+    (root / "sub" / "c.txt").write_text("gamma " * 300)
+    (root / "skip.md").write_text("not a document")
+
+
+def fake_store(calls):
+    def store(docs):
+        calls.append(docs)
+        return [{"status": "success", "document_id": f"id-{d['filename']}", "chunks": len(d["chunks"]), "error": None}
+                for d in docs]
+    return store
+
+
+def test_discover_files_recursive_and_globs(tmp_path):
+    make_tree(tmp_path)
+    names = [os.path.relpath(p, tmp_path) for p in discover_files([str(tmp_path)], ["*.txt", "*.json"], [])]
+    assert names == ["a.txt", "b.json", os.path.join("sub", "c.txt")]
+    flat = discover_files([str(tmp_path)], ["*.txt"], ["a.*"], recursive=False)
+    assert list(flat) == []
+
+
+def test_run_resumes_from_manifest_and_pushes_metrics(tmp_path, monkeypatch):
+    import src.processing.embeddings as embeddings
+    import src.processing.ingest_rag as ingest_rag
+
+    pushed = []
+
+    class Gateway(BaseHTTPRequestHandler):
+        def do_PUT(self):
+            pushed.append((self.path, self.rfile.read(int(self.headers["Content-Length"])).decode()))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Gateway)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    gateway = f"http://127.0.0.1:{server.server_port}"
+
+    calls = []
+    monkeypatch.setattr(embeddings, "warmup", lambda: None)
+    monkeypatch.setattr(ingest_rag, "store_chunked_documents", fake_store(calls))
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_tree(corpus)
+    manifest = str(tmp_path / "manifest.jsonl")
+
+    stats = run([str(corpus)], strategy="fixed", workers=1, manifest_path=manifest, pushgateway_url=gateway)
+    assert stats["documents"] == 3 and stats["skipped"] == 0 and stats["failed"] == 0
+    assert stats["chunks"] > 3 and stats["docs_per_s"] > 0 and stats["mb_per_s"] > 0
+    assert pushed and pushed[0][0] == "/metrics/job/bulk_ingest"
+    assert "bulk_ingest_documents 3.0" in pushed[0][1]
+
+    # Second run: everything is in the manifest
+    stats = run([str(corpus)], strategy="fixed", workers=1, manifest_path=manifest, pushgateway_url="")
+    assert stats["documents"] == 0 and stats["skipped"] == 3
+
+    # A changed file is re-ingested
+    (corpus / "a.txt").write_text("changed " * 10)
+    stats = run([str(corpus)], strategy="fixed", workers=1, manifest_path=manifest, pushgateway_url="")
+    assert stats["documents"] == 1 and stats["skipped"] == 2
+    server.shutdown()
@@ -0,0 +1,43 @@
+import pickle
+import sys
+import pytest
+from src.processing.chunking import ChunkSpans, chunk_spans
+from src.processing.streaming import iter_chunk_spans
+
+
+def reference_chunks(text, strategy, chunk_size, overlap):
+    # The string-slicing implementation chunk_document used before spans.
+    if strategy == "fixed":
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    if len(text) <= chunk_size:
+        return [text]
+    return [text[i:i + chunk_size] for i in range(0, len(text) - chunk_size + 1, chunk_size - overlap)]
+
+
+@pytest.mark.parametrize("length", [0, 7, 512, 1000, 5003])
+@pytest.mark.parametrize("strategy,chunk_size,overlap", [("fixed", 100, 0), ("sliding", 512, 128), ("sliding", 50, 10)])
+def test_spans_materialize_to_reference_chunks(length, strategy, chunk_size, overlap):
+    text = "".join(chr(97 + i % 26) for i in range(length))
+    spans = chunk_spans(text, strategy, chunk_size, overlap)
+    assert list(spans) == reference_chunks(text, strategy, chunk_size, overlap)
+    assert [spans[i] for i in range(len(spans))] == list(spans)
+    if not text:
+        return  # chunk_document keeps an empty sliding chunk; streaming emits nothing
+    streamed = list(iter_chunk_spans([text[i:i + 77] for i in range(0, len(text), 77)], strategy, chunk_size, overlap))
+    assert [(s, e) for _, s, e in streamed] == spans.spans()
+
+
+def test_spans_share_text():
+    text = "x" * 1_000_000
+    spans = chunk_spans(text, "sliding", 512, 128)
+    copies = sum(sys.getsizeof(chunk) for chunk in reference_chunks(text, "sliding", 512, 128))
+    assert spans.offsets_nbytes == 16 * len(spans)
+    assert spans.offsets_nbytes * 20 < copies
+    restored = pickle.loads(pickle.dumps(spans))
+    assert isinstance(restored, ChunkSpans) and restored.spans() == spans.spans()
+    assert isinstance(spans[1:3], ChunkSpans) and len(spans[1:3]) == 2
+
+
+def test_sliding_step_must_be_positive():
+    with pytest.raises(ValueError):
+        chunk_spans("abc" * 100, "sliding", 10, 10)
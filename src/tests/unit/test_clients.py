@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+from pymongo import monitoring
+
+import src.storage.clients as clients
+from src.config.settings import settings
+from src.monitoring.metrics import QDRANT_POOL_UTILIZATION, MONGO_POOL_UTILIZATION
+from src.storage.clients import ClientRegistry, MongoPoolMonitor, TrackedQdrantClient
+
+
+def test_registry_is_shared_and_closed(monkeypatch):
+    monkeypatch.setattr(clients, "_registry", None)
+    registry = clients.get_clients()
+    assert clients.get_clients() is registry
+    assert registry.collection("documents").full_name == "rag_db.documents"
+    clients.close_clients()
+    assert clients._registry is None
+
+
+def test_qdrant_pool_is_tuned_and_grpc_configurable(monkeypatch):
+    monkeypatch.setattr(settings, "QDRANT_POOL_SIZE", 7)
+    options = clients._qdrant_options()
+    # Keep-alive stays on (qdrant-client turns it off for localhost unless limits are given).
+    assert options["limits"].max_connections == 7 and options["limits"].max_keepalive_connections == 7
+    assert options["prefer_grpc"] is False
+    monkeypatch.setattr(settings, "QDRANT_PREFER_GRPC", True)
+    registry = ClientRegistry()
+    assert registry.qdrant._client._client._prefer_grpc is True
+    assert registry.pool_stats()["qdrant"]["transport"] == "grpc"
+    registry.close()
+
+
+def test_tracked_client_reports_requests_in_flight():
+    entered, release = threading.Event(), threading.Event()
+
+    class Client:
+        collection_name = "documents"
+
+        def search(self, **kwargs):
+            entered.set()
+            release.wait(5)
+            return ["hit"]
+
+        async def scroll(self):
+            return "page"
+
+    tracked = TrackedQdrantClient(Client(), "test", pool_size=4)
+    assert tracked.collection_name == "documents"
+    worker = threading.Thread(target=tracked.search)
+    worker.start()
+    entered.wait(5)
+    assert tracked.in_flight == 1
+    assert QDRANT_POOL_UTILIZATION.labels(client="test")._value.get() == 0.25
+    release.set()
+    worker.join()
+    assert tracked.in_flight == 0
+    assert asyncio.run(tracked.scroll()) == "page" and tracked.in_flight == 0
+
+
+def test_mongo_pool_monitor_tracks_checkouts():
+    monitor = MongoPoolMonitor("test", max_pool_size=4)
+    address = ("localhost", 27017)
+    for connection_id in (1, 2, 3):
+        monitor.connection_created(monitoring.ConnectionCreatedEvent(address, connection_id))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, 1, 0.001))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, 2, 0.002))
+    assert (monitor.open_connections, monitor.checked_out) == (3, 2)
+    assert MONGO_POOL_UTILIZATION.labels(client="test")._value.get() == 0.5
+    monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+    monitor.connection_closed(monitoring.ConnectionClosedEvent(address, 3, "idle"))
+    assert (monitor.open_connections, monitor.checked_out) == (2, 1)
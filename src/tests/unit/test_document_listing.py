@@ -0,0 +1,160 @@
+import datetime
+import json
+
+import pytest
+from bson import ObjectId
+
+import src.api.routes as routes
+from src.config.settings import settings
+from src.processing.ingest_rag import _document_record
+from src.storage.clients import get_clients
+from src.storage.documents import (
+    LISTING_SORT,
+    decode_cursor,
+    encode_cursor,
+    ensure_document_indexes,
+    listing_filter,
+    metadata_category,
+)
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    doc = {"_id": ObjectId(), "upload_time": datetime.datetime(2026, 5, 1, 12, 30, 15, 123000)}
+    assert decode_cursor(encode_cursor(doc)) == (doc["upload_time"], doc["_id"])
+    assert decode_cursor(encode_cursor({"_id": doc["_id"]})) == (None, doc["_id"])
+    for bad in ("not-a-cursor", encode_cursor(doc)[:-6], "WyJ4IiwgInkiXQ=="):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_listing_filter_combines_filters_and_cursor():
+    assert listing_filter() == {}
+    assert listing_filter(filename_prefix="a.b(") == {"filename": {"$regex": r"^a\.b\("}}
+    oid, when = ObjectId(), datetime.datetime(2026, 5, 1)
+    query = listing_filter(category="legal", strategy="recursive", cursor=encode_cursor({"_id": oid, "upload_time": when}))
+    assert query["$and"][:2] == [{"doc_metadata_category": "legal"}, {"chunking_strategy": "recursive"}]
+    assert query["$and"][2] == {"$or": [
+        {"upload_time": {"$lt": when}},
+        {"upload_time": when, "_id": {"$lt": oid}},
+        {"upload_time": None},
+    ]}
+
+
+def test_document_record_stores_metadata_category():
+    assert _document_record("a.txt", 1, '{"category": "legal"}', "recursive", 512, 64)["doc_metadata_category"] == "legal"
+    assert _document_record("a.txt", 1, "{}", "recursive", 512, 64)["doc_metadata_category"] is None
+    assert metadata_category("not json") is None and metadata_category(None) is None
+
+
+class SyncCollection:
+    def __init__(self, docs):
+        self.docs, self.indexes, self.updates = docs, [], []
+
+    def create_index(self, keys):
+        self.indexes.append(keys)
+
+    def find(self, query, projection):
+        return [d for d in self.docs if "doc_metadata_category" not in d]
+
+    def update_one(self, selector, update):
+        self.updates.append((selector, update))
+
+
+def test_ensure_document_indexes_backfills_category():
+    legacy, current = {"_id": 1, "doc_metadata": '{"category": "hr"}'}, {"_id": 2, "doc_metadata_category": None}
+    collection = SyncCollection([legacy, current])
+    ensure_document_indexes(collection)
+    assert [("upload_time", -1), ("_id", -1)] in collection.indexes
+    assert collection.updates == [({"_id": 1}, {"$set": {"doc_metadata_category": "hr"}})]
+
+
+class AsyncCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        assert keys == LISTING_SORT
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    def __init__(self, docs):
+        self.docs, self.queries = docs, []
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        return AsyncCursor(self.docs)
+
+
+def _docs(n):
+    start = datetime.datetime(2026, 5, 1)
+    return [
+        {"_id": ObjectId(), "filename": f"doc{i}.txt", "doc_metadata": None,
+         "upload_time": start - datetime.timedelta(minutes=i), "chunking_strategy": "recursive"}
+        for i in range(n)
+    ]
+
+
+def _client(monkeypatch, collection):
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    monkeypatch.setattr(get_clients(), "async_collection", lambda name: collection)
+    return TestClient(routes.app)
+
+
+def test_documents_route_pages_with_cursor(monkeypatch):
+    docs = _docs(5)
+    collection = AsyncCollection(docs)
+    client = _client(monkeypatch, collection)
+
+    page = client.get("/documents", params={"limit": 2, "strategy": "recursive"}, headers=HEADERS).json()
+    assert [d["document_id"] for d in page["documents"]] == [str(d["_id"]) for d in docs[:2]]
+    assert page["documents"][0]["doc_metadata"] == "" and page["documents"][0]["chunk_size"] is None
+    assert decode_cursor(page["next_cursor"]) == (docs[1]["upload_time"], docs[1]["_id"])
+    assert collection.queries[0] == {"chunking_strategy": "recursive"}
+
+    collection.docs = docs[2:]
+    last = client.get("/documents", params={"limit": 3, "cursor": page["next_cursor"]}, headers=HEADERS).json()
+    assert len(last["documents"]) == 3 and last["next_cursor"] is None
+    assert collection.queries[1]["$or"][1] == {"upload_time": docs[1]["upload_time"], "_id": {"$lt": docs[1]["_id"]}}
+
+
+def test_documents_route_rejects_bad_parameters(monkeypatch):
+    client = _client(monkeypatch, AsyncCollection([]))
+    assert client.get("/documents", params={"cursor": "garbage"}, headers=HEADERS).status_code == 400
+    assert client.get("/documents", params={"limit": 0}, headers=HEADERS).status_code == 400
+    assert client.get("/documents", params={"limit": settings.DOCUMENTS_MAX_PAGE_SIZE + 1}, headers=HEADERS).status_code == 400
+    assert client.get("/documents", params={"format": "csv"}, headers=HEADERS).status_code == 400
+
+
+def test_documents_route_streams_ndjson_export(monkeypatch):
+    docs = _docs(4)
+    client = _client(monkeypatch, AsyncCollection(docs))
+    response = client.get("/documents", params={"format": "ndjson", "limit": 1}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [d["filename"] for d in lines] == [d["filename"] for d in docs]
+    assert lines[0]["upload_time"] == docs[0]["upload_time"].isoformat()
@@ -0,0 +1,99 @@
+import numpy as np
+from src.processing.embedding_cache import DiskShardStore, EmbeddingCache, QueryEmbeddingCache, cache_key
+
+
+def test_cache_key_normalizes_whitespace_and_model():
+    assert cache_key("m", "Hello   world\n") == cache_key("m", "Hello world")
+    assert cache_key("m", "Hello world") != cache_key("other", "Hello world")
+
+
+def test_memory_lru_eviction():
+    cache = EmbeddingCache(memory_entries=2)
+    cache.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert a is None
+    assert b.tolist() == [2.0] and c.tolist() == [3.0]
+
+
+def test_disk_tier_persists_and_evicts(tmp_path):
+    cache = EmbeddingCache(memory_entries=1, disk_dir=str(tmp_path), max_disk_bytes=2 * 2 * 4 * 4, shard_rows=2)
+    keys = [f"k{i}" for i in range(6)]
+    cache.put_many(keys, [[float(i)] * 4 for i in range(6)])
+    # Reopen: memory tier is empty, vectors come back from the memory-mapped shards
+    reopened = EmbeddingCache(memory_entries=1, disk_dir=str(tmp_path), max_disk_bytes=2 * 2 * 4 * 4, shard_rows=2)
+    results = reopened.get_many(keys)
+    assert results[0] is None and results[1] is None  # oldest shard evicted
+    assert results[5].tolist() == [5.0] * 4
+    assert len(list(tmp_path.glob("*.f32"))) == 2
+
+
+def test_processes_sharing_the_disk_tier_keep_rows_and_keys_aligned(tmp_path):
+    # Two stores on one directory stand in for the API and the bulk_ingest CLI.
+    api = DiskShardStore(str(tmp_path), max_bytes=1 << 20, shard_rows=3)
+    cli = DiskShardStore(str(tmp_path), max_bytes=1 << 20, shard_rows=3)
+    api.put_many([("a", np.full(2, 1.0, dtype=np.float32))])
+    cli.put_many([("b", np.full(2, 2.0, dtype=np.float32)), ("a", np.full(2, 9.0, dtype=np.float32))])
+    api.put_many([("c", np.full(2, 3.0, dtype=np.float32)), ("d", np.full(2, 4.0, dtype=np.float32))])
+    # Each store sees the other's entries after its next write.
+    assert cli.get("a").tolist() == [1.0, 1.0] and api.get("b").tolist() == [2.0, 2.0]
+    reopened = DiskShardStore(str(tmp_path), max_bytes=1 << 20, shard_rows=3)
+    assert {key: reopened.get(key).tolist()[0] for key in "abcd"} == {"a": 1.0, "b": 2.0, "c": 3.0, "d": 4.0}
+    assert len(list(tmp_path.glob("*.f32"))) == 2
+
+
+def test_embed_chunks_encodes_duplicates_once(monkeypatch):
+    import src.processing.embeddings as embeddings
+
+    encoded = []
+
+    def fake_encode(texts, lengths=None):
+        encoded.extend(texts)
+        return [[float(len(t))] for t in texts]
+
+    monkeypatch.setattr(embeddings, "_encode", fake_encode)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: cache)
+    cache = EmbeddingCache(memory_entries=100)
+    assert embeddings.embed_chunks(["aa", "b", "aa"]) == [[2.0], [1.0], [2.0]]
+    assert embeddings.embed_chunks(["b", "ccc"]) == [[1.0], [3.0]]
+    assert encoded == ["aa", "b", "ccc"]
+
+
+def test_query_cache_is_bounded_in_bytes():
+    entry = 4 * 4 + len("k0") + QueryEmbeddingCache.ENTRY_OVERHEAD_BYTES
+    cache = QueryEmbeddingCache(max_bytes=2 * entry)
+    cache.put("k0", [0.0] * 4)
+    cache.put("k1", [1.0] * 4)
+    cache.get("k0")  # k0 is now more recent than k1
+    cache.put("k2", [2.0] * 4)
+    assert cache.get("k1") is None
+    assert cache.get("k0").tolist() == [0.0] * 4
+    assert len(cache) == 2 and cache.size_bytes == 2 * entry
+    cache.put("big", [0.0] * 1000)  # larger than the whole budget: not cached
+    assert cache.get("big") is None and len(cache) == 2
+
+
+def test_query_cache_ttl(monkeypatch):
+    import src.processing.embedding_cache as embedding_cache
+    now = [100.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_bytes=10_000, ttl_seconds=60)
+    cache.put("q", [1.0])
+    now[0] += 59
+    assert cache.get("q").tolist() == [1.0]
+    now[0] += 2
+    assert cache.get("q") is None and cache.size_bytes == 0
+
+
+def test_embed_query_uses_cache_keyed_by_model(monkeypatch):
+    import src.processing.embeddings as embeddings
+    encoded = []
+    cache = QueryEmbeddingCache(max_bytes=10_000)
+    monkeypatch.setattr(embeddings, "get_query_embedding_cache", lambda: cache)
+    monkeypatch.setattr(embeddings.settings, "QUERY_BATCHING_ENABLED", False)
+    monkeypatch.setattr(embeddings, "_encode", lambda texts: encoded.extend(texts) or [[1.0, 2.0] for _ in texts])
+    assert embeddings.embed_query("what is rag") == [1.0, 2.0]
+    assert embeddings.embed_query("what   is rag") == [1.0, 2.0]
+    assert encoded == ["what is rag"]
+    monkeypatch.setattr(embeddings.settings, "EMBEDDING_MODEL_NAME", "other-model")
+    embeddings.embed_query("what is rag")
+    assert len(encoded) == 2
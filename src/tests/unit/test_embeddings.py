@@ -4,4 +4,64 @@ def test_embed_chunks():
     chunks = ["Hello world", "Test chunk"]
     embeddings = embed_chunks(chunks)
     assert len(embeddings) == 2
-    assert all(isinstance(vec, list) for vec in embeddings) 
\ No newline at end of file
+    assert all(isinstance(vec, list) for vec in embeddings) 
+
+class DummyModel:
+    def __init__(self, *args, **kwargs):
+        self.encode_calls = []
+
+    def encode(self, chunks, **kwargs):
+        import numpy as np
+        self.encode_calls.append((list(chunks), kwargs))
+        return np.ones((len(chunks), 4), dtype="float32")
+
+
+def test_shared_model_loaded_once(monkeypatch):
+    import src.processing.embeddings as embeddings
+    loads = []
+
+    def fake_model(*args, **kwargs):
+        loads.append(args)
+        return DummyModel()
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", fake_model)
+    monkeypatch.setattr(embeddings, "_model", None)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: None)
+    monkeypatch.setattr(embeddings, "get_query_embedding_cache", lambda: None)
+    embeddings.warmup()
+    embeddings.embed_chunks(["a", "b"])
+    assert embeddings.embed_query("q") == [1.0, 1.0, 1.0, 1.0]
+    assert len(loads) == 1
+    assert embeddings.embed_chunks([]) == []
+
+
+def test_onnx_backend_selected_by_config(monkeypatch):
+    import pytest
+    import src.processing.embeddings as embeddings
+    calls = []
+
+    def fake_model(*args, **kwargs):
+        calls.append(kwargs)
+        return DummyModel()
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", fake_model)
+    monkeypatch.setattr(embeddings, "_model", None)
+    monkeypatch.setattr(embeddings.settings, "EMBEDDING_NUM_THREADS", None)
+    torch_id = embeddings.model_id()
+    monkeypatch.setattr(embeddings.settings, "EMBEDDING_BACKEND", "onnx")
+    embeddings.get_model()
+    assert calls[0]["backend"] == "onnx"
+    assert calls[0]["model_kwargs"]["file_name"] == embeddings.settings.EMBEDDING_ONNX_FILE
+    assert embeddings.model_id() != torch_id
+    monkeypatch.setattr(embeddings.settings, "EMBEDDING_BACKEND", "tensorrt")
+    with pytest.raises(ValueError):
+        embeddings._backend_kwargs()
+
+
+def test_plan_batches_buckets_by_length():
+    from src.processing.embeddings import plan_batches
+    lengths = [10, 200, 12, 180, 11, 9]
+    batches = plan_batches(lengths, token_budget=400, max_items=3)
+    assert batches == [[1, 3], [2, 4, 0], [5]]
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert plan_batches([500, 5], token_budget=100, max_items=10) == [[0], [1]]
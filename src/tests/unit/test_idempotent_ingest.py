@@ -0,0 +1,215 @@
+import datetime
+import itertools
+
+import pytest
+
+from src.storage.vector_db import point_id
+
+
+class FakeColl:
+    """In-memory stand-in for the documents collection (unique ingest_key)."""
+
+    def __init__(self):
+        self.docs = {}
+        self._ids = itertools.count(1)
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def _matches(self, doc, query):
+        for field, cond in query.items():
+            if field == "$or":
+                if not any(self._matches(doc, q) for q in cond):
+                    return False
+            elif isinstance(cond, dict) and "$in" in cond:
+                if doc.get(field) not in cond["$in"]:
+                    return False
+            elif isinstance(cond, dict) and "$lt" in cond:
+                if doc.get(field) is None or not doc.get(field) < cond["$lt"]:
+                    return False
+            elif doc.get(field) != cond:
+                return False
+        return True
+
+    def find_one(self, query):
+        return next((dict(d) for d in self.docs.values() if self._matches(d, query)), None)
+
+    def find(self, query):
+        return [dict(d) for d in self.docs.values() if self._matches(d, query)]
+
+    def _insert(self, doc):
+        doc = dict(doc, _id=f"id{next(self._ids)}")
+        self.docs[doc["_id"]] = doc
+        return doc["_id"]
+
+    def insert_one(self, doc):
+        class Result:
+            inserted_id = self._insert(doc)
+        return Result()
+
+    def insert_many(self, docs):
+        class Result:
+            inserted_ids = [self._insert(doc) for doc in docs]
+        return Result()
+
+    def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        matched = doc is not None and self._matches(doc, query)
+        if matched:
+            doc.update(update["$set"])
+
+        class Result:
+            matched_count = int(matched)
+        return Result()
+
+    def find_one_and_update(self, query, update):
+        doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+        if doc is None:
+            return None
+        before = dict(doc)
+        doc.update(update["$set"])
+        return before
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.update_one(request._filter, request._doc)
+
+    def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        deleted = doc is not None and self._matches(doc, query)
+        if deleted:
+            del self.docs[query["_id"]]
+
+        class Result:
+            deleted_count = int(deleted)
+        return Result()
+
+
+def _patch(monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+
+    coll, embedded, upserts = FakeColl(), [], []
+    monkeypatch.setattr(ingest_rag, "_documents", lambda: coll)
+    monkeypatch.setattr(ingest_rag, "embed_chunks", lambda chunks: embedded.append(len(chunks)) or [[0.0]] * len(chunks))
+    monkeypatch.setattr(ingest_rag, "_upsert_points", lambda points: upserts.append(points))
+    return ingest_rag, coll, embedded, upserts
+
+
+def test_point_ids_are_deterministic():
+    assert point_id("doc-1", 3) == point_id("doc-1", 3)
+    assert point_id("doc-1", 3) != point_id("doc-1", 4)
+    assert point_id("doc-1", 3) != point_id("doc-2", 3)
+
+
+def test_reingesting_same_content_short_circuits(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+    first = ingest_rag.ingest_document_rag("a.txt", "x" * 1000, None, strategy="fixed", chunk_size=100, overlap=0)
+    stages = []
+    second = ingest_rag.ingest_document_rag(
+        "a-copy.txt", "x" * 1000, None, strategy="fixed", chunk_size=100, overlap=0,
+        progress=lambda stage, **counts: stages.append((stage, counts)),
+    )
+    assert first == second
+    assert embedded == [10] and len(coll.docs) == 1
+    assert coll.docs[first]["ingest_status"] == "complete" and coll.docs[first]["chunk_count"] == 10
+    assert stages == [("done", {"chunks_total": 10})]
+
+    # Different chunking parameters are a different ingest
+    third = ingest_rag.ingest_document_rag("a.txt", "x" * 1000, None, strategy="fixed", chunk_size=200, overlap=0)
+    assert third != first and embedded == [10, 5]
+
+
+def test_incomplete_ingest_is_resumed_with_same_point_ids(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+    first = ingest_rag.ingest_document_rag("a.txt", "y" * 300, None, strategy="fixed", chunk_size=100, overlap=0)
+    coll.docs[first]["ingest_status"] = "processing"  # e.g. the process died before finishing
+    again = ingest_rag.ingest_document_rag("a.txt", "y" * 300, None, strategy="fixed", chunk_size=100, overlap=0)
+    assert again == first and len(coll.docs) == 1
+    assert [p.id for p in upserts[0]] == [p.id for p in upserts[1]]
+    assert coll.docs[first]["ingest_status"] == "complete"
+
+
+def test_batch_dedups_existing_and_within_batch(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+
+    def doc(name, content_hash):
+        return {"filename": name, "size": 3, "chunks": ["a", "b"], "strategy": "fixed",
+                "chunk_size": 100, "overlap": 0, "content_hash": content_hash}
+
+    [first] = ingest_rag.store_chunked_documents([doc("a.txt", "h1")])
+    results = ingest_rag.store_chunked_documents([doc("a2.txt", "h1"), doc("b.txt", "h2"), doc("b2.txt", "h2")])
+    assert [r["duplicate"] for r in results] == [True, False, True]
+    assert results[0]["document_id"] == first["document_id"]
+    assert results[1]["document_id"] == results[2]["document_id"]
+    assert embedded == [2, 2] and len(coll.docs) == 2
+
+
+def _interrupt(coll, document_id, lease_seconds):
+    """Leave a record as an ingest would while still running (or after dying)."""
+    coll.docs[document_id].update(
+        ingest_status="processing",
+        ingest_lease_owner="other-ingest",
+        ingest_lease_until=datetime.datetime.utcnow() + datetime.timedelta(seconds=lease_seconds),
+    )
+
+
+def test_running_ingest_is_not_resumed_twice(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+    first = ingest_rag.ingest_document_rag("a.txt", "z" * 300, None, strategy="fixed", chunk_size=100, overlap=0)
+    _interrupt(coll, first, lease_seconds=60)
+    with pytest.raises(ingest_rag.IngestInProgressError) as error:
+        ingest_rag.ingest_document_rag("a.txt", "z" * 300, None, strategy="fixed", chunk_size=100, overlap=0)
+    assert error.value.document_id == first
+    assert embedded == [3] and coll.docs[first]["ingest_lease_owner"] == "other-ingest"
+
+    # Once the lease expired the ingest is taken over and resumed.
+    _interrupt(coll, first, lease_seconds=-1)
+    assert ingest_rag.ingest_document_rag("a.txt", "z" * 300, None, strategy="fixed", chunk_size=100, overlap=0) == first
+    assert embedded == [3, 3] and coll.docs[first]["ingest_status"] == "complete"
+
+
+def test_batch_reports_content_being_ingested(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+    doc = {"filename": "a.txt", "size": 3, "chunks": ["a", "b"], "strategy": "fixed",
+           "chunk_size": 100, "overlap": 0, "content_hash": "h1"}
+    [first] = ingest_rag.store_chunked_documents([doc])
+    _interrupt(coll, first["document_id"], lease_seconds=60)
+    results = ingest_rag.store_chunked_documents([doc, dict(doc, filename="a2.txt")])
+    assert [r["status"] for r in results] == ["in_progress", "in_progress"]
+    assert {r["document_id"] for r in results} == {first["document_id"]}
+    assert embedded == [2, 0]  # nothing left to embed
+
+
+def test_failed_ingest_keeps_a_record_taken_over_by_another(monkeypatch):
+    ingest_rag, coll, embedded, upserts = _patch(monkeypatch)
+    monkeypatch.setattr(ingest_rag.settings, "INGEST_LEASE_SECONDS", 0)  # renew before every window
+    monkeypatch.setattr(ingest_rag.settings, "INGEST_WINDOW_CHUNKS", 2)
+
+    def take_over_while_running(points):
+        upserts.append(points)
+        for doc in coll.docs.values():
+            doc["ingest_lease_owner"] = "other-ingest"
+
+    monkeypatch.setattr(ingest_rag, "_upsert_points", take_over_while_running)
+    with pytest.raises(RuntimeError, match="Lost the ingest lease"):
+        ingest_rag.ingest_document_rag("a.txt", "w" * 600, None, strategy="fixed", chunk_size=100, overlap=0)
+    assert len(upserts) == 1 and len(coll.docs) == 1
+
+
+def test_ingest_route_returns_conflict_while_content_is_being_ingested(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    import src.api.routes as routes
+    import src.processing.ingest_rag as ingest_rag
+    from src.config.settings import settings
+
+    def busy(*args, **kwargs):
+        raise ingest_rag.IngestInProgressError("doc-1")
+
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    monkeypatch.setattr(settings, "INGEST_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(routes, "ingest_document_stream", busy)
+    response = TestClient(routes.app).post(
+        "/ingest", files={"file": ("a.txt", b"text")}, headers={"Authorization": "Bearer test-token"}
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"]["document_id"] == "doc-1"
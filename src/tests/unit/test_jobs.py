@@ -0,0 +1,110 @@
+import threading
+import pytest
+from src.processing.jobs import IngestJobQueue, QueueFullError, JOB_SUCCEEDED, JOB_FAILED
+
+
+class FakeCollection:
+    """Minimal in-memory stand-in for the pymongo calls used by the job queue."""
+
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def insert_one(self, doc):
+        with self.lock:
+            self.docs[doc["_id"]] = dict(doc)
+
+    def update_one(self, query, update):
+        with self.lock:
+            doc = self.docs[query["_id"]]
+            for key, value in update["$set"].items():
+                target = doc
+                *parents, leaf = key.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[leaf] = value
+
+    def find_one(self, query):
+        with self.lock:
+            doc = self.docs.get(query["_id"])
+            return dict(doc) if doc else None
+
+    def find(self, query, sort=None, limit=0):
+        with self.lock:
+            docs = [dict(d) for d in self.docs.values()]
+        status = query.get("status")
+        if isinstance(status, dict):
+            docs = [d for d in docs if d["status"] in status["$in"]]
+        elif status:
+            docs = [d for d in docs if d["status"] == status]
+        return docs[:limit] if limit else docs
+
+
+def wait_for(queue, job_id, statuses=(JOB_SUCCEEDED, JOB_FAILED)):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def spooled(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_job_runs_and_records_stages(tmp_path):
+    def process(job, progress):
+        with open(job["spool_path"], "rb") as f:
+            assert f.read() == b"hello"
+        progress("chunking")
+        progress("embedding", chunks_total=3)
+        progress("done", chunks_upserted=3)
+        return "doc-1"
+
+    spool_dir = tmp_path / "spool"
+    queue = IngestJobQueue(FakeCollection(), process, str(spool_dir), workers=1)
+    job_id = queue.submit("a.txt", spooled(tmp_path, "up1", b"hello"), {"strategy": "fixed"})
+    job = wait_for(queue, job_id)
+    queue.shutdown(wait=True)
+    assert job["status"] == JOB_SUCCEEDED
+    assert job["document_id"] == "doc-1"
+    assert job["chunk_counts"] == {"chunks_total": 3, "chunks_upserted": 3}
+    assert set(job["timings"]) == {"storing", "chunking", "embedding"}
+    assert not list(spool_dir.iterdir())
+
+
+def test_failed_job_records_error(tmp_path):
+    def process(job, progress):
+        raise ValueError("bad document")
+
+    queue = IngestJobQueue(FakeCollection(), process, str(tmp_path), workers=1)
+    job = wait_for(queue, queue.submit("a.txt", spooled(tmp_path, "up2", b"x"), {}))
+    queue.shutdown(wait=True)
+    assert job["status"] == JOB_FAILED
+    assert job["error"] == "bad document"
+
+
+def test_queue_is_bounded(tmp_path):
+    release = threading.Event()
+    queue = IngestJobQueue(FakeCollection(), lambda job, progress: release.wait(5), str(tmp_path), workers=1, max_pending=1)
+    queue.submit("a.txt", spooled(tmp_path, "up2", b"x"), {})
+    with pytest.raises(QueueFullError):
+        queue.submit("b.txt", spooled(tmp_path, "up3", b"y"), {})
+    release.set()
+    queue.shutdown(wait=True)
+
+
+def test_unfinished_jobs_resume_on_start(tmp_path):
+    collection = FakeCollection()
+    spool = tmp_path / "job1.upload"
+    spool.write_bytes(b"data")
+    collection.insert_one({"_id": "job1", "filename": "a.txt", "spool_path": str(spool), "params": {},
+                           "status": "running", "stage": "embedding", "chunk_counts": {}, "timings": {}})
+    queue = IngestJobQueue(collection, lambda job, progress: "doc-9", str(tmp_path), workers=1)
+    queue.start()
+    job = wait_for(queue, "job1")
+    queue.shutdown(wait=True)
+    assert job["status"] == JOB_SUCCEEDED and job["document_id"] == "doc-9"
@@ -0,0 +1,195 @@
+import math
+import os
+import threading
+import time
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, FieldCondition, Filter, MatchValue, PointStruct, VectorParams
+import src.processing.ingest_rag as ingest_rag
+import src.storage.keyword_index as keyword_index
+import src.storage.vector_db as vector_db
+from src.storage.clients import get_clients
+from src.storage.keyword_index import KeywordIndex, analyze, get_keyword_index, rebuild
+
+CHUNKS = [
+    ("p1", "d1", "Qdrant stores the chunk vectors"),
+    ("p2", "d1", "BM25 scores chunks by keyword"),
+    ("p3", "d2", "keyword search and vector search are fused"),
+    ("p4", "d3", "the invoice is due at the end of the month"),
+]
+
+
+def _bm25(term, text, texts, k1=KeywordIndex.K1, b=KeywordIndex.B):
+    docs = [analyze(t) for t in texts]
+    avgdl = sum(len(d) for d in docs) / len(docs)
+    df = sum(1 for d in docs if term in d)
+    tokens = analyze(text)
+    tf = tokens.count(term)
+    idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+    return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avgdl))
+
+
+def test_analyze_normalizes_case_and_punctuation():
+    assert analyze("BM25, Qdrant's\nKEYWORD-search!") == ["bm25", "qdrant", "s", "keyword", "search"]
+    assert analyze("ﬁle Straße") == ["file", "strasse"]
+
+
+def test_sources_must_implement_postings_and_terms():
+    class TermsOnly(keyword_index._Source):
+        def terms(self):
+            return []
+
+    with pytest.raises(TypeError):
+        TermsOnly()
+    assert isinstance(keyword_index._Buffer(), keyword_index._Source)
+
+
+def test_scores_match_bm25(tmp_path):
+    index = KeywordIndex(str(tmp_path))
+    index.add(CHUNKS)
+    texts = [text for _, _, text in CHUNKS]
+    for flushed in (False, True):
+        hits = dict(index.search("keyword"))
+        assert set(hits) == {"p2", "p3"}
+        assert hits["p2"] == pytest.approx(_bm25("keyword", texts[1], texts))
+        assert hits["p3"] == pytest.approx(_bm25("keyword", texts[2], texts))
+        index.flush()
+    assert index.search("keyword", limit=1)[0][0] == "p2"
+    assert index.search("unknown words") == []
+
+
+def test_index_persists_and_other_instances_see_flushes(tmp_path):
+    writer = KeywordIndex(str(tmp_path))
+    reader = KeywordIndex(str(tmp_path))
+    writer.add(CHUNKS)
+    assert reader.search("invoice") == []
+    writer.flush()
+    assert [p for p, _ in reader.search("invoice")] == ["p4"]
+    writer.delete_document("d3")
+    assert reader.search("invoice") == []
+    assert len(KeywordIndex(str(tmp_path))) == 3
+
+
+def test_reindexing_a_point_replaces_it(tmp_path):
+    index = KeywordIndex(str(tmp_path))
+    index.add(CHUNKS)
+    index.flush()
+    index.add([("p4", "d3", "the receipt was paid")])
+    assert index.search("invoice") == []
+    index.flush()
+    assert [p for p, _ in index.search("receipt")] == ["p4"]
+    assert len(index) == 4
+
+
+def test_deleting_drops_buffered_and_flushed_chunks(tmp_path):
+    index = KeywordIndex(str(tmp_path))
+    index.add(CHUNKS[:2])
+    index.flush()
+    index.add([("p5", "d1", "more keyword text")])
+    index.add(CHUNKS[2:])
+    index.delete_document("d1")
+    assert [p for p, _ in index.search("keyword chunk")] == ["p3"]
+    assert len(index) == 2
+
+
+def test_merges_keep_segments_logarithmic(tmp_path):
+    index = KeywordIndex(str(tmp_path))
+    for i in range(64):
+        index.add([(f"p{i}", f"d{i}", f"common term{i}")])
+        index.flush()
+    assert index.segment_count <= 7
+    segments = [name for name in os.listdir(tmp_path) if name.startswith("seg_")]
+    assert len(segments) == index.segment_count
+    assert len(index.search("common")) == 64
+    assert [p for p, _ in index.search("term63")] == ["p63"]
+
+
+def test_searches_and_adds_proceed_during_a_flush(tmp_path, monkeypatch):
+    index = KeywordIndex(str(tmp_path))
+    index.add(CHUNKS)
+    writing, release = threading.Event(), threading.Event()
+    write_segment = keyword_index._write_segment
+
+    def slow_write(path, sources):
+        writing.set()
+        assert release.wait(5)
+        return write_segment(path, sources)
+
+    monkeypatch.setattr(keyword_index, "_write_segment", slow_write)
+    flusher = threading.Thread(target=index.flush)
+    flusher.start()
+    assert writing.wait(5)
+    # The flush is writing the buffer; the index stays searchable and writable, and the
+    # re-indexed p4 supersedes the copy being flushed.
+    assert [p for p, _ in index.search("invoice")] == ["p4"]
+    index.add([("p4", "d3", "the receipt was paid"), ("p5", "d4", "another keyword chunk")])
+    release.set()
+    flusher.join(5)
+    assert index.search("invoice") == []
+    assert {p for p, _ in index.search("keyword receipt")} == {"p2", "p3", "p4", "p5"}
+    index.flush()
+    assert {p for p, _ in KeywordIndex(str(tmp_path)).search("keyword receipt")} == {"p2", "p3", "p4", "p5"}
+    assert len(KeywordIndex(str(tmp_path))) == 5
+
+
+def test_flush_if_due_defers_to_the_interval(tmp_path):
+    index = KeywordIndex(str(tmp_path), flush_interval=0.2)
+    index.add(CHUNKS[:1])
+    index.flush_if_due()  # nothing flushed yet: due at once
+    index.add(CHUNKS[1:])
+    index.flush_if_due()
+    assert len(KeywordIndex(str(tmp_path))) == 1
+    time.sleep(0.5)  # the timer flushes the rest
+    assert len(KeywordIndex(str(tmp_path))) == 4
+
+
+def _collection(count):
+    client = QdrantClient(":memory:")
+    client.create_collection("documents", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    points = [
+        PointStruct(
+            id=vector_db.point_id(f"d{i % 3}", i),
+            vector=[1.0, float(i)],
+            payload={"mongo_id": f"d{i % 3}", "chunk_index": i, "text": f"filler chunk {i}",
+                     "doc_metadata_category": "even" if i % 2 == 0 else "odd"},
+        )
+        for i in range(count)
+    ]
+    points[-1].payload["text"] = "the needle"
+    points[-2].payload["text"] = "another needle chunk"
+    client.upsert("documents", points=points)
+    return client, points
+
+
+def test_keyword_search_sees_whole_collection_and_applies_filters(monkeypatch):
+    client, points = _collection(1200)
+    monkeypatch.setattr(get_clients(), "qdrant", client)
+    assert rebuild(client, "documents") == 1200
+
+    results = vector_db.keyword_search("needle", top_k=5)
+    assert [r["chunk_index"] for r in results] == [1199, 1198]
+    assert all(r["bm25"] for r in results)
+
+    odd = Filter(must=[FieldCondition(key="doc_metadata_category", match=MatchValue(value="odd"))])
+    assert [r["chunk_index"] for r in vector_db.keyword_search("needle chunk", 1, odd)] == [1199]
+    even = Filter(must=[FieldCondition(key="doc_metadata_category", match=MatchValue(value="even"))])
+    assert [r["chunk_index"] for r in vector_db.keyword_search("needle", 5, even)] == [1198]
+
+
+def test_ingest_and_delete_update_the_index(monkeypatch):
+    client, points = _collection(10)
+    monkeypatch.setattr(get_clients(), "qdrant", client)
+
+    class Upserter:
+        def upsert(self, batch):
+            client.upsert("documents", points=batch)
+
+    monkeypatch.setattr(ingest_rag, "_get_upserter", lambda: Upserter())
+    ingest_rag._upsert_points(points)
+    assert [r["chunk_index"] for r in vector_db.keyword_search("needle", 5)] == [9, 8]
+    ingest_rag._flush_keyword_index()
+    assert len(KeywordIndex(get_keyword_index().directory)) == 10
+
+    vector_db.delete_document("d0")
+    assert [r["chunk_index"] for r in vector_db.keyword_search("needle", 5)] == [8]
+    assert len(get_keyword_index()) == 6
@@ -0,0 +1,97 @@
+import pytest
+from src.processing.pdf_extraction import available_extractors, extract_pdf_text, iter_pdf_pages, get_extractor
+from src.processing.streaming import PageTracker, iter_chunks
+
+
+def make_text_pdf(path, pages, lines_per_page=20):
+    """Write a minimal PDF with one line of Helvetica text per row; page n mentions "page n"."""
+    objects = [b"<</Type/Catalog/Pages 2 0 R>>", None, b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>"]
+    kids = []
+    for n in range(1, pages + 1):
+        lines = " T* ".join(f"(Line {i} of page {n} in the synthetic benchmark document.) Tj" for i in range(lines_per_page))
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {lines} ET".encode()
+        objects.append(b"<</Length %d>>stream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>"
+                       % len(objects))
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<</Type/Pages/Kids[{' '.join(kids)}]/Count {pages}>>".encode()
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def test_pages_are_numbered_in_order(tmp_path):
+    path = make_text_pdf(str(tmp_path / "doc.pdf"), pages=5, lines_per_page=2)
+    pages = list(iter_pdf_pages(path, backend="pypdf2", workers=1))
+    assert [n for n, _ in pages] == [1, 2, 3, 4, 5]
+    assert all(f"page {n}" in text for n, text in pages)
+
+
+def test_parallel_matches_serial(tmp_path):
+    path = make_text_pdf(str(tmp_path / "doc.pdf"), pages=12, lines_per_page=3)
+    serial = list(iter_pdf_pages(path, backend="pypdf2", workers=1))
+    parallel = list(iter_pdf_pages(path, backend="pypdf2", workers=2, min_pages_parallel=2, pages_per_task=5))
+    assert parallel == serial
+    with open(path, "rb") as f:
+        assert extract_pdf_text(f.read(), workers=2, min_pages_parallel=2, pages_per_task=5) == "".join(t for _, t in serial)
+
+
+def test_extractions_with_different_worker_counts_share_no_pool(tmp_path):
+    path = make_text_pdf(str(tmp_path / "doc.pdf"), pages=12, lines_per_page=3)
+    serial = list(iter_pdf_pages(path, backend="pypdf2", workers=1))
+    # The first extraction submits its remaining ranges after the second one has run.
+    first = iter_pdf_pages(path, backend="pypdf2", workers=2, min_pages_parallel=2, pages_per_task=1)
+    head = next(first)
+    assert list(iter_pdf_pages(path, backend="pypdf2", workers=3, min_pages_parallel=2, pages_per_task=1)) == serial
+    assert [head, *first] == serial
+
+
+def test_page_ranges_match_single_pages(tmp_path):
+    path = make_text_pdf(str(tmp_path / "doc.pdf"), pages=6, lines_per_page=2)
+    for backend in available_extractors():
+        extractor = get_extractor(backend)
+        single = [next(extractor.iter_pages(path, i, i + 1)) for i in range(6)]
+        assert list(extractor.iter_pages(path, 2, 5)) == single[2:5]
+        assert list(extractor.iter_pages(path, 4, 10)) == single[4:]
+        assert all(f"page {n}" in text for n, text in enumerate(single, start=1))
+
+
+def test_unknown_backend():
+    assert "pypdf2" in available_extractors()
+    with pytest.raises(ValueError):
+        get_extractor("nope")
+
+
+def test_page_tracker_locates_chunks():
+    pages = [(1, "alpha beta gamma. " * 10), (2, "delta epsilon zeta. " * 10), (3, "eta theta iota. " * 10)]
+    tracker = PageTracker(pages, keep_chars=256)
+    located = [(chunk, tracker.locate(chunk)) for chunk in iter_chunks(tracker, "sliding", 120, 20)]
+    assert located[0][1] == (1, 1)
+    assert located[-1][1] == (3, 3)
+    assert any(span == (1, 2) for _, span in located)
+    for chunk, (first, last) in located:
+        assert first <= last
+
+
+def test_stream_ingest_stores_page_numbers(tmp_path, monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+    from src.tests.unit.test_idempotent_ingest import FakeColl
+
+    upserts = []
+    coll = FakeColl()
+    monkeypatch.setattr(ingest_rag, "_documents", lambda: coll)
+    monkeypatch.setattr(ingest_rag, "embed_chunks", lambda chunks: [[0.0]] * len(chunks))
+    monkeypatch.setattr(ingest_rag, "_upsert_points", lambda points: upserts.append(points))
+    path = make_text_pdf(str(tmp_path / "doc.pdf"), pages=3, lines_per_page=10)
+    ingest_rag.ingest_document_stream("doc.pdf", path, None, strategy="fixed", chunk_size=200, overlap=0)
+    payloads = [p.payload for batch in upserts for p in batch]
+    assert payloads[0]["page_start"] == 1 and payloads[-1]["page_end"] == 3
+    assert all(p["page_start"] <= p["page_end"] for p in payloads)
@@ -0,0 +1,70 @@
+import threading
+import time
+import pytest
+from src.processing.pipeline import StagedPipeline
+
+
+def test_pipeline_preserves_order_and_regroups():
+    def pairs(numbers):
+        batch = []
+        for n in numbers:
+            batch.append(n)
+            if len(batch) == 2:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    pipeline = StagedPipeline([
+        ("source", lambda _: range(7)),
+        ("pairs", pairs),
+        ("sum", lambda batches: (sum(b) for b in batches)),
+    ], queue_size=1)
+    assert list(pipeline.run()) == [1, 5, 9, 6]
+    assert set(pipeline.busy_seconds) == {"source", "pairs", "sum"}
+
+
+def test_stages_overlap():
+    active, overlapped = set(), []
+    lock = threading.Lock()
+
+    def slow(name):
+        def stage(items):
+            for item in items:
+                with lock:
+                    active.add(name)
+                    if len(active) > 1:
+                        overlapped.append(item)
+                time.sleep(0.05)
+                with lock:
+                    active.discard(name)
+                yield item
+        return stage
+
+    pipeline = StagedPipeline([("source", lambda _: range(6)), ("embed", slow("embed")), ("upsert", slow("upsert"))])
+    start = time.perf_counter()
+    assert list(pipeline.run()) == list(range(6))
+    # Sequential would take 12 * 0.05s; overlapping stages need about 7 * 0.05s
+    assert time.perf_counter() - start < 0.5
+    assert overlapped
+    assert pipeline.busy_seconds["embed"] >= 0.25
+
+
+def test_stage_error_stops_pipeline_and_is_raised():
+    consumed = []
+
+    def failing(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("boom")
+            yield item
+
+    def sink(items):
+        for item in items:
+            consumed.append(item)
+            yield item
+
+    pipeline = StagedPipeline([("source", lambda _: iter(range(1000))), ("fail", failing), ("sink", sink)])
+    with pytest.raises(ValueError, match="boom"):
+        list(pipeline.run())
+    assert consumed == [0, 1, 2][:len(consumed)]
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+from src.storage.qdrant_writes import BatchedUpserter, UpsertReconciler
+from src.storage.vector_db import point_id
+
+
+def make_points(n, doc="doc"):
+    return [PointStruct(id=point_id(doc, i), vector=[1.0, float(i)], payload={"chunk_index": i}) for i in range(n)]
+
+
+def local_client():
+    client = QdrantClient(":memory:")
+    client.create_collection("documents", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    return client
+
+
+class RecordingClient:
+    def __init__(self, delay=0.05):
+        self.calls, self.delay = [], delay
+        self.active = self.max_active = 0
+        self.lock = threading.Lock()
+
+    def upsert(self, collection_name, points, wait=True):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.calls.append((len(points), wait))
+
+
+def test_upserts_are_batched_with_bounded_parallelism():
+    client = RecordingClient()
+    BatchedUpserter(client, "documents", batch_size=10, parallelism=3).upsert(make_points(95))
+    assert sorted(size for size, _ in client.calls) == [5] + [10] * 9
+    assert all(wait for _, wait in client.calls)
+    assert 1 < client.max_active <= 3
+
+
+def test_batch_error_is_raised():
+    class Failing(RecordingClient):
+        def upsert(self, collection_name, points, wait=True):
+            if points[0].payload["chunk_index"] == 20:
+                raise ConnectionError("qdrant down")
+            super().upsert(collection_name, points, wait)
+
+    try:
+        BatchedUpserter(Failing(delay=0), "documents", batch_size=10, parallelism=2).upsert(make_points(40))
+    except ConnectionError as e:
+        assert "qdrant down" in str(e)
+    else:
+        raise AssertionError("expected the batch failure to propagate")
+
+
+def test_unacknowledged_writes_are_reconciled():
+    client = local_client()
+    reconciler = UpsertReconciler(client, "documents", interval=60)
+    upserter = BatchedUpserter(client, "documents", batch_size=4, parallelism=2, wait=False, reconciler=reconciler)
+    upserter.upsert(make_points(10))
+    assert reconciler.pending == 3
+    assert reconciler.reconcile_once() == 3
+    assert reconciler.pending == 0
+    reconciler.stop()
+
+
+def test_lost_write_is_resent():
+    client = local_client()
+    reconciler = UpsertReconciler(client, "documents", interval=60, max_attempts=3)
+    points = make_points(3, doc="lost")
+    reconciler.track(points)  # tracked but never written, as if the acknowledged write was dropped
+    assert reconciler.reconcile_once() == 0
+    assert len(client.retrieve("documents", ids=[p.id for p in points])) == 3
+    assert reconciler.flush(timeout=5)
+    reconciler.stop()
+
+
+def test_pending_points_are_compact_and_bounded():
+    client = local_client()
+    reconciler = UpsertReconciler(client, "documents", interval=60, max_pending_points=5)
+    reconciler.track(make_points(4, doc="a"))
+    assert reconciler._pending[0]["points"][0][1].dtype == np.float32
+    # Over the bound: the backlog is reconciled first (re-sending the lost batch) and stays bounded.
+    reconciler.track(make_points(4, doc="b"))
+    assert reconciler._pending_points <= 5
+    assert reconciler.flush(timeout=5)
+    assert len(client.retrieve("documents", ids=[p.id for p in make_points(4, doc="a")])) == 4
+    reconciler.stop()
+
+
+def test_full_backlog_confirms_batches_inline():
+    client = RecordingClient(delay=0)
+    client.retrieve = lambda **kwargs: (_ for _ in ()).throw(ConnectionError("qdrant down"))
+    reconciler = UpsertReconciler(client, "documents", interval=60, max_pending_points=4)
+    reconciler.track(make_points(4, doc="a"))
+    reconciler.track(make_points(2, doc="b"))
+    assert reconciler.pending == 1 and client.calls == [(2, True)]
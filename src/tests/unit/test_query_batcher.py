@@ -0,0 +1,68 @@
+import threading
+import time
+import pytest
+from src.processing.query_batcher import QueryEmbeddingBatcher
+
+
+def make_encoder(delay=0.0):
+    batches = []
+
+    def encode(texts):
+        batches.append(list(texts))
+        time.sleep(delay)
+        return [[float(len(text))] for text in texts]
+
+    return encode, batches
+
+
+def test_concurrent_queries_share_batches():
+    encode, batches = make_encoder(delay=0.01)
+    batcher = QueryEmbeddingBatcher(encode, max_wait_ms=20, max_batch=8)
+    results = {}
+
+    def query(i):
+        results[i] = batcher.embed("q" * i)
+
+    threads = [threading.Thread(target=query, args=(i,)) for i in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+    assert results == {i: [float(i)] for i in range(1, 21)}
+    assert sum(len(b) for b in batches) == 20
+    assert len(batches) < 20 and max(len(b) for b in batches) <= 8
+
+
+def test_single_query_waits_at_most_max_wait():
+    encode, batches = make_encoder()
+    batcher = QueryEmbeddingBatcher(encode, max_wait_ms=5, max_batch=8)
+    start = time.monotonic()
+    assert batcher.embed("hello") == [5.0]
+    assert time.monotonic() - start < 0.5
+    assert batches == [["hello"]]
+    batcher.stop()
+
+
+def test_encode_error_reaches_every_caller():
+    def encode(texts):
+        raise RuntimeError("model unavailable")
+
+    batcher = QueryEmbeddingBatcher(encode, max_wait_ms=1, max_batch=4)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.embed("q")
+    batcher.stop()
+    with pytest.raises(RuntimeError):
+        batcher.submit("after stop")
+
+
+def test_embed_query_uses_batcher(monkeypatch):
+    import src.processing.embeddings as embeddings
+    import src.processing.query_batcher as query_batcher
+
+    monkeypatch.setattr(query_batcher, "_batcher", None)
+    monkeypatch.setattr(embeddings, "get_query_embedding_cache", lambda: None)
+    monkeypatch.setattr(embeddings, "_encode", lambda texts: [[1.0, 2.0] for _ in texts])
+    assert embeddings.embed_query("q") == [1.0, 2.0]
+    assert query_batcher._batcher is not None
+    query_batcher.shutdown_query_batcher()
@@ -0,0 +1,103 @@
+import pytest
+from qdrant_client.http.models import PointStruct
+import src.storage.query_cache as query_cache
+import src.storage.vector_db as vector_db
+from src.storage.clients import get_clients
+from src.storage.query_cache import (
+    QueryResultCache, bump_corpus_generation, cached_query_documents, corpus_generation, request_key,
+)
+
+RESULTS = [{"document_id": "d1", "chunk_index": 0, "text": "retrieval augmented generation", "score": 0.9}]
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    calls = []
+
+    def fake_query(query, top_k=5, similarity_threshold=0.7, filters=None, use_hybrid=True):
+        calls.append(query)
+        return list(RESULTS), 12.5
+
+    monkeypatch.setattr(vector_db, "query_documents", fake_query)
+    monkeypatch.setattr(query_cache, "_cache", QueryResultCache(max_bytes=1_000_000))
+    return calls
+
+
+def test_request_key_is_normalized():
+    assert request_key("what  is\\nrag", 5, 0.7, {"b": 1, "a": 2}, True) == request_key("what is\\nrag", 5, 0.7, {"a": 2, "b": 1}, True)
+    assert request_key("what is rag", 5, 0.7, None, True) != request_key("what is rag", 6, 0.7, None, True)
+    assert request_key("what is rag", 5, 0.7, None, True) != request_key("what is rag", 5, 0.7, None, False)
+
+
+def test_identical_queries_hit_until_corpus_changes(searches):
+    assert cached_query_documents("what is rag", 5)[2] is False
+    results, _, cached = cached_query_documents("what  is rag", 5)
+    assert cached is True and results == RESULTS
+    assert searches == ["what is rag"]
+    bump_corpus_generation()
+    assert cached_query_documents("what is rag", 5)[2] is False
+    assert len(searches) == 2
+
+
+def test_empty_results_are_not_cached(searches, monkeypatch):
+    monkeypatch.setattr(vector_db, "query_documents", lambda *args: ([], 0.0))
+    cached_query_documents("nothing", 5)
+    assert cached_query_documents("nothing", 5)[2] is False
+
+
+def test_results_of_a_query_racing_a_write_are_not_cached():
+    cache = QueryResultCache(max_bytes=1_000_000)
+    generation = corpus_generation()
+    bump_corpus_generation()
+    cache.put(generation, "k", RESULTS)
+    assert len(cache) == 0
+
+
+def test_cache_is_bounded_in_bytes():
+    entry = len("k0") + len(RESULTS[0]["text"]) + QueryResultCache.RESULT_OVERHEAD_BYTES
+    cache = QueryResultCache(max_bytes=2 * entry)
+    generation = corpus_generation()
+    for key in ("k0", "k1", "k2"):
+        cache.put(generation, key, RESULTS)
+    assert cache.get(generation, "k0") is None
+    assert cache.get(generation, "k2") == RESULTS
+    assert cache.size_bytes == 2 * entry
+
+
+def test_ingest_upsert_and_delete_bump_generation(monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+
+    class Upserter:
+        def upsert(self, points):
+            pass
+
+    class Client:
+        def delete(self, **kwargs):
+            self.selector = kwargs["points_selector"]
+
+    monkeypatch.setattr(ingest_rag, "_get_upserter", lambda: Upserter())
+    monkeypatch.setattr(ingest_rag, "_sparse_enabled", lambda dim: False)
+    before = corpus_generation()
+    ingest_rag._upsert_points([PointStruct(id=vector_db.point_id("abc", 0), vector=[1.0], payload={})])
+    assert corpus_generation() == before + 1
+    client = Client()
+    monkeypatch.setattr(get_clients(), "qdrant", client)
+    vector_db.delete_document("abc")
+    assert corpus_generation() == before + 2
+    # Ingested chunks are stored under mongo_id, so delete matches it as well as document_id.
+    assert {condition.key for condition in client.selector.should} == {"document_id", "mongo_id"}
+
+
+def test_query_response_reports_cache_status(searches, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.api.routes import app
+    from src.config.settings import settings
+
+    monkeypatch.setattr(settings, "LANGSMITH_API_KEY", "test-token")
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer test-token"}
+    first = client.post("/query", json={"query": "what is rag"}, headers=headers)
+    second = client.post("/query", json={"query": "what is rag"}, headers=headers)
+    assert first.status_code == 200 and first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["results"][0]["text"] == RESULTS[0]["text"]
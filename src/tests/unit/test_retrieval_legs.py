@@ -0,0 +1,55 @@
+import time
+from qdrant_client.http.models import ScoredPoint
+import src.storage.vector_db as vector_db
+from src.monitoring.metrics import RETRIEVAL_LEG_OUTCOMES
+from src.storage.vector_db import run_retrieval_legs
+
+
+def _outcomes(leg, outcome):
+    return RETRIEVAL_LEG_OUTCOMES.labels(leg=leg, outcome=outcome)._value.get()
+
+
+def _slow(seconds, result):
+    def run():
+        time.sleep(seconds)
+        return result
+    return run
+
+
+def test_legs_run_concurrently():
+    start = time.perf_counter()
+    results = run_retrieval_legs({"vector": (_slow(0.2, ["v"]), 1000), "keyword": (_slow(0.2, ["k"]), 1000)})
+    assert results == {"vector": ["v"], "keyword": ["k"]}
+    assert time.perf_counter() - start < 0.35
+
+
+def test_slow_leg_is_dropped_at_its_deadline():
+    timeouts = _outcomes("keyword", "timeout")
+    start = time.perf_counter()
+    results = run_retrieval_legs({"vector": (_slow(0.01, ["v"]), 1000), "keyword": (_slow(0.5, ["k"]), 50)})
+    assert results == {"vector": ["v"], "keyword": []}
+    assert time.perf_counter() - start < 0.3
+    assert _outcomes("keyword", "timeout") == timeouts + 1
+
+
+def test_failing_leg_degrades_to_the_other():
+    def fail():
+        raise RuntimeError("qdrant unavailable")
+
+    errors = _outcomes("vector", "error")
+    assert run_retrieval_legs({"vector": (fail, 1000), "keyword": (_slow(0, ["k"]), 1000)}) == {
+        "vector": [], "keyword": ["k"],
+    }
+    assert _outcomes("vector", "error") == errors + 1
+
+
+def test_hybrid_query_uses_the_leg_that_answered_in_time(monkeypatch):
+    monkeypatch.setattr(vector_db.settings, "HYBRID_SEARCH_MODE", "client")
+    monkeypatch.setattr(vector_db.settings, "KEYWORD_LEG_TIMEOUT_MS", 50)
+    hit = ScoredPoint(id=vector_db.point_id("d1", 0), version=0, score=0.9,
+                      payload={"mongo_id": "d1", "chunk_index": 0, "text": "vector hit"})
+    monkeypatch.setattr(vector_db, "vector_search", lambda *args: [hit])
+    monkeypatch.setattr(vector_db, "keyword_search", lambda *args: time.sleep(0.5) or [{"document_id": "d2"}])
+    results, latency = vector_db.query_documents("query", top_k=3)
+    assert [(r["document_id"], r["bm25"]) for r in results] == [("d1", False)]
+    assert latency < 300
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import src.processing.embeddings as embeddings
+from src.processing.semantic_chunking import iter_similarity_chunks, similarity_chunks
+from src.processing.streaming import chunk_blocks
+
+TOPICS = {"cat": [1.0, 0.0, 0.0], "car": [0.0, 1.0, 0.0], "tax": [0.0, 0.0, 1.0]}
+TEXT = (
+    "The cat sleeps. A cat purrs loudly. Every cat likes fish. "
+    "The car is fast. My car needs fuel. "
+    "The tax is due. Tax forms are long. A tax office opened."
+)
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    calls = []
+
+    def fake_embed(sentences, chunk_stats=True):
+        calls.append(list(sentences))
+        return [next(v for topic, v in TOPICS.items() if topic in s.lower()) for s in sentences]
+
+    monkeypatch.setattr(embeddings, "embed_chunks", fake_embed)
+    return calls
+
+
+def test_boundaries_at_similarity_drops(encoded):
+    chunks = list(iter_similarity_chunks([TEXT], chunk_size=1000, percentile=50))
+    assert [text for text, _ in chunks] == [
+        "The cat sleeps. A cat purrs loudly. Every cat likes fish.",
+        "The car is fast. My car needs fuel.",
+        "The tax is due. Tax forms are long. A tax office opened.",
+    ]
+    assert [vector for _, vector in chunks] == [TOPICS["cat"], TOPICS["car"], TOPICS["tax"]]
+    assert len(encoded) == 1 and len(encoded[0]) == 8
+
+
+def test_batch_edges_do_not_force_boundaries(encoded):
+    whole = list(iter_similarity_chunks([TEXT], chunk_size=1000, percentile=50))
+    batched = list(iter_similarity_chunks([TEXT[:40], TEXT[40:]], chunk_size=1000, percentile=50, batch_sentences=3))
+    assert [text for text, _ in batched] == [text for text, _ in whole]
+    assert sum(len(call) for call in encoded) == 16
+
+
+def test_chunk_size_caps_chunks_and_vectors_are_pooled(encoded, monkeypatch):
+    monkeypatch.setattr(embeddings.settings, "EMBEDDING_NORMALIZE", False)
+    monkeypatch.setattr(embeddings, "embed_chunks", lambda sentences, chunk_stats=True: [[float(len(s)), 1.0] for s in sentences])
+    chunks = similarity_chunks(["Aa. Bbbb. Cc. Dddddd."], chunk_size=9, percentile=100)
+    assert list(chunks) == ["Aa. Bbbb.", "Cc.", "Dddddd."]
+    # Length-weighted mean of the sentence vectors [3, 1] and [5, 1].
+    assert np.allclose(chunks.vectors[0], [(3 * 3 + 5 * 5) / 8, 1.0])
+
+
+def test_chunk_blocks_returns_vectors(encoded):
+    chunks, pages = chunk_blocks([TEXT], "similarity", chunk_size=1000)
+    assert len(chunks.vectors) == len(chunks) and pages is None
+
+
+def test_ingest_uses_pooled_vectors_without_second_encode(encoded, monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+    from src.tests.unit.test_idempotent_ingest import FakeColl
+
+    upserts = []
+    coll = FakeColl()
+    monkeypatch.setattr(ingest_rag, "_documents", lambda: coll)
+    monkeypatch.setattr(ingest_rag, "_upsert_points", lambda points: upserts.extend(points))
+    monkeypatch.setattr(ingest_rag, "embed_chunks", lambda chunks: pytest.fail("chunks were encoded again"))
+    monkeypatch.setattr(ingest_rag.settings, "SEMANTIC_BREAKPOINT_PERCENTILE", 50)
+    ingest_rag.ingest_document_rag("topics.txt", TEXT, None, strategy="similarity", chunk_size=1000, overlap=0)
+    assert [p.vector for p in upserts] == [TOPICS["cat"], TOPICS["car"], TOPICS["tax"]]
+    assert {p.payload["chunking_strategy"] for p in upserts} == {"similarity"}
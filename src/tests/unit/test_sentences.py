@@ -0,0 +1,51 @@
+import random
+import subprocess
+import sys
+import pytest
+from src.processing.chunking import chunk_document
+from src.processing.sentences import iter_sentences, split_sentences
+from src.processing.streaming import iter_chunks
+
+TEXT = (
+    'Mr. Smith went to Washington. He paid $3.50 for coffee! Was it good? "Yes," he said. '
+    "J. R. R. Tolkien wrote e.g. novels (and poems). The U.S. economy grew 2%...\n\n"
+    "A heading\nFirst line of a paragraph. second clause stays. Last sentence without a period"
+)
+
+
+def test_rule_segmenter_boundaries():
+    assert split_sentences(TEXT) == [
+        "Mr. Smith went to Washington.",
+        "He paid $3.50 for coffee!",
+        "Was it good?",
+        '"Yes," he said.',
+        "J. R. R. Tolkien wrote e.g. novels (and poems).",
+        "The U.S. economy grew 2%...",
+        "A heading\nFirst line of a paragraph. second clause stays.",
+        "Last sentence without a period",
+    ]
+
+
+def test_rule_segmenter_streams_exactly():
+    expected = split_sentences(TEXT)
+    rng = random.Random(7)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(TEXT)), rng.randint(1, 30)))
+        blocks = [TEXT[a:b] for a, b in zip([0] + cuts, cuts + [len(TEXT)])]
+        assert list(iter_sentences(blocks)) == expected
+
+
+def test_semantic_streaming_matches_chunk_document():
+    text = TEXT * 20
+    blocks = [text[i:i + 101] for i in range(0, len(text), 101)]
+    assert list(iter_chunks(blocks, "semantic", chunk_size=120)) == chunk_document(text, "txt", "semantic", 120)
+
+
+def test_unknown_segmenter():
+    with pytest.raises(ValueError):
+        split_sentences("Hi.", backend="missing")
+
+
+def test_chunking_import_does_not_load_nltk():
+    code = "import sys, src.processing.chunking, src.processing.streaming; assert 'nltk' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,102 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, FieldCondition, Filter, MatchValue, PointStruct, VectorParams
+import src.processing.embeddings as embeddings
+import src.processing.ingest_rag as ingest_rag
+import src.storage.vector_db as vector_db
+from src.storage.clients import get_clients
+from src.storage.sparse_vectors import (
+    SPARSE_VECTOR_NAME, chunk_sparse_vector, dense_vector, query_sparse_vector, sparse_support, term_index,
+)
+
+TEXTS = [
+    "Qdrant stores dense vectors for semantic search",
+    "The quarterly invoice INV-2041 is overdue",
+    "Dense retrieval misses exact identifiers",
+    "Sparse vectors match exact identifiers like INV-2041",
+]
+
+
+def test_chunk_vector_saturates_term_frequency():
+    vector = chunk_sparse_vector("invoice invoice invoice due")
+    weights = dict(zip(vector.indices, vector.values))
+    assert vector.indices == sorted(vector.indices)
+    assert weights[term_index("invoice")] > weights[term_index("due")]
+    assert weights[term_index("invoice")] < 3 * weights[term_index("due")]
+
+
+def test_query_vector_uses_shared_analyzer():
+    vector = query_sparse_vector("Invoice, INVOICE due?")
+    assert dict(zip(vector.indices, vector.values)) == {term_index("invoice"): 2.0, term_index("due"): 1.0}
+    assert query_sparse_vector("?!").indices == []
+
+
+def _points():
+    return [
+        PointStruct(
+            id=vector_db.point_id("doc", i),
+            vector=[1.0, 0.0] if i % 2 == 0 else [0.0, 1.0],
+            payload={"mongo_id": "doc", "chunk_index": i, "text": text, "doc_metadata_category": f"c{i % 2}"},
+        )
+        for i, text in enumerate(TEXTS)
+    ]
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    client = QdrantClient(":memory:")
+    monkeypatch.setattr(get_clients(), "qdrant", client)
+    monkeypatch.setattr(ingest_rag, "_upserter", None)
+    monkeypatch.setattr(ingest_rag.settings, "QDRANT_UPSERT_WAIT", True)
+    monkeypatch.setattr(embeddings, "embed_query", lambda query: [1.0, 0.0])
+    return client
+
+
+def test_ingest_creates_collection_with_sparse_vectors(qdrant):
+    ingest_rag._upsert_points(_points())
+    assert sparse_support(qdrant, "documents") is True
+    stored = qdrant.retrieve("documents", ids=[vector_db.point_id("doc", 1)], with_vectors=True)[0]
+    assert dense_vector(stored.vector) == pytest.approx([0.0, 1.0])
+    assert set(stored.vector[SPARSE_VECTOR_NAME].indices) == set(chunk_sparse_vector(TEXTS[1]).indices)
+
+
+def test_failed_upsert_is_not_resent_without_sparse_vectors(qdrant, monkeypatch):
+    sent = []
+
+    class Upserter:
+        def upsert(self, points):
+            sent.append(points)
+            raise ConnectionError("qdrant unavailable")
+
+    monkeypatch.setattr(ingest_rag, "_get_upserter", lambda: Upserter())
+    with pytest.raises(RuntimeError, match="qdrant unavailable"):
+        ingest_rag._upsert_points(_points())
+    # The collection was created before the points were built, so the one attempt had sparse vectors.
+    assert len(sent) == 1 and all(SPARSE_VECTOR_NAME in p.vector for p in sent[0])
+
+
+def test_server_side_fusion_finds_keyword_only_matches(qdrant, monkeypatch):
+    ingest_rag._upsert_points(_points())
+    monkeypatch.setattr(vector_db, "keyword_search", lambda *args: pytest.fail("client-side keyword search ran"))
+
+    results, _ = vector_db.query_documents("INV-2041", top_k=4, similarity_threshold=0.9)
+    by_index = {r["chunk_index"]: r for r in results}
+    # Chunks 1 and 3 only match by keyword (their dense vectors are below the threshold)
+    assert {1, 3} <= set(by_index)
+    assert by_index[1]["bm25"] and by_index[3]["bm25"]
+    assert not by_index[0]["bm25"]
+
+    category = {"doc_metadata_category": "c1"}
+    results, _ = vector_db.query_documents("exact identifiers", top_k=4, similarity_threshold=0.9, filters=category)
+    assert {r["chunk_index"] for r in results} == {3}
+
+
+def test_collections_without_sparse_vectors_use_the_keyword_index(qdrant):
+    qdrant.create_collection("documents", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    ingest_rag._upsert_points(_points())
+    ingest_rag._flush_keyword_index()
+    stored = qdrant.retrieve("documents", ids=[vector_db.point_id("doc", 1)], with_vectors=True)[0]
+    assert stored.vector == pytest.approx([0.0, 1.0])
+
+    results, _ = vector_db.query_documents("INV-2041", top_k=4, similarity_threshold=0.9)
+    assert {r["chunk_index"] for r in results if r["bm25"]} == {1, 3}
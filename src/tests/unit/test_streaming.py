@@ -0,0 +1,85 @@
+import json
+import pytest
+from src.processing.chunking import chunk_document
+from src.processing.streaming import iter_chunks, iter_text_blocks, content_blocks
+
+
+def blocks_of(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("strategy,chunk_size,overlap", [("fixed", 100, 0), ("sliding", 100, 30), ("sliding", 50, 10)])
+def test_streamed_chunks_match_chunk_document(strategy, chunk_size, overlap):
+    text = "".join(chr(97 + i % 26) for i in range(1234))
+    expected = chunk_document(text, "txt", strategy=strategy, chunk_size=chunk_size, overlap=overlap)
+    assert list(iter_chunks(blocks_of(text, 77), strategy, chunk_size, overlap)) == expected
+
+
+def test_sliding_short_document_is_one_chunk():
+    assert list(iter_chunks(["abc"], "sliding", 10, 2)) == ["abc"]
+
+
+def test_langchain_stream_covers_text():
+    text = " ".join(f"word{i}" for i in range(2000))
+    chunks = list(iter_chunks(blocks_of(text, 1000), "langchain", 200, 20))
+    assert all(len(c) <= 200 for c in chunks)
+    assert chunks[0].startswith("word0 ") and chunks[-1].endswith("word1999")
+
+
+def test_txt_blocks_decode_multibyte_boundaries(tmp_path):
+    path = tmp_path / "doc.txt"
+    text = "héllo wörld " * 500
+    path.write_text(text, encoding="utf-8")
+    blocks = list(iter_text_blocks(str(path), "txt", block_size=7))
+    assert "".join(blocks) == text
+    assert max(len(b) for b in blocks) == 7
+
+
+def test_json_blocks_match_json_dumps(tmp_path):
+    content = {"content": "x" * 300, "items": list(range(100))}
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(content, indent=2))
+    assert "".join(iter_text_blocks(str(path), "json", block_size=64)) == json.dumps(content)
+    assert "".join(content_blocks(content, 64)) == json.dumps(content)
+
+
+def test_unsupported_type(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_text_blocks(str(tmp_path / "x"), "docx"))
+
+
+def test_ingest_processes_bounded_windows(monkeypatch):
+    import src.processing.ingest_rag as ingest_rag
+
+    class InsertResult:
+        inserted_id = "mongo-1"
+
+    class FakeColl:
+        def create_index(self, *args, **kwargs):
+            pass
+
+        def find_one(self, query):
+            return None
+
+        def insert_one(self, doc):
+            return InsertResult()
+
+        def update_one(self, query, update):
+            pass
+
+    upserts, embedded = [], []
+    coll = FakeColl()
+    monkeypatch.setattr(ingest_rag, "_documents", lambda: coll)
+    monkeypatch.setattr(ingest_rag, "_upsert_points", lambda points: upserts.append(points))
+    monkeypatch.setattr(ingest_rag, "embed_chunks", lambda chunks: embedded.append(len(chunks)) or [[0.0]] * len(chunks))
+    monkeypatch.setattr(ingest_rag.settings, "INGEST_WINDOW_CHUNKS", 4)
+    stages = []
+    mongo_id = ingest_rag.ingest_document_rag(
+        "a.txt", "x" * 1000, None, strategy="fixed", chunk_size=100, overlap=0,
+        progress=lambda stage, **counts: stages.append((stage, counts.get("chunks_upserted"))),
+    )
+    assert mongo_id == "mongo-1"
+    assert embedded == [4, 4, 2]
+    assert [p.payload["chunk_index"] for batch in upserts for p in batch] == list(range(10))
+    assert [(p.payload["char_start"], p.payload["char_end"]) for p in upserts[1]] == [(400, 500), (500, 600), (600, 700), (700, 800)]
+    assert stages[-1] == ("done", 10)
@@ -0,0 +1,140 @@
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import PreTrainedTokenizerFast
+
+import src.processing.embeddings as embeddings
+from src.config.settings import settings
+from src.processing.chunking import chunk_spans, chunk_document
+from src.processing.streaming import iter_chunk_spans
+
+WORDS = [f"w{i}" for i in range(50)]
+
+
+def make_tokenizer():
+    # Whitespace word-level tokenizer: one token per word, so expected chunks are easy to write down.
+    vocab = {"[UNK]": 0, "[CLS]": 1, "[SEP]": 2, "[PAD]": 3}
+    vocab.update({word: i + 4 for i, word in enumerate(WORDS)})
+    tok = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tok.post_processor = processors.TemplateProcessing(single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)])
+    return PreTrainedTokenizerFast(tokenizer_object=tok, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]",
+                                   pad_token="[PAD]")
+
+
+@pytest.fixture(autouse=True)
+def tokenizer(monkeypatch):
+    tokenizer = make_tokenizer()
+    monkeypatch.setattr(embeddings, "get_tokenizer", lambda: tokenizer)
+    return tokenizer
+
+
+def test_token_chunks_count_model_tokens():
+    text = " ".join(WORDS)
+    spans = chunk_spans(text, "token", chunk_size=10, overlap=2)
+    chunks = list(spans)
+    assert chunks[0] == " ".join(WORDS[0:10])
+    assert chunks[1] == " ".join(WORDS[8:18])
+    assert chunks[-1].endswith("w49")
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+    assert [text[s:e] for s, e in spans.spans()] == chunks
+    assert chunk_document(text, "txt", strategy="token", chunk_size=10, overlap=2) == chunks
+
+
+def test_token_chunks_stream_across_blocks():
+    text = " ".join(WORDS)
+    expected = chunk_spans(text, "token", chunk_size=7, overlap=3).spans()
+    # Blocks split words in half; the partial last token must be carried over.
+    blocks = [text[i:i + 13] for i in range(0, len(text), 13)]
+    streamed = list(iter_chunk_spans(blocks, "token", chunk_size=7, overlap=3))
+    assert [(s, e) for _, s, e in streamed] == expected
+
+
+def test_token_chunks_capped_at_model_limit(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_TOKENS", 6)
+    chunks = list(chunk_spans(" ".join(WORDS), "token", chunk_size=512, overlap=0))
+    assert len(chunks[0].split()) == 4  # 6 minus [CLS] and [SEP]
+
+
+def test_token_overlap_must_be_smaller():
+    with pytest.raises(ValueError):
+        chunk_spans("w1 w2 w3", "token", chunk_size=4, overlap=4)
+
+
+def test_token_stats_record_padding_and_truncation(monkeypatch):
+    import numpy as np
+
+    class Model:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, **kwargs):
+            self.batches.append([len(t.split()) for t in texts])
+            return np.array([[float(len(t.split()))] for t in texts])
+
+    model = Model()
+    monkeypatch.setattr(embeddings, "get_model", lambda: model)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: None)
+    monkeypatch.setattr(embeddings, "_token_stats_enabled", True)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_TOKENS", 8)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_TOKENS", 12)
+    recorded = []
+    monkeypatch.setattr(embeddings, "record_metrics", lambda name, value, **kw: recorded.append((name, value)))
+    texts = [" ".join(WORDS[:1]), " ".join(WORDS[:10]), " ".join(WORDS[:4]), " ".join(WORDS[:2])]
+    # Vectors come back in input order although batches are formed longest first.
+    assert embeddings.embed_chunks(texts) == [[1.0], [10.0], [4.0], [2.0]]
+    # Token lengths 3, 12, 6, 4 clip to 3, 8, 6, 4: batches [8] and [6, 4] (2 x 6 <= 12), then [3].
+    assert model.batches == [[10], [4, 2], [1]]
+    stats = dict(recorded)
+    assert [v for name, v in recorded if name == "chunk_tokens"] == [3, 12, 6, 4]
+    assert stats["embedding_truncated_chunks"] == 1
+    assert stats["embedding_truncated_tokens"] == 4
+    assert stats["embedding_tokens"] == 21
+    assert stats["embedding_padding_tokens"] == 2
+    assert stats["embedding_padding_ratio"] == pytest.approx(2 / 23)
+    assert stats["embedding_tokens_per_second"] > 0
+
+
+def test_queries_are_not_counted_as_chunks(monkeypatch):
+    import numpy as np
+
+    class Model:
+        def encode(self, texts, **kwargs):
+            return np.array([[1.0] for _ in texts])
+
+    monkeypatch.setattr(embeddings, "get_model", lambda: Model())
+    monkeypatch.setattr(embeddings, "_token_stats_enabled", True)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_TOKENS", 8)
+    monkeypatch.setattr(settings, "QUERY_BATCHING_ENABLED", False)
+    monkeypatch.setattr(embeddings, "get_query_embedding_cache", lambda: None)
+    recorded = []
+    monkeypatch.setattr(embeddings, "record_metrics", lambda name, value, **kw: recorded.append(name))
+    assert embeddings.embed_query(" ".join(WORDS[:10])) == [1.0]
+    assert "embedding_tokens" in recorded
+    assert not {"chunk_tokens", "embedding_truncated_chunks", "embedding_truncated_tokens"} & set(recorded)
+
+
+def test_chunk_tokens_are_recorded_for_cached_and_duplicate_chunks(monkeypatch):
+    import numpy as np
+    from src.processing.embedding_cache import EmbeddingCache
+
+    encoded = []
+
+    class Model:
+        def encode(self, texts, **kwargs):
+            encoded.extend(texts)
+            return np.array([[float(len(t.split()))] for t in texts])
+
+    monkeypatch.setattr(embeddings, "get_model", lambda: Model())
+    cache = EmbeddingCache(memory_entries=100)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(embeddings, "_token_stats_enabled", True)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_TOKENS", 8)
+    recorded = []
+    monkeypatch.setattr(embeddings, "record_metrics", lambda name, value, **kw: recorded.append((name, value)))
+    chunks = [" ".join(WORDS[:10]), " ".join(WORDS[:2]), " ".join(WORDS[:10])]
+    # Ingest the same chunks twice: the repeat and the second pass come from the cache.
+    embeddings.embed_chunks(chunks)
+    embeddings.embed_chunks(chunks)
+    assert len(encoded) == 2
+    assert [v for name, v in recorded if name == "chunk_tokens"] == [12, 4, 12] * 2
+    assert sum(v for name, v in recorded if name == "embedding_truncated_chunks") == 4
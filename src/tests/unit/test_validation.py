@@ -16,7 +16,7 @@ def test_validate_pdf(monkeypatch):
             return "PDF text"
     class DummyReader:
         pages = [DummyPage()]
-    monkeypatch.setattr("src.processing.validation.PdfReader", lambda x: DummyReader())
+    monkeypatch.setattr("PyPDF2.PdfReader", lambda x: DummyReader())
     content = b"%PDF-1.4..."
     assert validate_document(content, "pdf") == "PDF text"
 
@@ -16,6 +16,8 @@ try:
     API_TOKEN = st.secrets["API_TOKEN"]
 except Exception:
     API_TOKEN = os.environ.get("API_TOKEN", "changeme")
+# Documents fetched per page on the Documents page
+DOCUMENTS_PAGE_SIZE = int(os.environ.get("DOCUMENTS_PAGE_SIZE", "100"))
 
 print("API_TOKEN used:", API_TOKEN)
 print("Headers sent:", {"Authorization": f"Bearer {API_TOKEN}"})
@@ -621,7 +623,7 @@ if page == "Ingest Document":
     # Add chunking strategy controls
     chunking_strategy = st.selectbox(
         "Chunking Strategy",
-        ["langchain", "fixed", "sliding", "semantic"],
+        ["langchain", "fixed", "sliding", "token", "semantic", "similarity"],
         index=0,
         help="How to split the document into chunks for embedding."
     )
@@ -631,7 +633,7 @@ if page == "Ingest Document":
         max_value=4096,
         value=512,
         step=32,
-        help="Number of characters or approximate size per chunk."
+        help="Number of characters per chunk (model tokens for token, capped at the model limit)."
     )
     overlap = st.number_input(
         "Chunk Overlap",
@@ -639,7 +641,7 @@ if page == "Ingest Document":
         max_value=1024,
         value=64,
         step=8,
-        help="Number of overlapping characters between chunks (for sliding/langchain)."
+        help="Number of overlapping characters between chunks (tokens for token; for sliding/token/langchain)."
     )
     
     # Processing status and results
@@ -933,6 +935,7 @@ elif page == "Documents":
     
     with col1:
         if st.button("🔄 Refresh Documents", type="secondary"):
+            st.session_state.pop("documents_listing", None)
             st.rerun()
     
     with col2:
@@ -941,16 +944,24 @@ elif page == "Documents":
     with col3:
         st.metric("Storage Used", "Loading...")
     
-    # Fetch documents
-    with st.spinner("📥 Loading documents..."):
-        resp = requests.get(f"{API_URL}/documents", headers=headers)
+    # Fetch the first page of documents once; reruns (filters, expanders) reuse the loaded pages
+    listing = st.session_state.get("documents_listing")
+    listing_error = None
+    if listing is None:
+        with st.spinner("📥 Loading documents..."):
+            resp = requests.get(f"{API_URL}/documents", headers=headers, params={"limit": DOCUMENTS_PAGE_SIZE})
+        if resp.status_code == 200:
+            listing = resp.json()
+            st.session_state.documents_listing = listing
+        else:
+            listing_error = resp.text
     
-    if resp.status_code == 200:
-        documents = resp.json().get("documents", [])
+    if listing is not None:
+        documents = listing.get("documents", [])
         
         # Update metrics
         with col2:
-            st.metric("Total Documents", len(documents))
+            st.metric("Loaded Documents", f"{len(documents)}+" if listing.get("next_cursor") else len(documents))
         
         with col3:
             total_size = sum(doc.get('file_size', 0) for doc in documents)
@@ -1186,8 +1197,9 @@ elif page == "Documents":
                                                 delete_resp = requests.delete(f"{API_URL}/documents/{doc['document_id']}", headers=headers)
                                             if delete_resp.status_code == 200:
                                                 st.success("✅ Document deleted successfully!")
-                                                # Clear confirmation state
+                                                # Clear confirmation state and the cached listing
                                                 st.session_state[confirm_key] = False
+                                                st.session_state.pop("documents_listing", None)
                                                 time.sleep(2)
                                                 st.rerun()
                                             else:
@@ -1223,6 +1235,22 @@ elif page == "Documents":
             
             else:
                 st.info("📭 No documents found matching your filters.")
+            
+            # Next page of the listing
+            if listing.get("next_cursor") and st.button("⬇️ Load More Documents", type="secondary"):
+                with st.spinner("📥 Loading more documents..."):
+                    more = requests.get(
+                        f"{API_URL}/documents",
+                        headers=headers,
+                        params={"limit": DOCUMENTS_PAGE_SIZE, "cursor": listing["next_cursor"]},
+                    )
+                if more.status_code == 200:
+                    page_data = more.json()
+                    listing["documents"] = documents + page_data.get("documents", [])
+                    listing["next_cursor"] = page_data.get("next_cursor")
+                    st.rerun()
+                else:
+                    st.error(f"❌ Error loading more documents: {more.text}")
                 
         else:
             st.info("📭 No documents found. Upload your first document in the Ingest tab!")
@@ -1240,7 +1268,7 @@ elif page == "Documents":
                     st.switch_page("Documentation")
     
     else:
-        st.error(f"❌ Error loading documents: {resp.text}")
+        st.error(f"❌ Error loading documents: {listing_error}")
         
         # Error recovery options
         st.subheader("🔧 Troubleshooting")